@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Analytics over the concept stock CSVs.
+
+Subcommands:
+- backtest: parameter-grid backtest of concept baskets after anchor EPS surprises (raw_conceptstock_backtest_results.csv)
+- breadth: per-concept breadth/relative strength of the Taiwan members (raw_conceptstock_concept_breadth.csv)
+- leadlag: best lag (-10..+10 days) between each US anchor and its Taiwan members (raw_conceptstock_lead_lag.csv)
+- fx: refresh the FX cache and write USD-normalized price/income CSVs
+- valuation: daily P/E and P/S per ticker (raw_conceptstock_daily_valuation.csv)
+- validate: data-quality rules over every raw_conceptstock_*.csv (exit 1 on blocking violations)
+
+Usage:
+    python3 scripts/analyze_conceptstocks.py backtest --hold-days 10 20 --workers 4
+    python3 scripts/analyze_conceptstocks.py breadth
+    python3 scripts/analyze_conceptstocks.py leadlag --window 250 --step 20
+    python3 scripts/analyze_conceptstocks.py fx
+    python3 scripts/analyze_conceptstocks.py valuation
+    python3 scripts/analyze_conceptstocks.py valuation --ticker NVDA --rebuild
+    python3 scripts/analyze_conceptstocks.py validate --report validation_report.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analytics.backtest import (
+    BACKTEST_FIELDNAMES,
+    BACKTEST_FILE,
+    basket_returns,
+    parse_grid,
+    run_grid,
+    surprise_events,
+)
+from src.analytics.breadth import (
+    BREADTH_FIELDNAMES,
+    BREADTH_FILE,
+    compute_breadth,
+    membership_matrix,
+    pivot_closes,
+    trailing_return,
+)
+from src.analytics.leadlag import (
+    DEFAULT_MAX_LAG,
+    DEFAULT_STEP,
+    DEFAULT_WINDOW,
+    LEAD_LAG_FIELDNAMES,
+    LEAD_LAG_FILE,
+    compute_lead_lag,
+)
+from src.analytics.columns import missing_mask, read_columns, to_date_array, to_float_array
+from src.analytics.valuation import (
+    EPS_CURRENCY_OVERRIDES,
+    VALUATION_FILE,
+    VALUATION_FIELDNAMES,
+    adr_ratio_for,
+    build_quarter_table,
+    build_ttm_table,
+    compute_valuation,
+    eps_currency_for,
+    first_changed_bar,
+    group_income_rows,
+    income_symbol_for,
+    stored_by_ticker,
+    valuation_columns,
+)
+from src.analytics.quality import BLOCKING, validate_directory
+from src.fx_rates import FX_CACHE_FILE, FXTable, currency_for_ticker, update_fx_cache
+from src.universe_prices import COMPANYINFO_FILE, UNIVERSE_OUTPUT_DIR, load_concept_flags, read_universe_columns
+from update_conceptstocks import CONCEPT_TO_TICKER
+
+DAILY_PRICES = "raw_conceptstock_daily.csv"
+COMPANY_INCOME = "raw_conceptstock_company_income.csv"
+DAILY_PRICES_USD = "raw_conceptstock_daily_usd.csv"
+COMPANY_INCOME_USD = "raw_conceptstock_company_income_usd.csv"
+CONCEPT_METADATA = "raw_conceptstock_company_metadata.csv"
+
+# Income amounts converted by the fx subcommand (period-average rate).
+INCOME_USD_FIELDS = ["total_revenue", "gross_profit", "operating_income", "net_income"]
+
+# Approximate period length used to average FX for flow items.
+PERIOD_DAYS = {"FY": 364, "Q1": 90, "Q2": 90, "Q3": 90, "Q4": 90}
+
+
+def read_rows(path: str) -> List[Dict[str, str]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def write_rows(path: str, fieldnames: List[str], rows: List[Dict[str, object]]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: row.get(k) for k in fieldnames})
+
+
+def write_columns(path: str, columns: Dict[str, np.ndarray]) -> None:
+    """Write equal-length column arrays as CSV (NaN/None become empty cells)."""
+    names = list(columns)
+    cells = []
+    for name in names:
+        col = columns[name]
+        if col.dtype.kind == "f":
+            cells.append([("" if v != v else repr(v)) for v in col.tolist()])
+        else:
+            cells.append(["" if v is None else v for v in col.tolist()])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*cells))
+
+
+def dominant_currency(currencies: np.ndarray) -> str:
+    """Most common non-missing currency code, default USD."""
+    present = currencies[~missing_mask(currencies)]
+    if not len(present):
+        return "USD"
+    values, counts = np.unique(present, return_counts=True)
+    return str(values[np.argmax(counts)])
+
+
+def run_fx(args: argparse.Namespace) -> int:
+    fx_path = os.path.join(args.out_dir, FX_CACHE_FILE)
+    prices = read_columns(os.path.join(args.out_dir, DAILY_PRICES))
+    income = read_columns(os.path.join(args.out_dir, COMPANY_INCOME))
+
+    price_currency = np.asarray(
+        [currency_for_ticker(t) for t in prices.get("stock_code", np.array([])).tolist()], dtype=str
+    )
+    income_currency = income.get("currency", np.array([], dtype=str)).copy()
+    income_currency[missing_mask(income_currency)] = "USD"
+    eps_currency = income_currency.copy()
+    for symbol, currency in EPS_CURRENCY_OVERRIDES.items():
+        eps_currency[income.get("symbol", np.array([])) == symbol] = currency
+
+    needed = set(price_currency.tolist()) | set(income_currency.tolist()) | set(eps_currency.tolist())
+    if not args.no_fetch:
+        changed = update_fx_cache(needed, fx_path, chart_base_url=args.chart_url or None)
+        print(f"FX cache: {changed} row(s) refreshed in {fx_path}")
+    fx = FXTable.load(fx_path)
+    missing = sorted(needed - {"USD"} - set(fx.currencies()))
+    if missing:
+        print(f"Warning: no FX history for {', '.join(missing)}; their USD columns stay empty.")
+
+    if prices:
+        dates = to_date_array(prices["交易日期"])
+        usd_per_unit = fx.usd_per_unit(price_currency, dates)
+        out = dict(prices)
+        out["currency"] = price_currency
+        out["fx_rate_per_usd"] = 1.0 / usd_per_unit
+        out["開盤_價格_USD"] = to_float_array(prices["開盤_價格_元"]) * usd_per_unit
+        out["收盤_價格_USD"] = to_float_array(prices["收盤_價格_元"]) * usd_per_unit
+        write_columns(os.path.join(args.out_dir, DAILY_PRICES_USD), out)
+        print(f"Wrote {len(dates)} rows to {DAILY_PRICES_USD}")
+
+    if income:
+        ends = to_date_array(income["end_date"])
+        span = np.asarray([PERIOD_DAYS.get(p, 90) for p in income["period"].tolist()], dtype="timedelta64[D]")
+        starts = ends - span
+        amount_rate = np.full(len(ends), np.nan)
+        eps_rate = np.full(len(ends), np.nan)
+        for currency in np.unique(np.concatenate([income_currency, eps_currency])):
+            mask = income_currency == currency
+            amount_rate[mask] = fx.average_rate_per_usd(str(currency), starts[mask], ends[mask])
+            mask = eps_currency == currency
+            eps_rate[mask] = fx.average_rate_per_usd(str(currency), starts[mask], ends[mask])
+        out = dict(income)
+        out["currency"] = income_currency
+        out["eps_currency"] = eps_currency
+        out["fx_rate_per_usd"] = amount_rate
+        for field in INCOME_USD_FIELDS:
+            out[f"{field}_usd"] = to_float_array(income[field]) / amount_rate
+        out["eps_usd"] = to_float_array(income["eps"]) / eps_rate
+        write_columns(os.path.join(args.out_dir, COMPANY_INCOME_USD), out)
+        print(f"Wrote {len(ends)} rows to {COMPANY_INCOME_USD}")
+    return 0
+
+
+def concept_anchor_tickers(out_dir: str, concepts: List[str]) -> Dict[str, str]:
+    """Priced US/HK anchor per concept: CONCEPT_TO_TICKER first, then the metadata Ticker."""
+    metadata = {
+        row.get("概念欄位"): (row.get("Ticker") or "").strip()
+        for row in read_rows(os.path.join(out_dir, CONCEPT_METADATA))
+    }
+    anchors = {}
+    for concept in concepts:
+        ticker = CONCEPT_TO_TICKER.get(concept, (metadata.get(concept) or "", ""))[0]
+        if ticker and ticker != "-":
+            anchors[concept] = ticker
+    return anchors
+
+
+def load_anchor_series(out_dir: str, concepts: List[str]) -> Dict[str, tuple]:
+    """concept -> (anchor ticker, sorted dates, closes) from raw_conceptstock_daily.csv."""
+    anchor_prices = read_columns(
+        os.path.join(out_dir, DAILY_PRICES), ["stock_code", "交易日期", "收盤_價格_元"]
+    )
+    anchors = {}
+    if anchor_prices:
+        a_codes = anchor_prices["stock_code"]
+        a_dates = to_date_array(anchor_prices["交易日期"])
+        a_closes = to_float_array(anchor_prices["收盤_價格_元"])
+        for concept, ticker in concept_anchor_tickers(out_dir, concepts).items():
+            mask = (a_codes == ticker) & ~np.isnat(a_dates)
+            if not mask.any():
+                continue
+            order = np.argsort(a_dates[mask], kind="stable")
+            anchors[concept] = (ticker, a_dates[mask][order], a_closes[mask][order])
+    return anchors
+
+
+def load_universe_matrix(out_dir: str):
+    """(tickers, days, closes, concepts, membership) for the Taiwan universe, or None."""
+    prices = read_universe_columns(out_dir, ["stock_code", "交易日期", "收盤_價格_元"])
+    if not prices:
+        print(
+            f"Missing {UNIVERSE_OUTPUT_DIR}/; run update_conceptstocks.py --universe companyinfo first.",
+            file=sys.stderr,
+        )
+        return None
+    member_codes, flags = load_concept_flags(os.path.join(out_dir, COMPANYINFO_FILE))
+    if not flags:
+        print(f"No concept columns found in {COMPANYINFO_FILE}", file=sys.stderr)
+        return None
+
+    tickers, days, closes = pivot_closes(
+        prices["stock_code"], to_date_array(prices["交易日期"]), to_float_array(prices["收盤_價格_元"])
+    )
+    concepts, membership = membership_matrix(member_codes, flags, tickers)
+    return tickers, days, closes, concepts, membership
+
+
+def run_breadth(args: argparse.Namespace) -> int:
+    universe = load_universe_matrix(args.out_dir)
+    if universe is None:
+        return 1
+    tickers, days, closes, concepts, membership = universe
+    anchors = load_anchor_series(args.out_dir, concepts)
+
+    out_path = os.path.join(args.out_dir, BREADTH_FILE)
+    existing = [] if args.rebuild else read_rows(out_path)
+    since: Dict[str, str] = {}
+    for row in existing:
+        key = row.get("交易日期", "")
+        if key > since.get(row.get("concept", ""), ""):
+            since[row["concept"]] = key
+
+    new_rows = compute_breadth(tickers, days, closes, concepts, membership, anchors, since)
+    all_rows = existing + new_rows
+    all_rows.sort(key=lambda r: (r.get("concept", ""), r.get("交易日期", "")))
+    write_rows(out_path, BREADTH_FIELDNAMES, all_rows)
+    print(
+        f"{len(concepts)} concept(s), {len(tickers)} priced member(s), {len(anchors)} anchor(s); "
+        f"appended {len(new_rows)} row(s) ({len(all_rows)} total) to {out_path}"
+    )
+    return 0
+
+
+def run_leadlag(args: argparse.Namespace) -> int:
+    universe = load_universe_matrix(args.out_dir)
+    if universe is None:
+        return 1
+    tickers, days, closes, concepts, membership = universe
+    anchors = load_anchor_series(args.out_dir, concepts)
+    if not anchors:
+        print(f"No anchor prices for the concepts in {DAILY_PRICES}", file=sys.stderr)
+        return 1
+
+    out_path = os.path.join(args.out_dir, LEAD_LAG_FILE)
+    existing = [] if args.rebuild else read_rows(out_path)
+    since = max((row.get("window_end", "") for row in existing), default="")
+
+    start = time.perf_counter()
+    new_rows = compute_lead_lag(
+        tickers,
+        days,
+        trailing_return(closes, 1),
+        concepts,
+        membership,
+        anchors,
+        window=args.window,
+        step=args.step,
+        max_lag=args.max_lag,
+        since=since,
+    )
+    elapsed = time.perf_counter() - start
+    all_rows = existing + new_rows
+    all_rows.sort(key=lambda r: (r.get("window_end", ""), r.get("concept", ""), r.get("stock_code", "")))
+    write_rows(out_path, LEAD_LAG_FIELDNAMES, all_rows)
+    windows = len({row["window_end"] for row in new_rows})
+    print(
+        f"{len(anchors)} anchor(s), {windows} new window(s), {len(new_rows)} pair row(s) in {elapsed:.2f} s; "
+        f"{len(all_rows)} total in {out_path}"
+    )
+    return 0
+
+
+def run_backtest(args: argparse.Namespace) -> int:
+    universe = load_universe_matrix(args.out_dir)
+    if universe is None:
+        return 1
+    tickers, days, closes, concepts, membership = universe
+    if args.concept:
+        keep = [i for i, concept in enumerate(concepts) if concept in args.concept]
+        if not keep:
+            print(f"No such concept column: {', '.join(args.concept)}", file=sys.stderr)
+            return 1
+        concepts = [concepts[i] for i in keep]
+        membership = membership[keep]
+    try:
+        grid = parse_grid(
+            {
+                "signal": args.signal,
+                "surprise_min": args.surprise_min,
+                "entry_delay": args.entry_delay,
+                "hold_days": args.hold_days,
+                "cost_bps": args.cost_bps,
+            }
+        )
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+
+    anchors = concept_anchor_tickers(args.out_dir, concepts)
+    income_by_symbol = group_income_rows(read_rows(os.path.join(args.out_dir, COMPANY_INCOME)))
+    events = {}
+    for concept, ticker in anchors.items():
+        dates, surprises = surprise_events(income_by_symbol.get(income_symbol_for(ticker), []))
+        if len(dates):
+            events[concept] = (dates, surprises)
+    if not events:
+        print(
+            f"No anchor with eps_surprise_pct and eps_reported_date in {COMPANY_INCOME}; "
+            "refresh it with scripts/update_company_financials.py. Nothing to backtest.",
+            file=sys.stderr,
+        )
+        return 1
+
+    start = time.perf_counter()
+    basket = basket_returns(trailing_return(closes, 1), membership)
+    rows = run_grid(days, basket, concepts, anchors, events, grid, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    rows.sort(key=lambda r: -(r["sharpe"] if r["sharpe"] is not None else float("-inf")))
+    out_path = os.path.join(args.out_dir, BACKTEST_FILE)
+    write_rows(out_path, BACKTEST_FIELDNAMES, rows)
+    configs = len(rows) and len({tuple(r[k] for k in grid) for r in rows})
+    print(
+        f"{configs} grid point(s) x {len(events)} concept(s) with anchor surprises = {len(rows)} run(s) "
+        f"in {elapsed:.2f} s; wrote {out_path}"
+    )
+    for row in rows[:5]:
+        print(
+            f"  {row['concept']} ({row['anchor_ticker']}) {row['signal']} >= {row['surprise_min']}%, "
+            f"delay {row['entry_delay']}, hold {row['hold_days']}, cost {row['cost_bps']} bps: "
+            f"sharpe {row['sharpe']}, total {row['total_return']}, trades {row['trades']}"
+        )
+    return 0
+
+
+def run_valuation(args: argparse.Namespace) -> int:
+    prices = read_columns(
+        os.path.join(args.out_dir, DAILY_PRICES),
+        ["stock_code", "交易日期", "收盤_價格_元"],
+    )
+    if not prices:
+        print(f"Missing {DAILY_PRICES} in {args.out_dir}", file=sys.stderr)
+        return 1
+    income_by_symbol = group_income_rows(read_rows(os.path.join(args.out_dir, COMPANY_INCOME)))
+    fx = FXTable.load(os.path.join(args.out_dir, FX_CACHE_FILE))
+
+    codes = prices["stock_code"]
+    dates = to_date_array(prices["交易日期"])
+    closes = to_float_array(prices["收盤_價格_元"])
+
+    tickers = sorted(set(codes.tolist()))
+    if args.ticker:
+        tickers = [t for t in tickers if t == args.ticker.upper()]
+        if not tickers:
+            print(f"No daily prices for {args.ticker.upper()}", file=sys.stderr)
+            return 1
+
+    out_path = os.path.join(args.out_dir, VALUATION_FILE)
+    existing = read_rows(out_path)
+    stored = {} if args.rebuild else stored_by_ticker(existing)
+    # Rows of tickers in scope are re-added below, up to their first changed bar.
+    kept = [row for row in existing if row.get("stock_code") not in tickers]
+
+    new_rows: List[Dict[str, object]] = []
+    for ticker in tickers:
+        symbol = income_symbol_for(ticker)
+        income_rows = income_by_symbol.get(symbol, [])
+        mask = codes == ticker
+        bar_dates, bar_closes = dates[mask], closes[mask]
+        order = np.argsort(bar_dates, kind="stable")
+        bar_dates, bar_closes = bar_dates[order], bar_closes[order]
+        if not len(bar_dates):
+            kept.extend(stored.get(ticker, {}).values())
+            continue
+
+        ttm = build_ttm_table(build_quarter_table(income_rows))
+        reported_currency = dominant_currency(
+            np.asarray([r.get("currency") or "" for r in income_rows], dtype=str)
+        )
+        eps_currency = eps_currency_for(symbol, reported_currency)
+        n = len(bar_dates)
+
+        def usd_factor(currency: str):
+            if currency == "USD":
+                return None
+            return fx.usd_per_unit(np.full(n, currency), bar_dates)
+
+        eps_factor = usd_factor(eps_currency)
+        ratio = adr_ratio_for(ticker)
+        if ratio != 1:
+            eps_factor = (np.ones(n) if eps_factor is None else eps_factor) * ratio
+
+        columns = valuation_columns(
+            bar_dates,
+            bar_closes,
+            ttm,
+            price_factor=usd_factor(currency_for_ticker(ticker)),
+            amount_factor=usd_factor(reported_currency),
+            eps_factor=eps_factor,
+        )
+        # Every bar is recomputed as arrays; rows are rebuilt from the first
+        # bar whose close, TTM record or FX-converted ratios differ from the
+        # stored row (e.g. a late filing or backfilled FX rate years back).
+        old = stored.get(ticker, {})
+        first = first_changed_bar(old, bar_dates, columns)
+        if first < n:
+            resume_key = str(bar_dates[first])
+            kept.extend(row for key, row in old.items() if key < resume_key)
+        else:
+            kept.extend(old.values())
+        rows = compute_valuation(ticker, bar_dates, columns, start=first)
+        new_rows.extend(rows)
+        since = f" from {bar_dates[first]}" if rows else ""
+        print(f"{ticker}: {len(rows)} bar(s) valued{since}, {len(ttm['end'])} TTM record(s)")
+
+    all_rows = kept + new_rows
+    all_rows.sort(key=lambda r: (r.get("stock_code", ""), r.get("交易日期", "")))
+    write_rows(out_path, VALUATION_FIELDNAMES, all_rows)
+    print(f"Wrote {len(new_rows)} new/updated rows ({len(all_rows)} total) to {out_path}")
+    return 0
+
+
+def run_validate(args: argparse.Namespace) -> int:
+    report = validate_directory(args.out_dir, files=args.file)
+    for name, info in report["files"].items():
+        status = f"{info['rules']} rule(s)" if info["checked"] else "no rules"
+        print(f"{name}: {info['rows']} rows, {status}")
+    for v in report["violations"]:
+        print(f"  [{v['severity'].upper()}] {v['file']} {v['rule']}: {v['count']} row(s) - {v['description']}")
+        for example in v["examples"]:
+            print(f"      {example}")
+    print(
+        f"Validation: {report['blocking']} blocking, {report['warnings']} warning row(s) "
+        f"in {report['elapsed_ms']} ms"
+    )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Report written to {args.report}")
+    failed = any(v["severity"] == BLOCKING for v in report["violations"])
+    if args.strict:
+        failed = failed or bool(report["violations"])
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analytics over concept stock CSVs")
+    parser.add_argument(
+        "--out-dir",
+        default=os.getcwd(),
+        help="Directory holding the raw_conceptstock_*.csv files (outputs are written here too)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    breadth = sub.add_parser("breadth", help="Per-concept breadth and relative strength of the Taiwan members")
+    breadth.add_argument("--rebuild", action="store_true", help="Recompute every day instead of appending new days")
+    breadth.set_defaults(func=run_breadth)
+
+    backtest = sub.add_parser("backtest", help="Grid backtest of concept baskets after anchor EPS surprises")
+    backtest.add_argument("--concept", action="append", help="Only this concept column (repeatable)")
+    backtest.add_argument("--signal", nargs="+", choices=["beat", "miss"], help="beat: long after a beat; miss: short after a miss")
+    backtest.add_argument("--surprise-min", type=float, nargs="+", help="Minimum |eps_surprise_pct| thresholds")
+    backtest.add_argument("--entry-delay", type=int, nargs="+", help="Sessions after the first reaction session")
+    backtest.add_argument("--hold-days", type=int, nargs="+", help="Holding periods in sessions")
+    backtest.add_argument("--cost-bps", type=float, nargs="+", help="Cost per entry/exit in basis points")
+    backtest.add_argument("--workers", type=int, default=1, help="Processes for the grid chunks (default: 1)")
+    backtest.set_defaults(func=run_backtest)
+
+    leadlag = sub.add_parser("leadlag", help="Lead-lag cross-correlation of US anchors vs. Taiwan members")
+    leadlag.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Trading days per window")
+    leadlag.add_argument("--step", type=int, default=DEFAULT_STEP, help="Trading days between window ends")
+    leadlag.add_argument("--max-lag", type=int, default=DEFAULT_MAX_LAG, help="Test lags -N..+N days")
+    leadlag.add_argument("--rebuild", action="store_true", help="Recompute every window instead of only new ones")
+    leadlag.set_defaults(func=run_leadlag)
+
+    fx = sub.add_parser("fx", help="Refresh the FX cache and write USD-normalized price/income CSVs")
+    fx.add_argument("--no-fetch", action="store_true", help="Use the cached FX series as-is")
+    fx.add_argument("--chart-url", default="", help="Override the Yahoo chart endpoint base URL")
+    fx.set_defaults(func=run_fx)
+
+    valuation = sub.add_parser("valuation", help="Daily P/E and P/S from prices and filed fundamentals")
+    valuation.add_argument("--ticker", help="Only update this price ticker (e.g., NVDA)")
+    valuation.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rewrite every bar instead of only bars from each ticker's first changed date",
+    )
+    valuation.set_defaults(func=run_valuation)
+
+    validate = sub.add_parser("validate", help="Run data-quality rules over the raw_conceptstock_*.csv files")
+    validate.add_argument("--report", help="Write the JSON report to this path")
+    validate.add_argument(
+        "--file",
+        action="append",
+        help="Only check this file name (repeatable, e.g. raw_conceptstock_daily.csv)",
+    )
+    validate.add_argument("--strict", action="store_true", help="Also fail on warnings")
+    validate.set_defaults(func=run_validate)
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
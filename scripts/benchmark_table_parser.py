@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark SEC segment table parsing on stored 10-K/10-Q documents.
+
+For each document segment parsing is timed four ways:
+  full        - every <table> tokenized with html.parser (the previous behaviour)
+  html.parser - revenue-screened blocks tokenized with html.parser
+  lxml        - revenue-screened blocks tokenized with lxml (if installed)
+  sections    - parse_segment_sections(): segment note windows only, as the
+                10-K/10-Q scanners run it
+
+The screened results are checked against the full parse, on the documents
+and on built-in synthetic cases the screen must not drop (IDENTITY_CASES).
+The section parse is reported separately: it may legitimately differ when a
+table outside the segment note (e.g. in MD&A) was the first revenue table of
+the document.
+
+Documents come from the filing store (src/external/filing_store.py) and/or
+HTML files given on the command line.
+
+Usage:
+    python3 scripts/benchmark_table_parser.py
+    python3 scripts/benchmark_table_parser.py --limit 20 --repeat 3
+    python3 scripts/benchmark_table_parser.py path/to/nvda-20250126.htm
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.external.filing_store import DEFAULT_STORE_DIR, FilingStore
+from src.external.html_tables import lxml_html
+from src.external.sec_edgar_client import SECEdgarClient
+
+# Synthetic documents every run checks for identity with the full parse.
+IDENTITY_CASES = [
+    (
+        # Segments as columns, upper-case REVENUE row, amounts under 1,000.
+        "synthetic:segment-columns-upper",
+        "<html><body><table>"
+        "<tr><td>For the year ended 2024</td></tr>"
+        "<tr><td></td><td>Compute</td><td>Networking</td><td>Total</td></tr>"
+        "<tr><td>REVENUE</td><td>$</td><td>612</td><td>$</td><td>388</td><td>1,000</td></tr>"
+        "<tr><td>Operating income</td><td>210</td><td>95</td><td>305</td></tr>"
+        "</table></body></html>",
+    ),
+]
+
+MODES = [
+    ("full", lambda html: SECEdgarClient.parse_segment_tables(html, screen=None, backend="html.parser")),
+    ("html.parser", lambda html: SECEdgarClient.parse_segment_tables(html, backend="html.parser")),
+    ("lxml", lambda html: SECEdgarClient.parse_segment_tables(html, backend="lxml")),
+    ("sections", SECEdgarClient.parse_segment_sections),
+]
+
+
+def load_documents(args: argparse.Namespace) -> list:
+    docs = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            docs.append((os.path.basename(path), f.read().decode("utf-8", errors="replace")))
+    if not args.files or args.store_too:
+        store = FilingStore(args.store)
+        for key in store.keys():
+            if not key.lower().endswith((".htm", ".html")) or key.lower().endswith("-index.htm"):
+                continue
+            data = store.get(key)
+            if data is not None:
+                docs.append((key, data.decode("utf-8", errors="replace")))
+    return docs[: args.limit] if args.limit else docs
+
+
+def timed(fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SEC segment table parsing")
+    parser.add_argument("files", nargs="*", help="HTML documents to parse")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("SEC_FILING_STORE_DIR") or DEFAULT_STORE_DIR,
+        help=f"Filing store directory (default: $SEC_FILING_STORE_DIR or {DEFAULT_STORE_DIR})",
+    )
+    parser.add_argument("--store-too", action="store_true", help="Also read the store when files are given")
+    parser.add_argument("--limit", type=int, default=0, help="Parse at most this many documents")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per document (best time is kept)")
+    args = parser.parse_args()
+
+    docs = load_documents(args)
+    if not docs:
+        print(f"No HTML documents found (store: {args.store}); checking the synthetic cases only")
+    docs += IDENTITY_CASES
+    modes = [(name, parse) for name, parse in MODES if name != "lxml" or lxml_html is not None]
+    if lxml_html is None:
+        print("lxml is not installed; skipping the lxml backend")
+
+    totals = {name: 0.0 for name, _ in modes}
+    mismatches = section_diffs = 0
+    print(f"{'document':<48} {'MB':>6} " + " ".join(f"{name:>12}" for name, _ in modes) + "  segments (full/sections)")
+    for name, html in docs:
+        results = {}
+        row = []
+        for mode, parse in modes:
+            results[mode], elapsed = timed(lambda: parse(html), args.repeat)
+            totals[mode] += elapsed
+            row.append(f"{elapsed * 1000:>10.1f}ms")
+        same = all(results[mode] == results["full"] for mode, _ in modes if mode != "sections")
+        mismatches += not same
+        section_diffs += results["sections"] != results["full"]
+        print(
+            f"{name[-48:]:<48} {len(html) / 1e6:>6.2f} " + " ".join(row)
+            + f"  {len(results['full'])}/{len(results['sections'])}{'' if same else '  MISMATCH'}"
+        )
+
+    print(f"\n{len(docs)} document(s): " + ", ".join(
+        f"{mode} {totals[mode]:.2f}s ({totals['full'] / totals[mode]:.1f}x)" if totals[mode] else f"{mode} 0s"
+        for mode, _ in modes
+    ))
+    if section_diffs:
+        print(f"  {section_diffs} document(s) where the section parse differs from the full parse")
+    if mismatches:
+        print(f"  Warning: {mismatches} document(s) parsed differently from the full parse")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
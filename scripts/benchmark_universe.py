@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the --universe companyinfo pipeline at multiples of the current universe.
+
+Offline stages (no network) use synthetic bars sized like the real file:
+  plan   - plan_batches() over the stored latest dates
+  merge  - merge_columns(): stored history + one fresh day per symbol
+  write  - write_universe_partitions() over already stored partitions (only
+           the years the fresh day changed are rewritten)
+
+With --chart-url the fetch stage is also timed against that chart endpoint
+(e.g. a local stand-in server), for each --workers value.
+
+Usage:
+    python3 scripts/benchmark_universe.py
+    python3 scripts/benchmark_universe.py --scales 1 10 --days 660
+    python3 scripts/benchmark_universe.py --scales 1 --chart-url http://127.0.0.1:8769/chart --workers 1 4 8
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.universe_prices import (
+    COMPANYINFO_FILE,
+    DEFAULT_BATCH_SIZE,
+    bars_to_columns,
+    default_request_end,
+    fetch_batch_chart,
+    fetch_universe,
+    last_dates_by_symbol,
+    load_companyinfo_universe,
+    merge_columns,
+    plan_batches,
+    write_universe_partitions,
+)
+
+FIELDNAMES = [
+    "stock_code",
+    "company_name",
+    "交易日期",
+    "開盤_價格_元",
+    "收盤_價格_元",
+    "漲跌_價格_元",
+    "漲跌_pct",
+    "file_type",
+    "source_file",
+    "download_success",
+    "download_timestamp",
+    "process_timestamp",
+    "stage1_process_timestamp",
+]
+
+
+def synthetic_symbols(base: list, scale: int) -> list:
+    if scale == 1:
+        return list(base)
+    return [f"{9000 + i}.TW" for i in range(len(base) * scale)]
+
+
+def synthetic_bars(symbols: list, days: np.ndarray, rng: np.random.Generator) -> dict:
+    bars = {}
+    for symbol in symbols:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+        spread = np.abs(rng.normal(0, 0.01, len(days)))
+        bars[symbol] = (
+            days,
+            closes * (1 + rng.normal(0, 0.005, len(days))),
+            closes,
+            closes * (1 + spread),
+            closes * (1 - spread),
+            rng.integers(1_000, 1_000_000, len(days)).astype(float),
+        )
+    return bars
+
+
+def stored_columns(bars: dict) -> dict:
+    """Round-trip through strings so the merge sees what read_columns() returns."""
+    cols = bars_to_columns(bars, {}, {}, "YAHOO_FINANCE_DAILY")
+    return {k: (v.astype(str) if v.dtype.kind == "f" else v.astype(str)) for k, v in cols.items()}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run_offline(symbols: list, days_count: int, batch_size: int) -> None:
+    rng = np.random.default_rng(0)
+    end = np.datetime64(date.today(), "D")
+    days = np.busday_offset(end, -np.arange(days_count)[::-1], roll="backward")
+    existing = stored_columns(synthetic_bars(symbols, days[:-1], rng))
+    fresh = bars_to_columns(synthetic_bars(symbols, days[-2:], rng), {}, {}, "YAHOO_FINANCE_DAILY")
+
+    last, t_last = timed(lambda: last_dates_by_symbol(existing))
+    batches, t_plan = timed(lambda: plan_batches(symbols, last, batch_size))
+    merged, t_merge = timed(lambda: merge_columns(existing, fresh, FIELDNAMES, keep_symbols=symbols))
+    with tempfile.TemporaryDirectory() as tmp:
+        write_universe_partitions(tmp, merge_columns(existing, {}, FIELDNAMES), FIELDNAMES)
+        years, t_write = timed(lambda: write_universe_partitions(tmp, merged, FIELDNAMES))
+        size_mb = sum(os.path.getsize(p) for p in glob.glob(os.path.join(tmp, "*", "*.csv"))) / 1e6
+
+    rows = len(merged["stock_code"])
+    print(
+        f"{len(symbols):>6} symbols x {days_count} days = {rows:>9} rows | "
+        f"last-dates {t_last * 1000:7.1f} ms | plan {t_plan * 1000:6.1f} ms ({len(batches)} batches) | "
+        f"merge {t_merge * 1000:8.1f} ms | write {t_write * 1000:8.1f} ms ({size_mb:.1f} MB, rewrote {','.join(years)})"
+    )
+
+
+def run_fetch(symbols: list, chart_url: str, batch_size: int, workers_list: list) -> None:
+    start = date.today() - timedelta(days=7)
+    batches = plan_batches(symbols, {}, batch_size, start_date=start)
+    for workers in workers_list:
+        def fetch(batch, s, e):
+            return fetch_batch_chart(batch, s, e, chart_url)
+
+        (bars, errors), elapsed = timed(
+            lambda: fetch_universe(batches, fetch, default_request_end(), workers)
+        )
+        print(
+            f"fetch {len(symbols)} symbols, batch {batch_size}, {workers} worker(s): "
+            f"{elapsed:.2f} s ({len(bars)} ok, {len(errors)} failed, {len(symbols) / elapsed:.1f} symbols/s)"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the companyinfo universe price pipeline")
+    parser.add_argument("--companyinfo", default=COMPANYINFO_FILE, help="raw_companyinfo.csv path")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Universe multiples to test")
+    parser.add_argument("--days", type=int, default=660, help="Stored trading days per symbol")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--chart-url", default="", help="Also time the fetch stage against this chart endpoint")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="Worker counts for the fetch stage")
+    args = parser.parse_args()
+
+    base = sorted(load_companyinfo_universe(args.companyinfo))
+    if not base:
+        print(f"No members found in {args.companyinfo}", file=sys.stderr)
+        return 1
+
+    for scale in args.scales:
+        run_offline(synthetic_symbols(base, scale), args.days, args.batch_size)
+    if args.chart_url:
+        for scale in args.scales:
+            run_fetch(synthetic_symbols(base, scale), args.chart_url, args.batch_size, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
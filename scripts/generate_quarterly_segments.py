@@ -67,6 +67,7 @@ def is_quarter_released(fy: int, quarter: int, latest_fy: int, latest_q: int) ->
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.external.pattern_scan import slowest_rules
 from src.external.sec_edgar_client import SECEdgarClient, COMPANY_CIK
 from src.segment_config import UNIFIED_PRODUCT_SEGMENTS
 
@@ -237,6 +238,12 @@ def fetch_8k_segments(symbols: list, quarters: int = 20) -> list:
         except Exception as e:
             print(f"    Error: {e}")
 
+    slowest = slowest_rules(5)
+    if slowest:
+        print("  Slowest 8-K segment patterns:")
+        for label, runs, seconds, matches in slowest:
+            print(f"    {label}: {seconds * 1000:.1f} ms over {runs} run(s), {matches} match(es)")
+
     return results
 
 
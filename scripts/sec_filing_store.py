@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Maintain the local SEC filing store (src/external/filing_store.py).
+
+Subcommands:
+- stats: number of documents and stored size
+- pack: write the store to one tar (for CI caches; blobs are already compressed)
+- unpack: merge a packed tar into the store
+- evict: shrink the store to a size limit (least recently used first)
+
+Usage:
+    python3 scripts/sec_filing_store.py stats
+    python3 scripts/sec_filing_store.py pack --output sec_filings.tar
+    python3 scripts/sec_filing_store.py unpack --input sec_filings.tar
+    python3 scripts/sec_filing_store.py evict --max-mb 256
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.external.filing_store import DEFAULT_MAX_MB, DEFAULT_STORE_DIR, FilingStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Maintain the local SEC filing store")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("SEC_FILING_STORE_DIR") or DEFAULT_STORE_DIR,
+        help=f"Store directory (default: $SEC_FILING_STORE_DIR or {DEFAULT_STORE_DIR})",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Print store statistics")
+    pack = sub.add_parser("pack", help="Write the store to a tar file")
+    pack.add_argument("--output", required=True, help="Tar file to write")
+    unpack = sub.add_parser("unpack", help="Merge a packed tar file into the store")
+    unpack.add_argument("--input", required=True, help="Tar file to read")
+    evict = sub.add_parser("evict", help="Evict least recently used documents")
+    evict.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB, help="Size limit in MB")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    store = FilingStore(args.store)
+
+    if args.command == "pack":
+        count = store.pack(args.output)
+        print(f"Packed {count} blob(s) into {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+    elif args.command == "unpack":
+        if not os.path.exists(args.input):
+            print(f"{args.input} not found; nothing to unpack.")
+            return 0
+        added = store.unpack(args.input)
+        print(f"Unpacked {added} new document(s) from {args.input}")
+    elif args.command == "evict":
+        removed = store.evict(int(args.max_mb * 1024 * 1024))
+        store.save()
+        print(f"Evicted {removed} document(s)")
+    print(f"Store {args.store}: {store.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,12 +59,14 @@ INCOME_FIELDNAMES = [
     "non_gaap_eps",
     "eps_estimate",
     "eps_surprise_pct",
+    "eps_reported_date",
     "rpo",
     "capex",
     "gross_margin",
     "operating_margin",
     "net_margin",
     "revenue_yoy_pct",
+    "filed_date",
     "currency",
     "source",
     "validation_status",
@@ -266,6 +268,7 @@ def fetch_income_sec_edgar(
                 "operating_margin": record.get("operating_margin"),
                 "net_margin": record.get("net_margin"),
                 "revenue_yoy_pct": None,
+                "filed_date": record.get("filed"),
                 "currency": record.get("currency", "USD"),
                 "source": record.get("source", "SEC"),
                 "validation_status": None,
@@ -837,6 +840,7 @@ def _merge_non_gaap_eps(
                     row["non_gaap_eps"] = hit.get("non_gaap_eps")
                     row["eps_estimate"] = hit.get("eps_estimate")
                     row["eps_surprise_pct"] = hit.get("eps_surprise_pct")
+                    row["eps_reported_date"] = hit.get("reported_date")
                     break
             except (TypeError, ValueError):
                 continue
@@ -850,13 +854,14 @@ def update_income_statements(
     sleep: float = 1.0,
     cross_check: bool = True,
     include_quarterly: bool = False,
+    sec_options: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Update income statement data for specified symbols."""
     period_label = "annual + quarterly" if include_quarterly else "annual"
     print(f"Updating income statements ({period_label}) for {len(symbols)} symbols...")
 
     # Initialize clients
-    sec_client = SECEdgarClient()
+    sec_client = SECEdgarClient(**(sec_options or {}))
     av_client = None
     fmp_client = None
 
@@ -945,6 +950,8 @@ def update_income_statements(
     # Write output
     write_csv(out_path, INCOME_FIELDNAMES, final_rows)
     print(f"  Wrote {len(final_rows)} records to {out_path}")
+    if sec_client.cache is not None and sec_client.bulk_facts is None:
+        print(f"  SEC companyfacts cache: {sec_client.cache.summary()}")
 
 
 def update_segment_revenue(
@@ -954,13 +961,14 @@ def update_segment_revenue(
     sleep: float = 1.0,
     years: int = 10,
     include_quarterly: bool = False,
+    sec_options: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Update segment revenue data for specified symbols."""
     period_label = "annual + quarterly" if include_quarterly else "annual"
     print(f"Updating segment revenue ({period_label}) for {len(symbols)} symbols...")
 
     # Initialize clients
-    sec_client = SECEdgarClient() if "sec-edgar" in sources else None
+    sec_client = SECEdgarClient(**(sec_options or {})) if "sec-edgar" in sources else None
     fmp_client = None
     if "fmp" in sources:
         fmp_key = load_fmp_key()
@@ -1028,6 +1036,8 @@ def update_segment_revenue(
     # Write output
     write_csv(out_path, REVENUE_FIELDNAMES, final_rows)
     print(f"  Wrote {len(final_rows)} records to {out_path}")
+    if sec_client is not None and sec_client.cache is not None and sec_client.bulk_facts is None:
+        print(f"  SEC companyfacts cache: {sec_client.cache.summary()}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -1086,6 +1096,20 @@ def parse_args() -> argparse.Namespace:
         default="annual",
         help="Period: annual (10-K/FY only), quarterly (include 10-Q), all (both) (default: annual)",
     )
+    parser.add_argument(
+        "--sec-bulk-facts",
+        help="Local SEC companyfacts.zip; XBRL facts are streamed from it instead of the API",
+    )
+    parser.add_argument(
+        "--sec-bulk-submissions",
+        help="Local SEC submissions.zip; filing lists are read from it instead of the API",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes parsing SEC 10-K/10-Q tables while downloads continue (default: core count)",
+    )
 
     return parser.parse_args()
 
@@ -1123,9 +1147,22 @@ def main() -> int:
     # Determine period
     include_quarterly = args.period in ("quarterly", "all")
 
+    # Bulk archives replace the per-company companyfacts/submissions requests.
+    sec_options = {}
+    for option, path in (("bulk_facts", args.sec_bulk_facts), ("bulk_submissions", args.sec_bulk_submissions)):
+        if path:
+            if not os.path.exists(path):
+                print(f"Error: {path} not found", file=sys.stderr)
+                return 1
+            sec_options[option] = path
+    if args.parse_workers is not None:
+        sec_options["parse_workers"] = args.parse_workers
+
     print(f"Sources: {', '.join(sources)}")
     print(f"Data types: {', '.join(data_types)}")
     print(f"Period: {args.period}")
+    for option, value in sec_options.items():
+        print(f"SEC {option.replace('_', ' ')}: {value}")
     print(f"Symbols: {', '.join(symbols)}")
     print()
 
@@ -1139,6 +1176,7 @@ def main() -> int:
             sleep=args.sleep,
             cross_check=not args.no_cross_check,
             include_quarterly=include_quarterly,
+            sec_options=sec_options,
         )
 
     # Update segment revenue
@@ -1155,6 +1193,7 @@ def main() -> int:
             sleep=args.sleep,
             years=args.years,
             include_quarterly=include_quarterly,
+            sec_options=sec_options,
         )
 
     print("\nDone!")
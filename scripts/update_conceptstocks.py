@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import gzip
+import io
 import json
 import os
 import re
@@ -11,6 +13,31 @@ import urllib.request
 from typing import Dict, List, Optional, Tuple
 from datetime import date, datetime, timedelta
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.chart_series import CHARTS_DIR, update_chart_series
+from src.hedged_fetch import LATENCY_STATE_FILE, HedgedFetcher, LatencyStore
+from src.price_guard import GUARD_STATE_FILE, PriceGuard, append_quarantine
+from src.universe_prices import (
+    COMPANYINFO_FILE,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_WORKERS,
+    UNIVERSE_OUTPUT_DIR,
+    bars_to_columns,
+    default_request_end,
+    fetch_batch_chart,
+    fetch_batch_yfinance,
+    fetch_universe,
+    last_dates_by_symbol,
+    load_companyinfo_universe,
+    merge_columns,
+    plan_batches,
+    read_universe_columns,
+    write_universe_partitions,
+)
+
 
 def mask_api_key(url: str) -> str:
     """Mask API key in URL for safe storage in CSV files."""
@@ -61,32 +88,73 @@ ENDPOINTS = {
     "daily": "TIME_SERIES_DAILY",
     "weekly": "TIME_SERIES_WEEKLY",
     "monthly": "TIME_SERIES_MONTHLY",
+    "intraday": "TIME_SERIES_INTRADAY",
 }
 
 YAHOO_INTERVALS = {
     "daily": "1d",
     "weekly": "1wk",
     "monthly": "1mo",
+    "intraday": "60m",
 }
 
 YAHOO_FILE_TYPES = {
     "daily": "YAHOO_FINANCE_DAILY",
     "weekly": "YAHOO_FINANCE_WEEKLY",
     "monthly": "YAHOO_FINANCE_MONTHLY",
+    "intraday": "YAHOO_FINANCE_INTRADAY",
 }
 
 DATE_LABEL = {
     "daily": "交易日期",
     "weekly": "交易週",
     "monthly": "交易月份",
+    "intraday": "交易時間",
 }
 
 OUTPUT_FILES = {
     "daily": "raw_conceptstock_daily.csv",
     "weekly": "raw_conceptstock_weekly.csv",
     "monthly": "raw_conceptstock_monthly.csv",
+    # Directory, not a file: {interval}/{YYYY-MM-DD}.csv.gz, one partition per session
+    "intraday": "raw_conceptstock_intraday",
+}
+
+# Anchor tickers whose earnings moves drive the Taiwan concept names overnight.
+# Intraday bars are ~100x the daily volume, so only these are tracked.
+INTRADAY_TICKERS = {
+    "NVDA": "NVIDIA Corporation",
+    "AVGO": "Broadcom Inc.",
+    "MU": "Micron Technology, Inc.",
+}
+
+# Supported intraday bar sizes (Yahoo interval -> Alpha Vantage interval) and
+# how far back Yahoo serves each one, used when a ticker has no partitions yet.
+INTRADAY_INTERVALS = {
+    "60m": "60min",
+    "15m": "15min",
+}
+INTRADAY_MAX_LOOKBACK_DAYS = {
+    "60m": 729,
+    "15m": 59,
+}
+
+# Weekly/monthly Yahoo runs without --start-date only re-request the last few
+# stored periods instead of period="max". The newest stored bar may have been
+# written mid-week/mid-month and is always overwritten; the older overlap bars
+# must match storage, otherwise (split, price revision) a full refetch is done.
+OVERLAP_PERIODS = {
+    "weekly": 3,
+    "monthly": 2,
 }
 
+# Relative close-price tolerance for the overlap consistency check.
+OVERLAP_CLOSE_TOLERANCE = 1e-4
+
+# Alpha Vantage outputsize=compact holds the latest 100 daily bars; starts
+# further back than this many calendar days need outputsize=full.
+AV_COMPACT_DAYS = 140
+
 FIELDNAMES = {
     "daily": [
         "stock_code",
@@ -133,6 +201,21 @@ FIELDNAMES = {
         "process_timestamp",
         "stage1_process_timestamp",
     ],
+    "intraday": [
+        "stock_code",
+        "company_name",
+        "交易時間",
+        "開盤_價格_元",
+        "收盤_價格_元",
+        "漲跌_價格_元",
+        "漲跌_pct",
+        "file_type",
+        "source_file",
+        "download_success",
+        "download_timestamp",
+        "process_timestamp",
+        "stage1_process_timestamp",
+    ],
 }
 
 
@@ -184,6 +267,12 @@ def build_rows(series: Dict[str, Dict[str, str]], cadence: str) -> List[Dict[str
     for date_str, v in items:
         if cadence == "monthly":
             date_key = date_str[:7]
+        elif cadence == "intraday":
+            date_key = date_str[:16]
+        elif cadence == "weekly":
+            # Alpha Vantage keys a holiday-shortened week by its last session;
+            # stored weekly rows (and Yahoo rows) use the week-ending Friday.
+            date_key = to_week_ending_friday(datetime.strptime(date_str[:10], "%Y-%m-%d").date()).isoformat()
         else:
             date_key = date_str
         rows.append(
@@ -191,6 +280,9 @@ def build_rows(series: Dict[str, Dict[str, str]], cadence: str) -> List[Dict[str
                 "date_key": date_key,
                 "open": to_float(v.get("1. open")),
                 "close": to_float(v.get("4. close")),
+                "high": to_float(v.get("2. high")),
+                "low": to_float(v.get("3. low")),
+                "volume": to_float(v.get("5. volume") or v.get("6. volume")),
             }
         )
     return rows
@@ -281,7 +373,13 @@ def merge_and_recalc(
     cadence: str,
     file_type: str,
     source_file: str,
+    seed_close: Optional[float] = None,
 ) -> List[Dict[str, object]]:
+    """Merge new rows into existing rows and recompute change fields for the ticker.
+
+    seed_close is the close preceding the first row in `existing`, used when the
+    ticker's history is split across partitions (intraday).
+    """
     date_col = DATE_LABEL[cadence]
     now = datetime.now()
     download_ts = now.strftime("%Y-%m-%d %H:%M:%S CST")
@@ -311,7 +409,7 @@ def merge_and_recalc(
     ]
     ticker_rows.sort(key=lambda x: x[date_col])
 
-    prev_close = None
+    prev_close = seed_close
     for row in ticker_rows:
         close_p = to_float(row.get("收盤_價格_元"))
         change = None
@@ -382,6 +480,123 @@ def filter_rows_by_date(
     return filtered
 
 
+def open_guard(args: argparse.Namespace) -> Optional[PriceGuard]:
+    """Load the anomaly guard unless --no-guard, applying any --reset-guard first."""
+    if args.no_guard:
+        return None
+    guard = PriceGuard(os.path.join(args.out_dir, GUARD_STATE_FILE))
+    for ticker in args.reset_guard or []:
+        removed = guard.reset(ticker=None if ticker == "all" else ticker)
+        print(f"Reset anomaly guard state for {ticker} ({removed} entr{'y' if removed == 1 else 'ies'}).")
+    return guard
+
+
+def quarantine_path(out_dir: str, state_key: str) -> str:
+    return os.path.join(out_dir, f"raw_conceptstock_{state_key}_quarantine.csv")
+
+
+def guard_rows(
+    guard: Optional[PriceGuard],
+    state_key: str,
+    ticker: str,
+    rows: List[Dict[str, object]],
+    out_dir: str,
+    source_file: str,
+    existing: Dict[Tuple[str, str], Dict[str, object]] = None,
+) -> List[Dict[str, object]]:
+    """Run fetched rows through the anomaly guard; quarantined rows go to a side file."""
+    if guard is None:
+        return rows
+    if existing is not None and not guard.has_state(state_key, ticker):
+        guard.bootstrap(
+            state_key,
+            ticker,
+            (
+                (k[1], row.get("開盤_價格_元"), row.get("收盤_價格_元"))
+                for k, row in existing.items()
+                if k[0] == ticker
+            ),
+        )
+    reanchors, releases = len(guard.reanchored), len(guard.released)
+    accepted, flagged = guard.screen(state_key, ticker, rows)
+    released = [(ticker, key) for _, _, key in guard.released[releases:]]
+    for _, _, key in guard.reanchored[reanchors:]:
+        print(
+            f"{ticker}: {state_key} guard re-anchored at {key} after a persistent level change; "
+            f"released {len(released)} quarantined row(s)"
+        )
+    path = quarantine_path(out_dir, state_key)
+    if flagged or released:
+        append_quarantine(path, flagged, source_file, released)
+    if flagged:
+        preview = ", ".join(f"{r['date_key']}({r['reasons']})" for r in flagged[:5])
+        print(f"{ticker}: quarantined {len(flagged)} {state_key} row(s) to {path}: {preview}")
+    return accepted
+
+
+def overlap_window_start(
+    existing: Dict[Tuple[str, str], Dict[str, object]],
+    ticker: str,
+    cadence: str,
+) -> Optional[date]:
+    """Return the first day of the weekly/monthly overlap window for a ticker.
+
+    Returns None when the ticker has too little stored history, in which case
+    the caller should fall back to a full-history request.
+    """
+    overlap = OVERLAP_PERIODS.get(cadence)
+    if not overlap:
+        return None
+    stored_keys = sorted(k[1] for k in existing if k[0] == ticker)
+    if len(stored_keys) <= overlap:
+        return None
+
+    first_key = stored_keys[-(overlap + 1)]
+    try:
+        if cadence == "monthly":
+            return datetime.strptime(first_key, "%Y-%m").date()
+        # Weekly keys are week-ending Fridays; Yahoo 1wk bars start on Monday.
+        friday = datetime.strptime(first_key, "%Y-%m-%d").date()
+        return friday - timedelta(days=4)
+    except ValueError:
+        return None
+
+
+def overlap_matches_existing(
+    existing: Dict[Tuple[str, str], Dict[str, object]],
+    new_rows: List[Dict[str, object]],
+    ticker: str,
+    tolerance: float = OVERLAP_CLOSE_TOLERANCE,
+) -> bool:
+    """Check that refetched overlap bars agree with the stored closes.
+
+    The newest stored bar is skipped because it may have been captured before
+    its week/month closed. Returns False when there is nothing to compare, so
+    a provider response that does not reach back into storage also escalates.
+    """
+    stored_keys = sorted(k[1] for k in existing if k[0] == ticker)
+    if not stored_keys:
+        return False
+    latest_key = stored_keys[-1]
+
+    compared = 0
+    for row in new_rows:
+        date_key = row["date_key"]
+        if date_key >= latest_key:
+            continue
+        stored = existing.get((ticker, date_key))
+        if stored is None:
+            continue
+        stored_close = to_float(stored.get("收盤_價格_元"))
+        new_close = to_float(row.get("close"))
+        if stored_close is None or new_close is None:
+            return False
+        if abs(new_close - stored_close) > tolerance * max(abs(stored_close), 1.0):
+            return False
+        compared += 1
+    return compared > 0
+
+
 def prune_inactive_tickers(
     out_dir: str,
     cadence: str,
@@ -416,11 +631,19 @@ def is_full_outputsize_premium_error(message: str) -> bool:
     )
 
 
+def alphavantage_outputsize(start: Optional[date]) -> str:
+    """Smallest daily outputsize whose bars reach back to start (None = full history)."""
+    if start is not None and (date.today() - start).days < AV_COMPACT_DAYS:
+        return "compact"
+    return "full"
+
+
 def fetch_rows_from_alphavantage(
     ticker: str,
     cadence: str,
     api_key: str,
     daily_outputsize: str = "compact",
+    intraday_interval: str = "60m",
 ) -> Tuple[List[Dict[str, object]], str, str]:
     if not api_key:
         raise RuntimeError("Missing ALPHAVANTAGE_API_KEY for Alpha Vantage provider.")
@@ -431,7 +654,10 @@ def fetch_rows_from_alphavantage(
     )
     request_outputsize = daily_outputsize
     url = base_url
-    if cadence == "daily":
+    if cadence == "intraday":
+        base_url = f"{base_url}&interval={INTRADAY_INTERVALS[intraday_interval]}"
+        url = base_url
+    if cadence in ("daily", "intraday"):
         url = f"{base_url}&outputsize={request_outputsize}"
 
     data = fetch_json(url)
@@ -455,61 +681,125 @@ def fetch_rows_from_alphavantage(
     return new_rows, function, masked_url
 
 
+def history_arrays_to_rows(
+    dates: np.ndarray,
+    opens: np.ndarray,
+    closes: np.ndarray,
+    cadence: str,
+    highs: Optional[np.ndarray] = None,
+    lows: Optional[np.ndarray] = None,
+    volumes: Optional[np.ndarray] = None,
+) -> List[Dict[str, object]]:
+    """Convert column arrays (exchange-local datetime64 dates, float prices) into price rows.
+
+    Date keys are formatted for the whole column at once; NaN prices become None.
+    Intraday keys keep minute resolution ("YYYY-MM-DD HH:MM"). High/low/volume,
+    when given, are carried for the anomaly guard only.
+    """
+    if cadence == "intraday":
+        stamps = np.asarray(dates).astype("datetime64[m]")
+        keys = np.char.replace(np.datetime_as_string(stamps, unit="m"), "T", " ")
+    elif cadence == "monthly":
+        months = np.asarray(dates).astype("datetime64[M]")
+        keys = np.datetime_as_string(months, unit="M")
+    elif cadence == "weekly":
+        # 1970-01-01 was a Thursday, so weekday (Mon=0) is (days + 3) % 7.
+        days = np.asarray(dates).astype("datetime64[D]").astype(np.int64)
+        fridays = days + (4 - (days + 3) % 7) % 7
+        keys = np.datetime_as_string(fridays.astype("datetime64[D]"), unit="D")
+    else:
+        keys = np.datetime_as_string(np.asarray(dates).astype("datetime64[D]"), unit="D")
+
+    def column(values: np.ndarray) -> List[Optional[float]]:
+        values = np.asarray(values, dtype=float)
+        return np.where(np.isnan(values), None, values).tolist()
+
+    open_list = column(opens)
+    close_list = column(closes)
+    extra = [
+        (name, column(values))
+        for name, values in (("high", highs), ("low", lows), ("volume", volumes))
+        if values is not None
+    ]
+
+    key_list = keys.tolist()
+    order = np.argsort(keys, kind="stable")
+    rows = []
+    for i in order.tolist():
+        row = {"date_key": key_list[i], "open": open_list[i], "close": close_list[i]}
+        for name, values in extra:
+            row[name] = values[i]
+        rows.append(row)
+    return rows
+
+
 def fetch_rows_from_yahoo(
     ticker: str,
     cadence: str,
     start_date: date = None,
     end_date: date = None,
+    client: str = "yfinance",
+    chart_base_url: str = None,
+    intraday_interval: str = "60m",
 ) -> Tuple[List[Dict[str, object]], str, str]:
-    try:
-        import yfinance as yf
-    except ImportError as exc:
-        raise RuntimeError(
-            "Missing dependency 'yfinance'. Install it with: pip install yfinance"
-        ) from exc
-
-    interval = YAHOO_INTERVALS[cadence]
-    history_kwargs = {
-        "interval": interval,
-        "auto_adjust": False,
-        "actions": False,
-    }
-    if start_date or end_date:
-        if start_date:
-            history_kwargs["start"] = start_date.isoformat()
-        if end_date:
-            history_kwargs["end"] = (end_date + timedelta(days=1)).isoformat()
-    else:
-        history_kwargs["period"] = "max"
+    interval = intraday_interval if cadence == "intraday" else YAHOO_INTERVALS[cadence]
+    request_end = end_date + timedelta(days=1) if end_date else None
 
-    history = yf.Ticker(ticker).history(**history_kwargs)
-    if history is None or history.empty:
-        raise RuntimeError(f"No Yahoo Finance data returned for {ticker} ({cadence}).")
+    if client == "chart":
+        from src.external.yahoo_chart_client import YahooChartClient
 
-    rows = []
-    for idx, row in history.iterrows():
-        date_obj = idx.date()
-        if cadence == "monthly":
-            date_key = date_obj.strftime("%Y-%m")
-        elif cadence == "weekly":
-            date_key = to_week_ending_friday(date_obj).isoformat()
+        history = YahooChartClient(base_url=chart_base_url).get_history(
+            ticker, interval, start=start_date, end=request_end
+        )
+        if not len(history["date"]):
+            raise RuntimeError(f"No Yahoo Finance data returned for {ticker} ({cadence}).")
+        dates = history["datetime"] if cadence == "intraday" else history["date"]
+        opens, closes = history["open"], history["close"]
+        highs, lows, volumes = history["high"], history["low"], history["volume"]
+        source_prefix = "yahoo-chart"
+    else:
+        try:
+            import yfinance as yf
+        except ImportError as exc:
+            raise RuntimeError(
+                "Missing dependency 'yfinance'. Install it with: pip install yfinance"
+            ) from exc
+
+        history_kwargs = {
+            "interval": interval,
+            "auto_adjust": False,
+            "actions": False,
+        }
+        if start_date or end_date:
+            if start_date:
+                history_kwargs["start"] = start_date.isoformat()
+            if request_end:
+                history_kwargs["end"] = request_end.isoformat()
         else:
-            date_key = date_obj.isoformat()
-        rows.append(
-            {
-                "date_key": date_key,
-                "open": to_float(row.get("Open")),
-                "close": to_float(row.get("Close")),
-            }
+            history_kwargs["period"] = "max"
+
+        history = yf.Ticker(ticker).history(**history_kwargs)
+        if history is None or history.empty:
+            raise RuntimeError(f"No Yahoo Finance data returned for {ticker} ({cadence}).")
+        if cadence == "intraday":
+            # Drop the tz but keep exchange-local wall time for the bar keys.
+            dates = history.index.tz_localize(None).to_numpy()
+        else:
+            dates = np.asarray(history.index.date, dtype="datetime64[D]")
+        opens = history["Open"].to_numpy(dtype=float, na_value=np.nan)
+        closes = history["Close"].to_numpy(dtype=float, na_value=np.nan)
+        highs, lows, volumes = (
+            history[col].to_numpy(dtype=float, na_value=np.nan) for col in ("High", "Low", "Volume")
         )
+        source_prefix = "yfinance"
 
-    rows.sort(key=lambda x: x["date_key"])
+    rows = history_arrays_to_rows(dates, opens, closes, cadence, highs, lows, volumes)
     source_bits = [f"interval={interval}"]
     if start_date:
         source_bits.append(f"start={start_date.isoformat()}")
     if end_date:
         source_bits.append(f"end={end_date.isoformat()}")
-    source_file = f"yfinance:{ticker}?" + "&".join(source_bits)
+    source_file = f"{source_prefix}:{ticker}?" + "&".join(source_bits)
     return rows, YAHOO_FILE_TYPES[cadence], source_file
 
 
@@ -634,8 +924,37 @@ def update_for_ticker(
     end_date: date = None,
     verify_against_alphavantage: bool = False,
     verify_close_tolerance: float = 0.05,
+    full_refetch: bool = False,
+    yahoo_client: str = "yfinance",
+    yahoo_chart_url: str = None,
+    intraday_interval: str = "60m",
+    guard: Optional[PriceGuard] = None,
+    hedger: Optional[HedgedFetcher] = None,
 ) -> Optional[Dict[str, object]]:
+    if cadence == "intraday":
+        update_intraday_for_ticker(
+            ticker=ticker,
+            name=name,
+            api_key=api_key,
+            out_dir=out_dir,
+            provider=provider,
+            intraday_interval=intraday_interval,
+            start_date=start_date,
+            end_date=end_date,
+            yahoo_client=yahoo_client,
+            yahoo_chart_url=yahoo_chart_url,
+            guard=guard,
+        )
+        return None
+
     verification_summary = None
+
+    # Read storage first so weekly/monthly Yahoo runs can size their request.
+    out_path = os.path.join(out_dir, OUTPUT_FILES[cadence])
+    existing = read_existing(out_path, cadence)
+    if cadence == "weekly":
+        canonicalize_existing_weekly_ticker_rows(existing, ticker)
+
     if provider == "alphavantage":
         new_rows, file_type, source_file = fetch_rows_from_alphavantage(
             ticker=ticker,
@@ -644,12 +963,47 @@ def update_for_ticker(
             daily_outputsize=daily_outputsize,
         )
     elif provider == "yahoo":
-        new_rows, file_type, source_file = fetch_rows_from_yahoo(
-            ticker=ticker,
-            cadence=cadence,
-            start_date=start_date,
-            end_date=end_date,
-        )
+
+        def fetch_yahoo(fetch_start: date = None, fetch_end: date = None):
+            def primary():
+                return fetch_rows_from_yahoo(
+                    ticker=ticker,
+                    cadence=cadence,
+                    start_date=fetch_start,
+                    end_date=fetch_end,
+                    client=yahoo_client,
+                    chart_base_url=yahoo_chart_url,
+                )
+
+            def secondary():
+                # --daily-outputsize does not apply to Yahoo runs; size the
+                # request so the bars reach back to the Yahoo window start.
+                return fetch_rows_from_alphavantage(
+                    ticker=ticker,
+                    cadence=cadence,
+                    api_key=api_key,
+                    daily_outputsize=alphavantage_outputsize(fetch_start),
+                )
+
+            if hedger is None:
+                return primary()
+            return hedger.fetch(primary, "yahoo", secondary if api_key else None, "alphavantage", label=ticker)
+
+        overlap_start = None
+        if not (full_refetch or start_date or end_date):
+            overlap_start = overlap_window_start(existing, ticker, cadence)
+
+        if overlap_start:
+            new_rows, file_type, source_file = fetch_yahoo(overlap_start)
+            if not overlap_matches_existing(existing, new_rows, ticker):
+                print(
+                    f"{ticker}: {cadence} overlap from {overlap_start.isoformat()} "
+                    "disagrees with stored values; refetching full history."
+                )
+                overlap_start = None
+
+        if not overlap_start:
+            new_rows, file_type, source_file = fetch_yahoo(start_date, end_date)
         if verify_against_alphavantage:
             if not api_key:
                 print(f"{ticker}: skipped verification (missing ALPHAVANTAGE_API_KEY).")
@@ -665,17 +1019,270 @@ def update_for_ticker(
         raise RuntimeError(f"Unsupported provider: {provider}")
 
     new_rows = filter_rows_by_date(new_rows, cadence, start_date, end_date)
+    new_rows = guard_rows(guard, cadence, ticker, new_rows, out_dir, source_file, existing)
 
-    out_path = os.path.join(out_dir, OUTPUT_FILES[cadence])
-    existing = read_existing(out_path, cadence)
-    if cadence == "weekly":
-        canonicalize_existing_weekly_ticker_rows(existing, ticker)
     trim_existing_range(existing, ticker, cadence, start_date, end_date)
     merged = merge_and_recalc(existing, new_rows, ticker, name, cadence, file_type, source_file)
     write_csv(out_path, cadence, merged)
+    if guard is not None:
+        guard.commit(cadence, ticker)
     return verification_summary
 
 
+# Guard state key for the Taiwan universe (separate from the anchor daily series).
+UNIVERSE_STATE_KEY = "tw_daily"
+
+
+def update_companyinfo_universe(
+    out_dir: str,
+    start_date: date = None,
+    end_date: date = None,
+    yahoo_client: str = "yfinance",
+    yahoo_chart_url: str = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    guard: Optional[PriceGuard] = None,
+) -> Tuple[int, Dict[str, str]]:
+    """
+    Fetch daily bars for every raw_companyinfo.csv member into the UNIVERSE_OUTPUT_DIR partitions.
+
+    Returns:
+        (number of symbols updated, {symbol: error})
+    """
+    universe = load_companyinfo_universe(os.path.join(out_dir, COMPANYINFO_FILE))
+    if not universe:
+        raise RuntimeError(f"No listed members found in {COMPANYINFO_FILE}.")
+
+    existing = read_universe_columns(out_dir, FIELDNAMES["daily"])
+    batches = plan_batches(universe.keys(), last_dates_by_symbol(existing), batch_size, start_date)
+    request_end = default_request_end(end_date)
+    print(
+        f"Universe: {len(universe)} symbols in {len(batches)} batch(es) "
+        f"(batch size {batch_size}, {workers} worker(s), client {yahoo_client})"
+    )
+
+    if yahoo_client == "chart":
+        def fetch_batch(symbols, start, end):
+            return fetch_batch_chart(symbols, start, end, yahoo_chart_url)
+        pool_workers = workers
+        source_prefix = "yahoo-chart"
+    else:
+        # yfinance.download is not safe to call from several threads; it
+        # parallelises the symbols of one batch itself.
+        def fetch_batch(symbols, start, end):
+            return fetch_batch_yfinance(symbols, start, end, workers)
+        pool_workers = 1
+        source_prefix = "yfinance"
+
+    def report(done, total, symbols, error):
+        status = f"failed: {error}" if error else "ok"
+        print(f"  batch {done}/{total} ({symbols[0]}..{symbols[-1]}, {len(symbols)} symbols) {status}")
+
+    started = time.monotonic()
+    bars, errors = fetch_universe(batches, fetch_batch, request_end, pool_workers, on_batch=report)
+    print(f"Fetched {len(bars)} symbol(s) in {time.monotonic() - started:.1f}s")
+
+    starts = {symbol: start for start, symbols in batches for symbol in symbols}
+    source_files = {
+        symbol: f"{source_prefix}:{symbol}?interval=1d&start={starts[symbol].isoformat()}"
+        for symbol in bars
+    }
+
+    if guard is not None:
+        codes = existing.get("stock_code", np.array([], dtype=str))
+        for symbol in sorted(bars):
+            if existing and not guard.has_state(UNIVERSE_STATE_KEY, symbol):
+                mask = codes == symbol
+                guard.bootstrap(
+                    UNIVERSE_STATE_KEY,
+                    symbol,
+                    zip(
+                        existing[DATE_LABEL["daily"]][mask].tolist(),
+                        existing["開盤_價格_元"][mask].tolist(),
+                        existing["收盤_價格_元"][mask].tolist(),
+                    ),
+                )
+            dates, opens, closes, highs, lows, volumes = bars[symbol]
+            rows = history_arrays_to_rows(dates, opens, closes, "daily", highs, lows, volumes)
+            rows = filter_rows_by_date(rows, "daily", start_date, end_date)
+            accepted = guard_rows(guard, UNIVERSE_STATE_KEY, symbol, rows, out_dir, source_files[symbol])
+            bars[symbol] = (np.asarray([r["date_key"] for r in accepted], dtype="datetime64[D]"),) + tuple(
+                np.asarray([np.nan if r.get(name) is None else r[name] for r in accepted], dtype=float)
+                for name in ("open", "close", "high", "low", "volume")
+            )
+
+    fresh = bars_to_columns(bars, universe, source_files, YAHOO_FILE_TYPES["daily"])
+    merged = merge_columns(existing, fresh, FIELDNAMES["daily"], keep_symbols=universe.keys())
+    if merged:
+        years = write_universe_partitions(out_dir, merged, FIELDNAMES["daily"])
+        print(
+            f"{len(merged['stock_code'])} rows in {UNIVERSE_OUTPUT_DIR}/; "
+            f"rewrote {', '.join(years) or 'no'} partition(s)"
+        )
+    if guard is not None:
+        for symbol in bars:
+            guard.commit(UNIVERSE_STATE_KEY, symbol)
+    return len(bars), errors
+
+
+def intraday_partition_dir(out_dir: str, interval: str) -> str:
+    return os.path.join(out_dir, OUTPUT_FILES["intraday"], interval)
+
+
+def list_intraday_sessions(partition_dir: str) -> List[str]:
+    """Return stored session dates (YYYY-MM-DD), oldest first."""
+    if not os.path.isdir(partition_dir):
+        return []
+    return sorted(
+        name[: -len(".csv.gz")]
+        for name in os.listdir(partition_dir)
+        if name.endswith(".csv.gz")
+    )
+
+
+def read_intraday_partition(path: str) -> Dict[Tuple[str, str], Dict[str, object]]:
+    if not os.path.exists(path):
+        return {}
+    rows = {}
+    date_col = DATE_LABEL["intraday"]
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            rows[(row["stock_code"], row[date_col])] = row
+    return rows
+
+
+def write_intraday_partition(path: str, rows: List[Dict[str, object]]) -> None:
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=FIELDNAMES["intraday"])
+    w.writeheader()
+    for row in rows:
+        w.writerow({k: row.get(k) for k in FIELDNAMES["intraday"]})
+    # mtime=0 keeps the gzip header stable so unchanged sessions produce no git diff.
+    data = gzip.compress(buf.getvalue().encode("utf-8"), mtime=0)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def last_intraday_session(
+    partition_dir: str,
+    ticker: str,
+    before: str = None,
+) -> Tuple[Optional[str], Optional[float]]:
+    """Find the newest stored session holding the ticker, and its last close.
+
+    Only partitions older than `before` (YYYY-MM-DD) are considered when given.
+    Scans newest-first and stops at the first hit, so it usually reads one file.
+    """
+    date_col = DATE_LABEL["intraday"]
+    for session in reversed(list_intraday_sessions(partition_dir)):
+        if before and session >= before:
+            continue
+        rows = read_intraday_partition(os.path.join(partition_dir, f"{session}.csv.gz"))
+        ticker_rows = sorted(
+            (row for key, row in rows.items() if key[0] == ticker),
+            key=lambda x: x[date_col],
+        )
+        if ticker_rows:
+            return session, to_float(ticker_rows[-1].get("收盤_價格_元"))
+    return None, None
+
+
+def update_intraday_for_ticker(
+    ticker: str,
+    name: str,
+    api_key: str,
+    out_dir: str,
+    provider: str = "yahoo",
+    intraday_interval: str = "60m",
+    start_date: date = None,
+    end_date: date = None,
+    yahoo_client: str = "yfinance",
+    yahoo_chart_url: str = None,
+    guard: Optional[PriceGuard] = None,
+) -> None:
+    """Fetch missing intraday sessions and merge them into per-day gzip partitions.
+
+    Without --start-date the request starts at the newest stored session for
+    the ticker (it may have been captured mid-session), or at the provider's
+    lookback limit when nothing is stored yet. Only touched partitions are
+    rewritten.
+    """
+    partition_dir = intraday_partition_dir(out_dir, intraday_interval)
+    os.makedirs(partition_dir, exist_ok=True)
+
+    fetch_start = start_date
+    if fetch_start is None:
+        last_session, _ = last_intraday_session(partition_dir, ticker)
+        if last_session:
+            fetch_start = datetime.strptime(last_session, "%Y-%m-%d").date()
+        else:
+            fetch_start = date.today() - timedelta(days=INTRADAY_MAX_LOOKBACK_DAYS[intraday_interval])
+
+    if provider == "alphavantage":
+        new_rows, file_type, source_file = fetch_rows_from_alphavantage(
+            ticker=ticker,
+            cadence="intraday",
+            api_key=api_key,
+            daily_outputsize="full" if start_date else "compact",
+            intraday_interval=intraday_interval,
+        )
+    elif provider == "yahoo":
+        new_rows, file_type, source_file = fetch_rows_from_yahoo(
+            ticker=ticker,
+            cadence="intraday",
+            start_date=fetch_start,
+            end_date=end_date,
+            client=yahoo_client,
+            chart_base_url=yahoo_chart_url,
+            intraday_interval=intraday_interval,
+        )
+    else:
+        raise RuntimeError(f"Unsupported provider: {provider}")
+
+    new_rows = [
+        row
+        for row in new_rows
+        if row["date_key"][:10] >= fetch_start.isoformat()
+        and not (end_date and row["date_key"][:10] > end_date.isoformat())
+    ]
+    state_key = f"intraday_{intraday_interval}"
+    new_rows = guard_rows(guard, state_key, ticker, new_rows, out_dir, source_file)
+
+    rows_by_session: Dict[str, List[Dict[str, object]]] = {}
+    for row in new_rows:
+        rows_by_session.setdefault(row["date_key"][:10], []).append(row)
+    if not rows_by_session:
+        if guard is not None:
+            guard.commit(state_key, ticker)
+        print(f"{ticker}: no new intraday ({intraday_interval}) sessions.")
+        return
+
+    sessions = sorted(rows_by_session)
+    _, prev_close = last_intraday_session(partition_dir, ticker, before=sessions[0])
+    for session in sessions:
+        path = os.path.join(partition_dir, f"{session}.csv.gz")
+        existing = read_intraday_partition(path)
+        merged = merge_and_recalc(
+            existing,
+            rows_by_session[session],
+            ticker,
+            name,
+            "intraday",
+            file_type,
+            source_file,
+            seed_close=prev_close,
+        )
+        write_intraday_partition(path, merged)
+        ticker_closes = [row.get("收盤_價格_元") for row in merged if row["stock_code"] == ticker]
+        if ticker_closes:
+            prev_close = to_float(ticker_closes[-1])
+    if guard is not None:
+        guard.commit(state_key, ticker)
+    print(f"{ticker}: wrote {len(sessions)} intraday ({intraday_interval}) session(s) to {partition_dir}")
+
+
 def load_concept_metadata(out_dir: str) -> Dict[str, Tuple[str, str, str, str, str, str, str]]:
     """Load concept metadata from raw_conceptstock_company_metadata.csv."""
     metadata_path = os.path.join(out_dir, "raw_conceptstock_company_metadata.csv")
@@ -835,6 +1442,18 @@ def load_dynamic_tickers(out_dir: str) -> Dict[str, str]:
     return dynamic_tickers
 
 
+def refresh_charts(out_dir: str, sources: Dict[str, Tuple[str, str]]) -> None:
+    """Rewrite the downsampled chart JSON of tickers whose series changed."""
+    if not sources:
+        return
+    try:
+        written, unchanged = update_chart_series(out_dir, sources)
+    except Exception as e:
+        print(f"Warning: chart series not updated: {e}", file=sys.stderr)
+        return
+    print(f"Chart series: {written} ticker series regenerated, {unchanged} unchanged ({CHARTS_DIR}/)")
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Update concept stock daily/weekly/monthly CSVs from Alpha Vantage or Yahoo Finance",
@@ -845,9 +1464,63 @@ def parse_args() -> argparse.Namespace:
     group.add_argument("--sync-concepts", action="store_true", help="Fetch company info and update concept.csv")
     parser.add_argument(
         "--cadence",
-        choices=["daily", "weekly", "monthly", "all"],
+        choices=["daily", "weekly", "monthly", "intraday", "all"],
         default="all",
-        help="Which cadence to update",
+        help="Which cadence to update (all = daily/weekly/monthly; intraday is opt-in)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="With --provider yahoo, also request Alpha Vantage when Yahoo is slower than its learned p95 latency; use whichever answers first.",
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=int,
+        default=20,
+        help="Maximum Alpha Vantage requests issued by --hedge in one run (default: 20, free tier is 25/day).",
+    )
+    parser.add_argument(
+        "--no-guard",
+        action="store_true",
+        help="Skip the anomaly guard (z-score/gap/zero-price/duplicate checks) between fetch and merge.",
+    )
+    parser.add_argument(
+        "--reset-guard",
+        action="append",
+        metavar="TICKER",
+        help="Drop the anomaly guard state of TICKER (every cadence) so it is re-bootstrapped from the stored CSV; repeatable, 'all' resets every ticker.",
+    )
+    parser.add_argument(
+        "--intraday-interval",
+        choices=sorted(INTRADAY_INTERVALS.keys()),
+        default="60m",
+        help="Bar size for --cadence intraday (default: 60m).",
+    )
+    parser.add_argument(
+        "--universe",
+        choices=["anchors", "companyinfo"],
+        default="anchors",
+        help=(
+            "anchors (default): the US/HK concept anchors. companyinfo: every listed member of "
+            f"raw_companyinfo.csv as .TW/.TWO symbols, daily only, written to {UNIVERSE_OUTPUT_DIR}/{{year}}.csv."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"--universe companyinfo: symbols per download request (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"--universe companyinfo: maximum concurrent requests (default: {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument(
+        "--no-charts",
+        action="store_true",
+        help=f"Skip regenerating the LTTB-downsampled chart JSON under {CHARTS_DIR}/.",
     )
     parser.add_argument(
         "--out-dir",
@@ -906,6 +1579,22 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Continue updating other tickers if one fails, and exit with 0 if at least one ticker succeeds.",
     )
+    parser.add_argument(
+        "--full-refetch",
+        action="store_true",
+        help="With --provider yahoo, request full history for weekly/monthly instead of the overlap window.",
+    )
+    parser.add_argument(
+        "--yahoo-client",
+        choices=["yfinance", "chart"],
+        default="yfinance",
+        help="Yahoo client: yfinance (default) or chart (reads the chart JSON endpoint directly, no pandas import).",
+    )
+    parser.add_argument(
+        "--yahoo-chart-url",
+        default="",
+        help="Override the chart endpoint base URL used by --yahoo-client chart (e.g. a local stand-in server).",
+    )
     return parser.parse_args()
 
 
@@ -936,7 +1625,7 @@ def main() -> int:
     if args.verify_report and not args.verify_against_alphavantage:
         print("--verify-report requires --verify-against-alphavantage.", file=sys.stderr)
         return 1
-    if args.provider == "yahoo":
+    if args.provider == "yahoo" and args.yahoo_client == "yfinance":
         try:
             import yfinance  # noqa: F401
         except ImportError:
@@ -968,6 +1657,42 @@ def main() -> int:
     if args.provider == "yahoo" and args.daily_outputsize != "compact":
         print("--daily-outputsize is ignored when --provider yahoo.")
 
+    if args.universe == "companyinfo":
+        if not args.all:
+            print("--universe companyinfo requires --all.", file=sys.stderr)
+            return 1
+        if args.provider != "yahoo":
+            print("--universe companyinfo requires --provider yahoo.", file=sys.stderr)
+            return 1
+        if args.cadence not in ("daily", "all"):
+            print("--universe companyinfo only supports --cadence daily.", file=sys.stderr)
+            return 1
+        if args.batch_size < 1 or args.workers < 1:
+            print("--batch-size and --workers must be >= 1.", file=sys.stderr)
+            return 1
+        guard = open_guard(args)
+        updated, errors = update_companyinfo_universe(
+            out_dir=args.out_dir,
+            start_date=start_date,
+            end_date=end_date,
+            yahoo_client=args.yahoo_client,
+            yahoo_chart_url=args.yahoo_chart_url or None,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            guard=guard,
+        )
+        if guard is not None:
+            guard.save()
+        if updated and not args.no_charts:
+            refresh_charts(args.out_dir, {UNIVERSE_STATE_KEY: (UNIVERSE_OUTPUT_DIR, DATE_LABEL["daily"])})
+        if errors:
+            print(f"\n=== Universe Failures ({len(errors)}) ===", file=sys.stderr)
+            for symbol, err in sorted(errors.items()):
+                print(f"  - {symbol}: {err}", file=sys.stderr)
+        if not updated or (errors and not args.ignore_errors):
+            return 1
+        return 0
+
     if args.ticker:
         ticker = args.ticker.upper()
         if ticker not in DEFAULT_TICKERS:
@@ -987,8 +1712,20 @@ def main() -> int:
         print(f"Active tickers: {', '.join(sorted(tickers.keys()))}")
 
     cadences = ["daily", "weekly", "monthly"] if args.cadence == "all" else [args.cadence]
+    if args.cadence == "intraday" and args.all:
+        tickers = INTRADAY_TICKERS.copy()
+        print(f"Intraday tickers: {', '.join(tickers.keys())}")
     verification_rows: List[Dict[str, object]] = []
     failed_tickers: List[Tuple[str, str, str]] = []
+    guard = open_guard(args)
+    hedger = None
+    if args.hedge and args.provider == "yahoo":
+        if not api_key:
+            print("--hedge: ALPHAVANTAGE_API_KEY not set; recording Yahoo latency without hedging.")
+        hedger = HedgedFetcher(
+            LatencyStore(os.path.join(args.out_dir, LATENCY_STATE_FILE)),
+            budget=args.hedge_budget if api_key else 0,
+        )
 
     for cadence in cadences:
         for i, (ticker, name) in enumerate(tickers.items()):
@@ -1007,6 +1744,12 @@ def main() -> int:
                     end_date=end_date,
                     verify_against_alphavantage=args.verify_against_alphavantage,
                     verify_close_tolerance=args.verify_close_tolerance,
+                    full_refetch=args.full_refetch,
+                    yahoo_client=args.yahoo_client,
+                    yahoo_chart_url=args.yahoo_chart_url or None,
+                    intraday_interval=args.intraday_interval,
+                    guard=guard,
+                    hedger=hedger,
                 )
                 if verify_summary is not None:
                     verification_rows.append(verify_summary)
@@ -1018,11 +1761,20 @@ def main() -> int:
                 else:
                     raise
 
-        if args.all:
+        if args.all and cadence != "intraday":
             removed = prune_inactive_tickers(args.out_dir, cadence, list(tickers.keys()))
             if removed > 0:
                 print(f"Pruned {removed} inactive rows from {OUTPUT_FILES[cadence]}")
 
+    if guard is not None:
+        guard.save()
+    if not args.no_charts:
+        chart_sources = {c: (OUTPUT_FILES[c], DATE_LABEL[c]) for c in cadences if c != "intraday"}
+        refresh_charts(args.out_dir, chart_sources)
+    if hedger is not None:
+        hedger.store.save()
+        print(f"Hedged requests: {hedger.hedges}, won by Alpha Vantage: {hedger.secondary_wins}")
+
     if verification_rows:
         mismatch_tickers = [
             row["ticker"] for row in verification_rows if row.get("status") == "mismatch"
@@ -0,0 +1,7 @@
+# Analytics over the concept stock CSVs (used by scripts/analyze_conceptstocks.py)
+# - columns: CSV -> typed numpy column loaders
+# - valuation: as-of join of daily prices with reported fundamentals (P/E, P/S)
+# - backtest: vectorized concept-basket backtests over parameter grids
+# - breadth: per-concept breadth/relative strength matrices over the Taiwan members
+# - leadlag: FFT cross-correlation of US anchors vs. Taiwan members
+# - quality: vectorized data-quality rules over the output CSVs
@@ -0,0 +1,335 @@
+"""
+Vectorized concept-basket backtests over parameter grids.
+
+Strategy family: after a concept's US anchor reports an EPS surprise
+(`eps_surprise_pct` in raw_conceptstock_company_income.csv), hold the
+equal-weight basket of the concept's Taiwan members for a while.
+
+Each grid point is (signal, surprise_min, entry_delay, hold_days, cost_bps):
+- signal "beat": surprise >= surprise_min, long the basket
+- signal "miss": surprise <= -surprise_min, short the basket
+- events are dated by the anchor's earnings announcement (`eps_reported_date`,
+  taken from the same Alpha Vantage / FMP record as the surprise); rows
+  without it are dropped, since end_date plus a reporting lag lands weeks
+  after the real reaction
+- the entry is decided `entry_delay` sessions after the first Taiwan session
+  s following the announcement and filled at that session's close, so the
+  position earns from the next session on and holds `hold_days` sessions
+  (overlapping events extend it). The return into close(s) started before
+  the US announcement and is never earned: the gap itself is not tradeable
+- cost_bps is charged on every entry and exit, at the fill close
+
+Nothing loops over days or tickers. Baskets are membership @ returns; entries
+are a cumulative count of event impulses, and the position of every grid
+point is a difference of two gathers from it. A grid chunk is one
+[configs, concepts, days] array; chunks can be spread over a process pool.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BACKTEST_FILE = "raw_conceptstock_backtest_results.csv"
+
+BACKTEST_FIELDNAMES = [
+    "signal",
+    "surprise_min",
+    "entry_delay",
+    "hold_days",
+    "cost_bps",
+    "concept",
+    "anchor_ticker",
+    "events",
+    "trades",
+    "exposure",
+    "total_return",
+    "ann_return",
+    "ann_vol",
+    "sharpe",
+    "max_drawdown",
+    "basket_return",
+    "first_date",
+    "last_date",
+    "process_timestamp",
+]
+
+SIGNALS = {"beat": 1.0, "miss": -1.0}
+
+DEFAULT_GRID = {
+    "signal": ["beat", "miss"],
+    "surprise_min": [0.0, 5.0, 10.0, 20.0],
+    "entry_delay": [0, 1, 2],
+    "hold_days": [5, 10, 20, 40, 60],
+    "cost_bps": [0.0, 10.0, 30.0],
+}
+
+TRADING_DAYS = 252
+
+# Upper bound on cells of one [configs, concepts, days] chunk (~8 bytes each, a few arrays live).
+CHUNK_CELLS = 4_000_000
+
+
+def basket_returns(returns: np.ndarray, membership: np.ndarray) -> np.ndarray:
+    """
+    Equal-weight daily basket return per concept over the members priced that day.
+
+    Args:
+        returns: [tickers, days] daily returns (NaN when not traded)
+        membership: [concepts, tickers] boolean matrix
+
+    Returns:
+        [concepts, days] basket returns (0 on days no member traded)
+    """
+    m = membership.astype(float)
+    priced = ~np.isnan(returns)
+    total = m @ np.where(priced, returns, 0.0)
+    count = m @ priced.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, 0.0)
+
+
+def surprise_events(income_rows: List[Dict[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quarterly EPS surprises of one symbol, one per fiscal quarter end.
+
+    Rows without `eps_reported_date` are skipped rather than dated by a
+    reporting-lag guess.
+
+    Returns:
+        (announcement dates datetime64[D], surprise in percent), sorted by date
+    """
+    by_end: Dict[str, Tuple[np.datetime64, float]] = {}
+    for row in income_rows:
+        if row.get("period") not in ("Q1", "Q2", "Q3", "Q4"):
+            continue
+        try:
+            surprise = float(row.get("eps_surprise_pct") or "")
+        except ValueError:
+            continue
+        reported = (row.get("eps_reported_date") or "").strip()
+        end = (row.get("end_date") or "")[:10]
+        if not reported or reported == "None" or not end or end in by_end:
+            continue
+        by_end[end] = (np.datetime64(reported[:10], "D"), surprise)
+    if not by_end:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    dates = np.array([v[0] for v in by_end.values()], dtype="datetime64[D]")
+    values = np.array([v[1] for v in by_end.values()], dtype=float)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], values[order]
+
+
+def event_sessions(event_dates: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Index of the first Taiwan session strictly after each event date (len(days) if none)."""
+    return np.searchsorted(days, event_dates, side="right")
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict[str, object]]:
+    keys = ["signal", "surprise_min", "entry_delay", "hold_days", "cost_bps"]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def build_entry_counts(
+    concepts: List[str],
+    days: np.ndarray,
+    events: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    triggers: List[Tuple[str, float]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cumulative event impulses per (signal, threshold) trigger and concept.
+
+    Returns:
+        (cum [triggers, concepts, days + 1] int where cum[..., d] counts events
+         entering at sessions < d, events [triggers, concepts] event counts)
+    """
+    n_days = len(days)
+    impulses = np.zeros((len(triggers), len(concepts), n_days + 1), dtype=np.int64)
+    for c, concept in enumerate(concepts):
+        if concept not in events:
+            continue
+        dates, surprises = events[concept]
+        sessions = event_sessions(dates, days)
+        for k, (signal, threshold) in enumerate(triggers):
+            hit = surprises >= threshold if signal == "beat" else surprises <= -threshold
+            np.add.at(impulses[k, c], sessions[hit], 1)
+    cum = np.concatenate(
+        [np.zeros(impulses.shape[:2] + (1,), dtype=np.int64), np.cumsum(impulses[..., :n_days], axis=2)],
+        axis=2,
+    )
+    return cum, impulses[..., :n_days].sum(axis=2)
+
+
+def evaluate_configs(
+    basket: np.ndarray,
+    cum: np.ndarray,
+    trigger_idx: np.ndarray,
+    sides: np.ndarray,
+    delays: np.ndarray,
+    holds: np.ndarray,
+    costs: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate a chunk of grid points at once.
+
+    Args:
+        basket: [concepts, days] basket returns
+        cum: Output of build_entry_counts()
+        trigger_idx, sides, delays, holds, costs: [configs] arrays per grid point
+            (costs as a fraction, sides +1 long / -1 short)
+
+    Returns:
+        Dict of [configs, concepts] statistic arrays
+    """
+    n_concepts, n_days = basket.shape
+    d = np.arange(n_days)
+    # Target position at the close of day d: an entry happened in sessions
+    # (d - delay - hold, d - delay].
+    hi = np.clip(d[None, :] - delays[:, None] + 1, 0, n_days)
+    lo = np.clip(d[None, :] - delays[:, None] - holds[:, None] + 1, 0, n_days)
+    t = trigger_idx[:, None, None]
+    c = np.arange(n_concepts)[None, :, None]
+    active = (cum[t, c, hi[:, None, :]] - cum[t, c, lo[:, None, :]]) > 0
+
+    # Trades fill at the close of day d, so day d's return (from close d-1)
+    # belongs to the position held from the day before; costs land on d.
+    target = active * sides[:, None, None]
+    turnover = np.abs(np.diff(target, axis=2, prepend=0.0))
+    position = np.concatenate([np.zeros(target.shape[:2] + (1,)), target[..., :-1]], axis=2)
+    daily = position * basket[None] - turnover * costs[:, None, None]
+
+    equity = np.cumprod(1.0 + daily, axis=2)
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity, axis=2)
+    mean = daily.mean(axis=2)
+    std = daily.std(axis=2)
+    years = n_days / TRADING_DAYS
+    total = equity[..., -1] - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ann_return = np.where(total > -1, np.power(np.maximum(1.0 + total, 0.0), 1.0 / years) - 1.0, -1.0)
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.nan)
+    entries = (np.diff(active.astype(np.int8), axis=2, prepend=0) > 0).sum(axis=2)
+    return {
+        "trades": entries,
+        "exposure": (position != 0).mean(axis=2),
+        "total_return": total,
+        "ann_return": ann_return,
+        "ann_vol": std * np.sqrt(TRADING_DAYS),
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.max(axis=2),
+    }
+
+
+_WORKER_STATE: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(basket: np.ndarray, cum: np.ndarray) -> None:
+    _WORKER_STATE["basket"] = basket
+    _WORKER_STATE["cum"] = cum
+
+
+def _evaluate_chunk(chunk: Tuple[np.ndarray, ...]) -> Dict[str, np.ndarray]:
+    return evaluate_configs(_WORKER_STATE["basket"], _WORKER_STATE["cum"], *chunk)
+
+
+def run_grid(
+    days: np.ndarray,
+    basket: np.ndarray,
+    concepts: List[str],
+    anchors: Dict[str, str],
+    events: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    grid: Dict[str, Sequence],
+    workers: int = 1,
+) -> List[Dict[str, object]]:
+    """
+    Evaluate every grid point for every concept.
+
+    Args:
+        days: datetime64[D] sessions of `basket`
+        basket: [concepts, days] basket returns (see basket_returns())
+        concepts: Row labels of `basket`
+        anchors: concept -> anchor ticker
+        events: concept -> surprise_events() of its anchor
+        grid: Parameter lists keyed like DEFAULT_GRID
+        workers: Processes for the grid chunks (1 = in-process)
+
+    Returns:
+        One row per (grid point, concept with events), keyed by BACKTEST_FIELDNAMES
+    """
+    configs = expand_grid(grid)
+    triggers = sorted({(cfg["signal"], float(cfg["surprise_min"])) for cfg in configs})
+    trigger_pos = {trigger: i for i, trigger in enumerate(triggers)}
+    cum, event_counts = build_entry_counts(concepts, days, events, triggers)
+
+    trigger_idx = np.array([trigger_pos[(cfg["signal"], float(cfg["surprise_min"]))] for cfg in configs])
+    sides = np.array([SIGNALS[cfg["signal"]] for cfg in configs])
+    delays = np.array([int(cfg["entry_delay"]) for cfg in configs])
+    holds = np.array([int(cfg["hold_days"]) for cfg in configs])
+    costs = np.array([float(cfg["cost_bps"]) / 1e4 for cfg in configs])
+
+    step = max(1, CHUNK_CELLS // max(1, len(concepts) * len(days)))
+    chunks = [
+        (trigger_idx[i:i + step], sides[i:i + step], delays[i:i + step], holds[i:i + step], costs[i:i + step])
+        for i in range(0, len(configs), step)
+    ]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks), os.cpu_count() or 1),
+            initializer=_init_worker,
+            initargs=(basket, cum),
+        ) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+    else:
+        results = [evaluate_configs(basket, cum, *chunk) for chunk in chunks]
+    stats = {key: np.concatenate([r[key] for r in results]) for key in results[0]} if results else {}
+
+    basket_total = np.prod(1.0 + basket, axis=1) - 1.0
+    date_keys = np.datetime_as_string(days, unit="D")
+    first, last = (str(date_keys[0]), str(date_keys[-1])) if len(days) else ("", "")
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+
+    def cell(value: float, digits: int = 6):
+        return None if value != value else round(float(value), digits)
+
+    rows: List[Dict[str, object]] = []
+    for g, cfg in enumerate(configs):
+        k = trigger_idx[g]
+        for c, concept in enumerate(concepts):
+            if not event_counts[k, c]:
+                continue
+            rows.append(
+                {
+                    **cfg,
+                    "concept": concept,
+                    "anchor_ticker": anchors.get(concept),
+                    "events": int(event_counts[k, c]),
+                    "trades": int(stats["trades"][g, c]),
+                    "exposure": cell(stats["exposure"][g, c], 4),
+                    "total_return": cell(stats["total_return"][g, c]),
+                    "ann_return": cell(stats["ann_return"][g, c]),
+                    "ann_vol": cell(stats["ann_vol"][g, c]),
+                    "sharpe": cell(stats["sharpe"][g, c], 4),
+                    "max_drawdown": cell(stats["max_drawdown"][g, c]),
+                    "basket_return": cell(basket_total[c]),
+                    "first_date": first,
+                    "last_date": last,
+                    "process_timestamp": ts,
+                }
+            )
+    return rows
+
+
+def parse_grid(values: Dict[str, Optional[Sequence]]) -> Dict[str, List]:
+    """DEFAULT_GRID with the lists given on the command line substituted."""
+    grid = {key: list(default) for key, default in DEFAULT_GRID.items()}
+    for key, given in values.items():
+        if given:
+            grid[key] = list(given)
+    unknown = [s for s in grid["signal"] if s not in SIGNALS]
+    if unknown:
+        raise ValueError(f"Unknown signal(s): {', '.join(unknown)} (expected: {', '.join(SIGNALS)})")
+    if any(int(h) < 1 for h in grid["hold_days"]) or any(int(d) < 0 for d in grid["entry_delay"]):
+        raise ValueError("hold_days must be >= 1 and entry_delay >= 0")
+    return grid
@@ -0,0 +1,279 @@
+"""
+Per-concept breadth and relative strength for the Taiwan concept members.
+
+Inputs are a ticker x date close matrix (raw_conceptstock_tw_daily/ pivoted
+onto the union of trading dates) and a concept x ticker membership matrix
+(the 0/1 concept flags in raw_companyinfo.csv). Every statistic is a matrix
+expression: rolling means come from cumulative sums, rolling 52-week extremes
+from a log2(window) doubling of shifted maxima, and the per-concept counts
+are a single membership @ indicator product. Only the median and the anchor
+alignment loop, and both loop over concepts, not stocks or days.
+
+The US anchor of a concept is compared as of the previous calendar day: the
+US session on day d-1 closes before Taiwan opens on day d.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BREADTH_FILE = "raw_conceptstock_concept_breadth.csv"
+
+BREADTH_FIELDNAMES = [
+    "concept",
+    "交易日期",
+    "anchor_ticker",
+    "members",
+    "members_priced",
+    "pct_above_ma50",
+    "pct_above_ma200",
+    "new_highs_52w",
+    "new_lows_52w",
+    "median_return",
+    "anchor_return",
+    "anchor_return_pctile",
+    "median_return_20d",
+    "anchor_return_20d",
+    "rs_20d_vs_anchor",
+    "process_timestamp",
+]
+
+MA_SHORT = 50
+MA_LONG = 200
+HIGH_LOW_WINDOW = 252
+RS_WINDOW = 20
+
+
+def pivot_closes(
+    codes: np.ndarray, dates: np.ndarray, closes: np.ndarray
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Pivot long price columns into a ticker x date matrix.
+
+    Args:
+        codes: str array of tickers
+        dates: datetime64[D] array
+        closes: float array
+
+    Returns:
+        (tickers, sorted unique dates, float matrix [tickers, dates] with NaN holes)
+    """
+    valid = ~np.isnat(dates)
+    codes, dates, closes = codes[valid], dates[valid], closes[valid]
+    tickers, t_idx = np.unique(codes, return_inverse=True)
+    days, d_idx = np.unique(dates, return_inverse=True)
+    matrix = np.full((len(tickers), len(days)), np.nan)
+    matrix[t_idx, d_idx] = closes
+    return tickers.tolist(), days, matrix
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Row-wise trailing mean over `window` columns; NaN unless all values are present."""
+    values = np.nan_to_num(matrix)
+    present = (~np.isnan(matrix)).astype(np.int64)
+    csum = np.concatenate([np.zeros((matrix.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+    ccount = np.concatenate([np.zeros((matrix.shape[0], 1), dtype=np.int64), np.cumsum(present, axis=1)], axis=1)
+    out = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] >= window:
+        total = csum[:, window:] - csum[:, :-window]
+        count = ccount[:, window:] - ccount[:, :-window]
+        out[:, window - 1:] = np.where(count == window, total / window, np.nan)
+    return out
+
+
+def rolling_extreme(matrix: np.ndarray, window: int, op=np.fmax) -> np.ndarray:
+    """
+    Row-wise trailing max (or min with op=np.fmin) over `window` columns.
+
+    Uses the doubling trick: m_k[i] = extreme of the 2^k columns ending at i,
+    then the window is covered by two overlapping power-of-two spans.
+    NaNs are ignored (fmax/fmin); columns before a full window are NaN.
+    """
+    n_cols = matrix.shape[1]
+    out = np.full(matrix.shape, np.nan)
+    if n_cols < window:
+        return out
+    spans = [matrix]
+    span = 1
+    while span * 2 <= window:
+        prev = spans[-1]
+        nxt = prev.copy()
+        nxt[:, span:] = op(prev[:, span:], prev[:, :-span])
+        spans.append(nxt)
+        span *= 2
+    top = spans[-1]
+    shift = window - span
+    out[:, window - 1:] = op(top[:, window - 1:], top[:, window - 1 - shift:n_cols - shift])
+    return out
+
+
+def trailing_return(matrix: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] > periods:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, periods:] = matrix[:, periods:] / matrix[:, :-periods] - 1
+    return out
+
+
+def asof_previous_day(series_dates: np.ndarray, values: np.ndarray, target_dates: np.ndarray) -> np.ndarray:
+    """Value of the latest series date strictly before each target date (NaN if none)."""
+    if not len(series_dates):
+        return np.full(len(target_dates), np.nan)
+    pos = np.searchsorted(series_dates, target_dates, side="left") - 1
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], np.nan)
+
+
+def compute_breadth(
+    tickers: List[str],
+    days: np.ndarray,
+    closes: np.ndarray,
+    concepts: List[str],
+    membership: np.ndarray,
+    anchors: Dict[str, Tuple[str, np.ndarray, np.ndarray]],
+    since: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, object]]:
+    """
+    Compute one breadth row per concept per trading day.
+
+    Args:
+        tickers: Row labels of `closes`
+        days: datetime64[D] column labels of `closes`
+        closes: [tickers, days] close matrix
+        concepts: Row labels of `membership`
+        membership: [concepts, tickers] boolean matrix
+        anchors: concept -> (anchor ticker, sorted datetime64[D] dates, closes)
+        since: concept -> last stored date; only later days are emitted
+
+    Returns:
+        Rows keyed by BREADTH_FIELDNAMES
+    """
+    since = since or {}
+    m = membership.astype(float)
+    priced = ~np.isnan(closes)
+
+    ma_short = rolling_mean(closes, MA_SHORT)
+    ma_long = rolling_mean(closes, MA_LONG)
+    high = rolling_extreme(closes, HIGH_LOW_WINDOW, np.fmax)
+    low = rolling_extreme(closes, HIGH_LOW_WINDOW, np.fmin)
+    ret_1d = trailing_return(closes, 1)
+    ret_rs = trailing_return(closes, RS_WINDOW)
+
+    with np.errstate(invalid="ignore"):
+        above_short = (closes > ma_short) & ~np.isnan(ma_short)
+        above_long = (closes > ma_long) & ~np.isnan(ma_long)
+        new_high = (closes >= high) & ~np.isnan(high)
+        new_low = (closes <= low) & ~np.isnan(low)
+
+    def share(indicator: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+        hits = m @ indicator.astype(float)
+        base = m @ eligible.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(base > 0, hits / base, np.nan)
+
+    members = membership.sum(axis=1)
+    members_priced = m @ priced.astype(float)
+    pct_short = share(above_short, ~np.isnan(ma_short))
+    pct_long = share(above_long, ~np.isnan(ma_long))
+    highs = m @ new_high.astype(float)
+    lows = m @ new_low.astype(float)
+
+    # Anchor returns aligned to each Taiwan session (previous US close).
+    n_concepts, n_days = membership.shape[0], len(days)
+    anchor_ret = np.full((n_concepts, n_days), np.nan)
+    anchor_rs = np.full((n_concepts, n_days), np.nan)
+    for c, concept in enumerate(concepts):
+        if concept not in anchors:
+            continue
+        _, a_dates, a_closes = anchors[concept]
+        if len(a_closes) < 2:
+            continue
+        a_ret = np.concatenate([[np.nan], a_closes[1:] / a_closes[:-1] - 1])
+        a_rs = np.full(len(a_closes), np.nan)
+        if len(a_closes) > RS_WINDOW:
+            a_rs[RS_WINDOW:] = a_closes[RS_WINDOW:] / a_closes[:-RS_WINDOW] - 1
+        anchor_ret[c] = asof_previous_day(a_dates, a_ret, days)
+        anchor_rs[c] = asof_previous_day(a_dates, a_rs, days)
+
+    # Share of members that returned less than the anchor, per concept/day.
+    ret_valid = ~np.isnan(ret_1d)
+    with np.errstate(invalid="ignore"):
+        beaten = ret_1d[None, :, :] < anchor_ret[:, None, :]  # [concepts, tickers, days]
+    below = np.einsum("ct,ctd->cd", m, beaten.astype(float))
+    valid_count = m @ ret_valid.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pctile = np.where((valid_count > 0) & ~np.isnan(anchor_ret), below / valid_count, np.nan)
+
+    median_ret = np.full((n_concepts, n_days), np.nan)
+    median_rs = np.full((n_concepts, n_days), np.nan)
+    for c in range(n_concepts):
+        rows = membership[c]
+        if not rows.any():
+            continue
+        # All-NaN columns (no member traded) are expected; silence nanmedian.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            median_ret[c] = np.nanmedian(ret_1d[rows], axis=0)
+            median_rs[c] = np.nanmedian(ret_rs[rows], axis=0)
+    rs_vs_anchor = median_rs - anchor_rs
+
+    date_keys = np.datetime_as_string(days, unit="D").tolist()
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+
+    def cell(value: float):
+        return None if value != value else float(value)
+
+    rows_out: List[Dict[str, object]] = []
+    for c, concept in enumerate(concepts):
+        start_key = since.get(concept, "")
+        anchor_ticker = anchors[concept][0] if concept in anchors else None
+        for d in np.flatnonzero(members_priced[c] > 0).tolist():
+            if date_keys[d] <= start_key:
+                continue
+            rows_out.append(
+                {
+                    "concept": concept,
+                    "交易日期": date_keys[d],
+                    "anchor_ticker": anchor_ticker,
+                    "members": int(members[c]),
+                    "members_priced": int(members_priced[c, d]),
+                    "pct_above_ma50": cell(pct_short[c, d]),
+                    "pct_above_ma200": cell(pct_long[c, d]),
+                    "new_highs_52w": int(highs[c, d]),
+                    "new_lows_52w": int(lows[c, d]),
+                    "median_return": cell(median_ret[c, d]),
+                    "anchor_return": cell(anchor_ret[c, d]),
+                    "anchor_return_pctile": cell(pctile[c, d]),
+                    "median_return_20d": cell(median_rs[c, d]),
+                    "anchor_return_20d": cell(anchor_rs[c, d]),
+                    "rs_20d_vs_anchor": cell(rs_vs_anchor[c, d]),
+                    "process_timestamp": ts,
+                }
+            )
+    return rows_out
+
+
+def membership_matrix(
+    member_codes: np.ndarray, flags: Dict[str, np.ndarray], tickers: List[str]
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Build the concept x ticker membership matrix.
+
+    Args:
+        member_codes: Yahoo symbol per raw_companyinfo.csv row
+        flags: concept column -> 0/1 str array (same rows as member_codes)
+        tickers: Column labels (tickers of the close matrix)
+
+    Returns:
+        (concepts, boolean [concepts, tickers] matrix)
+    """
+    concepts = sorted(flags)
+    col = {t: i for i, t in enumerate(tickers)}
+    positions = np.asarray([col.get(code, -1) for code in member_codes.tolist()], dtype=np.int64)
+    known = positions >= 0
+    matrix = np.zeros((len(concepts), len(tickers)), dtype=bool)
+    for c, concept in enumerate(concepts):
+        hit = known & (flags[concept] == "1")
+        matrix[c, positions[hit]] = True
+    return concepts, matrix
@@ -0,0 +1,113 @@
+"""
+Column-oriented CSV loading for the analytics package.
+
+The raw CSVs are small enough to read in one go; transposing the rows once
+and converting whole columns with numpy is much cheaper than per-cell parsing
+with csv.DictReader.
+"""
+
+import csv
+import glob
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Cell values treated as missing when converting to numbers/dates.
+MISSING_VALUES = ("", "None", "nan", "NaN", "null")
+
+
+def read_columns(path: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Read a CSV into string columns.
+
+    Args:
+        path: CSV path, or a directory of CSV partitions (read in name order
+            and concatenated; all partitions share one header)
+        columns: Columns to keep (default: all). Missing columns are returned empty-filled.
+
+    Returns:
+        Dict of column name -> numpy str array. Empty dict if the file does not exist.
+    """
+    if os.path.isdir(path):
+        parts = [read_columns(p, columns) for p in sorted(glob.glob(os.path.join(path, "*.csv")))]
+        parts = [p for p in parts if p]
+        if not parts:
+            return {}
+        return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        rows = [row for row in reader if row]
+
+    wanted = columns or header
+    width = len(header)
+    # Pad short rows so zip() keeps every column aligned.
+    rows = [row + [""] * (width - len(row)) if len(row) < width else row for row in rows]
+    transposed = list(zip(*rows)) if rows else [()] * width
+
+    result = {}
+    for name in wanted:
+        if name in header:
+            result[name] = np.asarray(transposed[header.index(name)], dtype=str)
+        else:
+            result[name] = np.full(len(rows), "", dtype=str)
+    return result
+
+
+def missing_mask(values: np.ndarray) -> np.ndarray:
+    """Return a boolean mask of missing cells."""
+    return np.isin(values, MISSING_VALUES)
+
+
+def to_float_array(values: np.ndarray) -> np.ndarray:
+    """
+    Convert a string column to float64, NaN for missing or unparsable cells.
+
+    Args:
+        values: numpy str array
+
+    Returns:
+        float64 array
+    """
+    values = np.asarray(values, dtype=str)
+    out = np.full(values.shape, np.nan)
+    mask = ~missing_mask(values)
+    try:
+        out[mask] = values[mask].astype(float)
+    except ValueError:
+        # Fall back to per-cell parsing only when a column has stray text.
+        for i in np.flatnonzero(mask):
+            try:
+                out[i] = float(values[i])
+            except ValueError:
+                pass
+    return out
+
+
+def to_date_array(values: np.ndarray) -> np.ndarray:
+    """
+    Convert a date column (YYYY-MM-DD, YYYY-MM or datetime strings) to datetime64[D].
+
+    Monthly keys map to the first of the month; anything after the date part is ignored.
+
+    Args:
+        values: numpy str array
+
+    Returns:
+        datetime64[D] array, NaT for missing or unparsable cells
+    """
+    values = np.asarray(values, dtype=str)
+    out = np.full(values.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    mask = ~missing_mask(values)
+    try:
+        out[mask] = values[mask].astype("U10").astype("datetime64[D]")
+    except ValueError:
+        for i in np.flatnonzero(mask):
+            try:
+                out[i] = np.datetime64(values[i][:10], "D")
+            except ValueError:
+                pass
+    return out
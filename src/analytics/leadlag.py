@@ -0,0 +1,230 @@
+"""
+Lead-lag between US anchors and their Taiwan concept members.
+
+Returns are aligned on the Taiwan trading calendar: the anchor return on
+Taiwan day d is the return of the latest US session strictly before d (it
+closes before Taiwan opens), so lag 0 already means "the US session that
+the Taiwan market reacts to". A positive lag k correlates the anchor on day
+d with the member on day d + k (anchor leads); a negative lag means the
+member leads.
+
+Every lag is a Pearson correlation over the days both series traded at that
+lag. All pairs and lags come at once from real FFTs: the values (missing
+days set to 0), their squares and the 0/1 presence masks are transformed
+once per anchor and per member, and batched irfft products give, per lag,
+the overlap count and the overlap sums of x, y, x^2, y^2 and xy.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+LEAD_LAG_FILE = "raw_conceptstock_lead_lag.csv"
+
+LEAD_LAG_FIELDNAMES = [
+    "concept",
+    "anchor_ticker",
+    "stock_code",
+    "window_start",
+    "window_end",
+    "observations",
+    "best_lag",
+    "best_corr",
+    "corr_lag0",
+    "process_timestamp",
+]
+
+DEFAULT_MAX_LAG = 10
+DEFAULT_WINDOW = 250
+DEFAULT_STEP = 20
+MIN_OVERLAP = 60
+
+
+def aligned_anchor_returns(
+    anchor_dates: np.ndarray, anchor_closes: np.ndarray, days: np.ndarray
+) -> np.ndarray:
+    """
+    Anchor daily returns placed on the Taiwan calendar (previous US session).
+
+    Days whose latest prior US session was already used by an earlier Taiwan
+    day (US holidays) are NaN rather than repeating the stale return.
+    """
+    out = np.full(len(days), np.nan)
+    if len(anchor_closes) < 2:
+        return out
+    returns = np.concatenate([[np.nan], anchor_closes[1:] / anchor_closes[:-1] - 1])
+    pos = np.searchsorted(anchor_dates, days, side="left") - 1
+    fresh = pos >= 0
+    fresh[1:] &= pos[1:] != pos[:-1]
+    out[fresh] = returns[pos[fresh]]
+    return out
+
+
+def _standardize(window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Z-score rows over present values; returns (values with NaN -> 0, presence mask)."""
+    present = ~np.isnan(window)
+    count = present.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(present, window, 0.0).sum(axis=1, keepdims=True) / count
+        centred = np.where(present, window - mean, 0.0)
+        std = np.sqrt((centred ** 2).sum(axis=1, keepdims=True) / count)
+        z = np.where(std > 0, centred / std, 0.0)
+    return np.nan_to_num(z), present.astype(float)
+
+
+def cross_correlation(
+    anchor_window: np.ndarray,
+    member_window: np.ndarray,
+    pairs: np.ndarray,
+    max_lag: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correlation at lags -max_lag..+max_lag for (anchor row, member row) pairs.
+
+    Args:
+        anchor_window: [anchors, days] aligned anchor returns (NaN = missing)
+        member_window: [members, days] member returns (NaN = missing)
+        pairs: int array [pairs, 2] of (anchor row, member row)
+        max_lag: Largest lag in days
+
+    Returns:
+        (corr [pairs, 2*max_lag+1], overlap counts [pairs, 2*max_lag+1]);
+        column j holds lag j - max_lag.
+    """
+    n_days = anchor_window.shape[1]
+    nfft = 1 << int(np.ceil(np.log2(max(n_days + max_lag, 2))))
+    # Z-scoring over the window only keeps the sums well scaled; Pearson per
+    # lag is recomputed over the overlap below.
+    a_z, a_mask = _standardize(anchor_window)
+    m_z, m_mask = _standardize(member_window)
+    fa, fa2, fa_mask = (np.fft.rfft(v, nfft) for v in (a_z, a_z ** 2, a_mask))
+    fm, fm2, fm_mask = (np.fft.rfft(v, nfft) for v in (m_z, m_z ** 2, m_mask))
+
+    a_idx, m_idx = pairs[:, 0], pairs[:, 1]
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    def lagged(fx: np.ndarray, fy: np.ndarray) -> np.ndarray:
+        # irfft(conj(X) * Y)[k] = sum_t x[t] * y[t + k]; negative k wraps to the end.
+        return np.fft.irfft(np.conj(fx[a_idx]) * fy[m_idx], nfft)[:, lags]
+
+    counts = np.rint(lagged(fa_mask, fm_mask))
+    sx, sy = lagged(fa, fm_mask), lagged(fa_mask, fm)
+    sxx, syy = lagged(fa2, fm_mask), lagged(fa_mask, fm2)
+    sxy = lagged(fa, fm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / counts
+        var_x = sxx - sx * sx / counts
+        var_y = syy - sy * sy / counts
+        corr = cov / np.sqrt(var_x * var_y)
+    # FFT round-off: flat overlaps give tiny or negative variances.
+    corr = np.where((counts > 1) & (var_x > 1e-9 * counts) & (var_y > 1e-9 * counts), corr, np.nan)
+    return np.clip(corr, -1.0, 1.0), counts
+
+
+def window_ends(n_days: int, window: int, step: int, after: int = -1) -> List[int]:
+    """
+    Window end positions on a fixed grid: the first full window, then every `step` days.
+
+    The grid is anchored on the first day rather than the latest, so a daily
+    rerun adds a window only once `step` new days have accrued. Only ends
+    greater than `after` (the last stored end position) are returned, so
+    rerunning on the same data adds nothing.
+    """
+    if n_days < window:
+        return []
+    return [end for end in range(window - 1, n_days, step) if end > after]
+
+
+def compute_lead_lag(
+    tickers: List[str],
+    days: np.ndarray,
+    member_returns: np.ndarray,
+    concepts: List[str],
+    membership: np.ndarray,
+    anchors: Dict[str, Tuple[str, np.ndarray, np.ndarray]],
+    window: int = DEFAULT_WINDOW,
+    step: int = DEFAULT_STEP,
+    max_lag: int = DEFAULT_MAX_LAG,
+    since: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """
+    Best lag per (concept, anchor, member) over rolling windows.
+
+    Args:
+        tickers: Row labels of `member_returns`
+        days: datetime64[D] column labels of `member_returns`
+        member_returns: [tickers, days] daily returns
+        concepts: Row labels of `membership`
+        membership: [concepts, tickers] boolean matrix
+        anchors: concept -> (anchor ticker, sorted datetime64[D] dates, closes)
+        window: Days per window
+        step: Days between consecutive window ends
+        max_lag: Lags -max_lag..+max_lag are tested
+        since: Latest stored window_end; only later windows are computed
+
+    Returns:
+        Rows keyed by LEAD_LAG_FIELDNAMES
+    """
+    anchor_tickers = sorted({ticker for ticker, _, _ in anchors.values()})
+    if not anchor_tickers or not len(days):
+        return []
+    anchor_row = {ticker: i for i, ticker in enumerate(anchor_tickers)}
+    anchor_returns = np.full((len(anchor_tickers), len(days)), np.nan)
+    for ticker, dates, closes in anchors.values():
+        anchor_returns[anchor_row[ticker]] = aligned_anchor_returns(dates, closes, days)
+
+    # One row per (concept, member); the FFT work is shared across concepts
+    # with the same anchor via unique (anchor, member) pairs.
+    labels: List[Tuple[str, str, str]] = []
+    pair_keys: List[Tuple[int, int]] = []
+    for c, concept in enumerate(concepts):
+        if concept not in anchors:
+            continue
+        ticker = anchors[concept][0]
+        for t in np.flatnonzero(membership[c]).tolist():
+            labels.append((concept, ticker, tickers[t]))
+            pair_keys.append((anchor_row[ticker], t))
+    if not labels:
+        return []
+    unique_pairs, pair_of_label = np.unique(np.asarray(pair_keys), axis=0, return_inverse=True)
+    pair_of_label = pair_of_label.ravel()
+
+    date_keys = np.datetime_as_string(days, unit="D").tolist()
+    after = -1
+    if since:
+        after = int(np.searchsorted(np.asarray(date_keys), since, side="right")) - 1
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    rows: List[Dict[str, object]] = []
+    for end in window_ends(len(days), window, step, after):
+        start = end - window + 1
+        corr, counts = cross_correlation(
+            anchor_returns[:, start:end + 1], member_returns[:, start:end + 1], unique_pairs, max_lag
+        )
+        corr = np.where(counts >= MIN_OVERLAP, corr, np.nan)
+        usable = ~np.all(np.isnan(corr), axis=1)
+        best = np.argmax(np.nan_to_num(np.abs(corr), nan=-1.0), axis=1)
+        best_corr = corr[np.arange(len(corr)), best]
+        lag0 = corr[:, max_lag]
+        observations = counts[:, max_lag]
+        for label, p in zip(labels, pair_of_label.tolist()):
+            if not usable[p]:
+                continue
+            concept, anchor_ticker, code = label
+            rows.append(
+                {
+                    "concept": concept,
+                    "anchor_ticker": anchor_ticker,
+                    "stock_code": code,
+                    "window_start": date_keys[start],
+                    "window_end": date_keys[end],
+                    "observations": int(observations[p]),
+                    "best_lag": int(lags[best[p]]),
+                    "best_corr": round(float(best_corr[p]), 6),
+                    "corr_lag0": None if np.isnan(lag0[p]) else round(float(lag0[p]), 6),
+                    "process_timestamp": ts,
+                }
+            )
+    return rows
@@ -0,0 +1,488 @@
+"""
+Data-quality rules over the raw_conceptstock_*.csv outputs.
+
+Every file is loaded once into typed numpy columns (see columns.py) and each
+rule returns a boolean mask of offending rows computed with array operations:
+grouping is done with np.unique(return_inverse=True) + np.bincount, ordering
+checks compare each row with its predecessor. No rule loops over rows.
+
+Rules are either "blocking" (the data is wrong and must not be published) or
+"warning" (suspicious; reviewed by hand). validate_directory() returns a
+JSON-serializable report; callers turn blocking violations into a non-zero
+exit code.
+"""
+
+import glob
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.analytics.columns import missing_mask, read_columns, to_date_array, to_float_array
+
+BLOCKING = "blocking"
+WARNING = "warning"
+
+# Relative tolerance for segment sums vs reported total revenue.
+SEGMENT_SUM_TOLERANCE = 0.02
+
+# Largest accepted |year(end_date) - fiscal_year| (off-calendar fiscal years are off by one).
+MAX_FISCAL_YEAR_GAP = 1
+
+# Absolute tolerance for stored price change vs close - previous close.
+PRICE_CHANGE_TOLERANCE = 1e-4
+
+# Example offending rows kept per rule in the report.
+MAX_EXAMPLES = 5
+
+PRICE_FILES = {
+    "raw_conceptstock_daily.csv": "交易日期",
+    "raw_conceptstock_weekly.csv": "交易週",
+    "raw_conceptstock_monthly.csv": "交易月份",
+    "raw_conceptstock_daily_usd.csv": "交易日期",
+    "raw_conceptstock_tw_daily": "交易日期",
+}
+INCOME_FILE = "raw_conceptstock_company_income.csv"
+REVENUE_FILE = "raw_conceptstock_company_revenue.csv"
+QUARTERLY_SEGMENTS_FILE = "raw_conceptstock_company_quarterly_segments.csv"
+OVERRIDES_FILE = "raw_conceptstock_company_segment_overrides.csv"
+METADATA_FILE = "raw_conceptstock_company_metadata.csv"
+VALUATION_FILE = "raw_conceptstock_daily_valuation.csv"
+FX_FILE = "raw_conceptstock_fx_daily.csv"
+BREADTH_FILE = "raw_conceptstock_concept_breadth.csv"
+LEAD_LAG_FILE = "raw_conceptstock_lead_lag.csv"
+
+Columns = Dict[str, np.ndarray]
+Tables = Dict[str, Columns]
+
+# Typed conversions shared by the rules of one run: (id(table), column, kind) -> array.
+_typed_cache: Dict[Tuple[int, str, str], np.ndarray] = {}
+
+
+def floats(table: Columns, column: str) -> np.ndarray:
+    key = (id(table), column, "f")
+    if key not in _typed_cache:
+        _typed_cache[key] = to_float_array(table[column])
+    return _typed_cache[key]
+
+
+def dates(table: Columns, column: str) -> np.ndarray:
+    key = (id(table), column, "D")
+    if key not in _typed_cache:
+        _typed_cache[key] = to_date_array(table[column])
+    return _typed_cache[key]
+
+
+# ── Array helpers ─────────────────────────────────────────────────────────────
+
+
+def group_ids(*keys: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Dense group id per row for a composite key.
+
+    Returns:
+        (ids, number_of_groups)
+    """
+    if not keys or not len(keys[0]):
+        return np.zeros(0, dtype=np.int64), 0
+    composite = keys[0].astype(object)
+    for key in keys[1:]:
+        composite = composite + "\x1f" + key.astype(object)
+    _, ids = np.unique(composite.astype(str), return_inverse=True)
+    return ids, int(ids.max()) + 1
+
+
+def duplicate_mask(*keys: np.ndarray) -> np.ndarray:
+    """Rows whose composite key occurs more than once."""
+    ids, n = group_ids(*keys)
+    if not n:
+        return np.zeros(0, dtype=bool)
+    return np.bincount(ids, minlength=n)[ids] > 1
+
+
+def decreasing_within(codes: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """Rows whose date is not after the previous row of the same code (file order)."""
+    out = np.zeros(len(codes), dtype=bool)
+    if len(codes) > 1:
+        same = codes[1:] == codes[:-1]
+        out[1:] = same & (dates[1:] <= dates[:-1])
+    return out
+
+
+def fiscal_year_gap_mask(table: Columns) -> np.ndarray:
+    fy = floats(table, "fiscal_year")
+    end = dates(table, "end_date")
+    end_year = end.astype("datetime64[Y]").astype(np.int64) + 1970
+    valid = ~np.isnan(fy) & ~np.isnat(end)
+    return valid & (np.abs(end_year - np.where(valid, fy, 0)) > MAX_FISCAL_YEAR_GAP)
+
+
+def segment_sum_mismatch(
+    seg_keys: List[np.ndarray],
+    seg_revenue: np.ndarray,
+    total_keys: List[np.ndarray],
+    totals: np.ndarray,
+) -> np.ndarray:
+    """
+    Flag segment rows whose group sum differs from every matching total revenue.
+
+    Income rows from different sources can disagree (and SEC fiscal_year labels
+    are occasionally a year off), so a group passes when any total for its key
+    is within SEGMENT_SUM_TOLERANCE.
+
+    Args:
+        seg_keys: Key columns of the segment rows (e.g. symbol, fiscal_year, period)
+        seg_revenue: Segment revenue floats
+        total_keys: Same key columns for the total rows
+        totals: Total revenue floats
+
+    Returns:
+        Boolean mask over segment rows (groups without a total are not flagged)
+    """
+    n_seg = len(seg_revenue)
+    if not n_seg or not len(totals):
+        return np.zeros(n_seg, dtype=bool)
+    # Shared id space so segment groups and totals line up.
+    joined = [np.concatenate([a, b]) for a, b in zip(seg_keys, total_keys)]
+    ids, n = group_ids(*joined)
+    seg_ids, total_ids = ids[:n_seg], ids[n_seg:]
+    sums = np.bincount(seg_ids, weights=np.nan_to_num(seg_revenue), minlength=n)
+    valid = totals > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = np.abs(sums[total_ids] - totals) / totals
+    has_total = np.bincount(total_ids[valid], minlength=n) > 0
+    matched = np.bincount(total_ids[valid & (rel <= SEGMENT_SUM_TOLERANCE)], minlength=n) > 0
+    return (has_total & ~matched)[seg_ids]
+
+
+# ── Rule catalogue ────────────────────────────────────────────────────────────
+
+
+def _price_rules(date_col: str) -> List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]:
+    def open_close(t: Columns) -> Tuple[np.ndarray, np.ndarray]:
+        return floats(t, "開盤_價格_元"), floats(t, "收盤_價格_元")
+
+    def nonpositive(t: Columns, _: Tables) -> np.ndarray:
+        o, c = open_close(t)
+        return (o <= 0) | (c <= 0)
+
+    def missing_close(t: Columns, _: Tables) -> np.ndarray:
+        return np.isnan(open_close(t)[1])
+
+    def bad_date(t: Columns, _: Tables) -> np.ndarray:
+        return np.isnat(dates(t, date_col))
+
+    def duplicate(t: Columns, _: Tables) -> np.ndarray:
+        return duplicate_mask(t["stock_code"], t[date_col])
+
+    def non_monotonic(t: Columns, _: Tables) -> np.ndarray:
+        # Keys sort lexically (YYYY-MM-DD, YYYY-Www, YYYY-MM).
+        return decreasing_within(t["stock_code"], t[date_col])
+
+    def change_mismatch(t: Columns, _: Tables) -> np.ndarray:
+        close = open_close(t)[1]
+        change = floats(t, "漲跌_價格_元")
+        codes = t["stock_code"]
+        out = np.zeros(len(close), dtype=bool)
+        if len(close) > 1:
+            same = codes[1:] == codes[:-1]
+            expected = close[1:] - close[:-1]
+            tol = PRICE_CHANGE_TOLERANCE * np.maximum(np.abs(close[:-1]), 1.0)
+            out[1:] = same & ~np.isnan(change[1:]) & (np.abs(change[1:] - expected) > tol)
+        return out
+
+    return [
+        ("price_nonpositive", BLOCKING, "Open or close <= 0", nonpositive),
+        ("price_bad_date", BLOCKING, f"{date_col} missing or unparsable", bad_date),
+        ("price_duplicate_key", BLOCKING, f"Duplicate (stock_code, {date_col})", duplicate),
+        ("price_non_monotonic", BLOCKING, f"{date_col} not increasing within a ticker", non_monotonic),
+        ("price_missing_close", WARNING, "Close price missing", missing_close),
+        ("price_change_mismatch", WARNING, "漲跌_價格_元 != close - previous close", change_mismatch),
+    ]
+
+
+def _income_rules() -> List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]:
+    def duplicate(t: Columns, _: Tables) -> np.ndarray:
+        return duplicate_mask(t["symbol"], t["fiscal_year"], t["period"], t["source"])
+
+    def fy_gap(t: Columns, _: Tables) -> np.ndarray:
+        return fiscal_year_gap_mask(t)
+
+    def bad_period(t: Columns, _: Tables) -> np.ndarray:
+        return ~np.isin(t["period"], ("Q1", "Q2", "Q3", "Q4", "FY"))
+
+    def negative_revenue(t: Columns, _: Tables) -> np.ndarray:
+        return floats(t, "total_revenue") < 0
+
+    def margin_mismatch(t: Columns, _: Tables) -> np.ndarray:
+        revenue = floats(t, "total_revenue")
+        gross = floats(t, "gross_profit")
+        margin = floats(t, "gross_margin")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            implied = gross / revenue
+        checkable = (revenue > 0) & ~np.isnan(gross) & ~np.isnan(margin)
+        return checkable & (np.abs(implied - margin) > 0.01)
+
+    return [
+        ("income_duplicate_key", BLOCKING, "Duplicate (symbol, fiscal_year, period, source)", duplicate),
+        ("income_bad_period", BLOCKING, "period not in Q1-Q4/FY", bad_period),
+        ("income_negative_revenue", BLOCKING, "total_revenue < 0", negative_revenue),
+        ("income_fiscal_year_gap", WARNING, "end_date year more than 1 from fiscal_year", fy_gap),
+        ("income_gross_margin_mismatch", WARNING, "gross_margin != gross_profit / total_revenue", margin_mismatch),
+    ]
+
+
+def _income_totals(tables: Tables, periods: Tuple[str, ...]) -> Tuple[List[np.ndarray], np.ndarray]:
+    income = tables.get(INCOME_FILE)
+    if not income:
+        empty = np.zeros(0, dtype=str)
+        return [empty, empty, empty], np.zeros(0)
+    mask = np.isin(income["period"], periods)
+    keys = [income["symbol"][mask], income["fiscal_year"][mask], income["period"][mask]]
+    return keys, floats(income, "total_revenue")[mask]
+
+
+def _revenue_rules() -> List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]:
+    def duplicate(t: Columns, _: Tables) -> np.ndarray:
+        return duplicate_mask(
+            t["symbol"], t["fiscal_year"], t["period"], t["segment_type"], t["segment_name"], t["source"]
+        )
+
+    def fy_gap(t: Columns, _: Tables) -> np.ndarray:
+        return fiscal_year_gap_mask(t)
+
+    def sum_mismatch(t: Columns, tables: Tables) -> np.ndarray:
+        total_keys, totals = _income_totals(tables, ("FY",))
+        out = np.zeros(len(t["symbol"]), dtype=bool)
+        # Each (source, segment_type) breakdown should add up on its own.
+        for segment_type in ("product", "geography"):
+            for source in np.unique(t["source"]):
+                mask = (t["segment_type"] == segment_type) & (t["source"] == source)
+                period = np.full(int(mask.sum()), "FY")
+                out[mask] = segment_sum_mismatch(
+                    [t["symbol"][mask], t["fiscal_year"][mask], period],
+                    to_float_array(t["revenue"][mask]),
+                    total_keys,
+                    totals,
+                )
+        return out
+
+    return [
+        ("revenue_duplicate_key", BLOCKING, "Duplicate annual segment row", duplicate),
+        ("revenue_fiscal_year_gap", WARNING, "end_date year more than 1 from fiscal_year", fy_gap),
+        ("revenue_segment_sum_mismatch", WARNING, "Segments do not add up to FY total_revenue", sum_mismatch),
+    ]
+
+
+def _quarterly_segment_rules() -> List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]:
+    def duplicate(t: Columns, _: Tables) -> np.ndarray:
+        return duplicate_mask(t["symbol"], t["fiscal_year"], t["quarter"], t["segment_name"])
+
+    def fy_gap(t: Columns, _: Tables) -> np.ndarray:
+        return fiscal_year_gap_mask(t)
+
+    def sum_mismatch(t: Columns, tables: Tables) -> np.ndarray:
+        total_keys, totals = _income_totals(tables, ("Q1", "Q2", "Q3", "Q4"))
+        return segment_sum_mismatch(
+            [t["symbol"], t["fiscal_year"], t["quarter"]], floats(t, "revenue"), total_keys, totals
+        )
+
+    return [
+        ("quarterly_segment_duplicate_key", BLOCKING, "Duplicate (symbol, fiscal_year, quarter, segment)", duplicate),
+        ("quarterly_segment_fiscal_year_gap", WARNING, "end_date year more than 1 from fiscal_year", fy_gap),
+        (
+            "quarterly_segment_sum_mismatch",
+            WARNING,
+            "Segments do not add up to the quarter's total_revenue",
+            sum_mismatch,
+        ),
+    ]
+
+
+def _simple_rules() -> Dict[str, List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]]:
+    return {
+        OVERRIDES_FILE: [
+            (
+                "override_duplicate_key",
+                BLOCKING,
+                "Duplicate override (symbol, fiscal_year, period, segment)",
+                lambda t, _: duplicate_mask(t["symbol"], t["fiscal_year"], t["period"], t["segment_type"], t["segment_name"]),
+            ),
+            (
+                "override_nonpositive_revenue",
+                BLOCKING,
+                "Override revenue missing or <= 0",
+                lambda t, _: ~(floats(t, "revenue") > 0),
+            ),
+        ],
+        METADATA_FILE: [
+            (
+                "metadata_duplicate_concept",
+                BLOCKING,
+                "概念欄位 listed twice",
+                lambda t, _: duplicate_mask(t["概念欄位"]),
+            ),
+            (
+                "metadata_duplicate_ticker",
+                WARNING,
+                "Ticker mapped from more than one concept column",
+                lambda t, _: duplicate_mask(t["Ticker"]) & ~missing_mask(t["Ticker"]),
+            ),
+        ],
+        VALUATION_FILE: [
+            (
+                "valuation_duplicate_key",
+                BLOCKING,
+                "Duplicate (stock_code, 交易日期)",
+                lambda t, _: duplicate_mask(t["stock_code"], t["交易日期"]),
+            ),
+            (
+                "valuation_negative_ratio",
+                WARNING,
+                "pe_ratio or ps_ratio <= 0",
+                lambda t, _: (floats(t, "pe_ratio") <= 0) | (floats(t, "ps_ratio") <= 0),
+            ),
+        ],
+        BREADTH_FILE: [
+            (
+                "breadth_duplicate_key",
+                BLOCKING,
+                "Duplicate (concept, 交易日期)",
+                lambda t, _: duplicate_mask(t["concept"], t["交易日期"]),
+            ),
+            (
+                "breadth_share_out_of_range",
+                BLOCKING,
+                "pct_above_ma50/ma200 or anchor_return_pctile outside [0, 1]",
+                lambda t, _: np.any(
+                    [(floats(t, c) < 0) | (floats(t, c) > 1)
+                     for c in ("pct_above_ma50", "pct_above_ma200", "anchor_return_pctile")],
+                    axis=0,
+                ),
+            ),
+        ],
+        LEAD_LAG_FILE: [
+            (
+                "leadlag_duplicate_key",
+                BLOCKING,
+                "Duplicate (concept, stock_code, window_end)",
+                lambda t, _: duplicate_mask(t["concept"], t["stock_code"], t["window_end"]),
+            ),
+            (
+                "leadlag_corr_out_of_range",
+                BLOCKING,
+                "best_corr outside [-1, 1]",
+                lambda t, _: np.abs(floats(t, "best_corr")) > 1 + 1e-9,
+            ),
+        ],
+        FX_FILE: [
+            (
+                "fx_duplicate_key",
+                BLOCKING,
+                "Duplicate (currency, date)",
+                lambda t, _: duplicate_mask(t["currency"], t["date"]),
+            ),
+            (
+                "fx_nonpositive_rate",
+                BLOCKING,
+                "rate_per_usd missing or <= 0",
+                lambda t, _: ~(floats(t, "rate_per_usd") > 0),
+            ),
+        ],
+    }
+
+
+def rule_catalogue() -> Dict[str, List[Tuple[str, str, str, Callable[[Columns, Tables], np.ndarray]]]]:
+    """File name -> [(rule_id, severity, description, fn(table, all_tables) -> mask)]."""
+    catalogue = {name: _price_rules(date_col) for name, date_col in PRICE_FILES.items()}
+    catalogue[INCOME_FILE] = _income_rules()
+    catalogue[REVENUE_FILE] = _revenue_rules()
+    catalogue[QUARTERLY_SEGMENTS_FILE] = _quarterly_segment_rules()
+    catalogue.update(_simple_rules())
+    return catalogue
+
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+
+
+def _row_label(table: Columns, idx: int) -> Dict[str, str]:
+    """A few identifying cells for an example row."""
+    keys = [k for k in ("stock_code", "symbol", "Ticker", "currency", "fiscal_year", "period", "quarter",
+                        "segment_name", "交易日期", "交易週", "交易月份", "date", "end_date", "source") if k in table]
+    return {k: str(table[k][idx]) for k in keys}
+
+
+def validate_directory(data_dir: str, files: Optional[List[str]] = None) -> Dict[str, object]:
+    """
+    Run the rule catalogue over every raw_conceptstock_*.csv in a directory.
+
+    Args:
+        data_dir: Directory holding the CSVs
+        files: Optional subset of file names to check
+
+    Returns:
+        Report dict: {"files": {...}, "violations": [...], "blocking": int, "warnings": int, "elapsed_ms": float}
+    """
+    start = time.perf_counter()
+    catalogue = rule_catalogue()
+    paths = sorted(glob.glob(os.path.join(data_dir, "raw_conceptstock_*.csv")))
+    # Partitioned outputs (a directory of yearly CSVs) are checked as one table.
+    paths += [os.path.join(data_dir, name) for name in PRICE_FILES if os.path.isdir(os.path.join(data_dir, name))]
+    names = [os.path.basename(p) for p in paths]
+    if files:
+        names = [n for n in names if n in files]
+
+    tables: Tables = {name: read_columns(os.path.join(data_dir, name)) for name in names}
+    # Cross-file rules need the income totals even when only segments are selected.
+    if INCOME_FILE not in tables and os.path.exists(os.path.join(data_dir, INCOME_FILE)):
+        tables[INCOME_FILE] = read_columns(os.path.join(data_dir, INCOME_FILE))
+
+    file_summary: Dict[str, Dict[str, object]] = {}
+    violations: List[Dict[str, object]] = []
+    for name in names:
+        table = tables[name]
+        rows = len(next(iter(table.values()))) if table else 0
+        rules = catalogue.get(name, [])
+        file_summary[name] = {"rows": rows, "rules": len(rules), "checked": bool(rules)}
+        for rule_id, severity, description, fn in rules:
+            try:
+                mask = fn(table, tables)
+            except KeyError as exc:
+                violations.append(
+                    {
+                        "file": name,
+                        "rule": rule_id,
+                        "severity": severity,
+                        "description": f"Missing column {exc}",
+                        "count": rows,
+                        "examples": [],
+                    }
+                )
+                continue
+            hits = np.flatnonzero(mask)
+            if not len(hits):
+                continue
+            violations.append(
+                {
+                    "file": name,
+                    "rule": rule_id,
+                    "severity": severity,
+                    "description": description,
+                    "count": int(len(hits)),
+                    # +2: header line and 1-based numbering, so it matches an editor's line number.
+                    "examples": [
+                        {"line": int(i) + 2, **_row_label(table, int(i))} for i in hits[:MAX_EXAMPLES]
+                    ],
+                }
+            )
+
+    _typed_cache.clear()
+    return {
+        "data_dir": os.path.abspath(data_dir),
+        "files": file_summary,
+        "violations": violations,
+        "blocking": sum(v["count"] for v in violations if v["severity"] == BLOCKING),
+        "warnings": sum(v["count"] for v in violations if v["severity"] == WARNING),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
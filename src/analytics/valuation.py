@@ -0,0 +1,433 @@
+"""
+As-of valuation engine: daily P/E and P/S from prices and reported fundamentals.
+
+Every daily bar is aligned with the latest TTM (trailing four quarters) EPS,
+revenue and net income that had been *filed* by that date, not merely whose
+period had ended, so the series carries no look-ahead. Alignment uses a sorted
+array of availability dates and np.searchsorted.
+
+Quarter data comes from raw_conceptstock_company_income.csv:
+- Quarterly rows (Q1-Q4) from all sources are clustered by end_date (sources
+  label the same quarter with end dates a few days apart) and merged by source
+  priority, filling gaps from lower-priority sources.
+- SEC has no Q4 rows; Q4 is derived as FY - (Q1 + Q2 + Q3) of the same fiscal year.
+- Availability is `filed_date` when present, otherwise end_date plus the
+  statutory reporting lag (45 days for Q1-Q3, 90 days for Q4/FY).
+
+P/S uses implied shares = TTM net income / TTM EPS, since share counts are not
+stored. Prices, amounts and EPS in other currencies are brought to USD with the
+FX cache (src/fx_rates.py) at each bar's date; without FX coverage the ratios
+stay empty.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+VALUATION_FILE = "raw_conceptstock_daily_valuation.csv"
+
+VALUATION_FIELDNAMES = [
+    "stock_code",
+    "交易日期",
+    "收盤_價格_元",
+    "ttm_revenue",
+    "ttm_net_income",
+    "ttm_eps",
+    "implied_shares",
+    "pe_ratio",
+    "ps_ratio",
+    "fundamentals_end_date",
+    "fundamentals_available_date",
+    "process_timestamp",
+]
+
+# Computed columns compared with the stored rows to find where to resume.
+VALUATION_FLOAT_FIELDS = (
+    "收盤_價格_元",
+    "ttm_revenue",
+    "ttm_net_income",
+    "ttm_eps",
+    "implied_shares",
+    "pe_ratio",
+    "ps_ratio",
+)
+VALUATION_DATE_FIELDS = ("fundamentals_end_date", "fundamentals_available_date")
+
+QUARTER_PERIODS = ("Q1", "Q2", "Q3", "Q4")
+
+# Lower value wins when several sources report the same quarter.
+SOURCE_PRIORITY = {
+    "SEC": 0,
+    "SEC_6K": 1,
+    "SEC_DERIVED_Q4": 2,
+    "FMP": 3,
+    "AlphaVantage": 4,
+    "YahooFinance": 5,
+}
+
+# Reporting lag (days after period end) assumed when filed_date is unknown.
+REPORT_LAG_DAYS = {
+    "Q": 45,
+    "FY": 90,
+}
+
+# Rows whose end dates are this close belong to the same fiscal quarter.
+SAME_QUARTER_DAYS = 20
+
+# Four consecutive quarters span roughly 270 days between first and last end date.
+TTM_SPAN_DAYS = (250, 300)
+
+# Price ticker -> income statement symbol when they differ.
+PRICE_TO_INCOME_SYMBOL = {
+    "GOOG": "GOOGL",
+}
+
+# EPS reported in a different currency than the listing it is compared with.
+# TSM 6-K presentations report EPS in NT$ per common share.
+EPS_CURRENCY_OVERRIDES = {
+    "TSM": "TWD",
+}
+
+# Common shares represented by one listed ADR.
+ADR_SHARES_PER_UNIT = {
+    "TSM": 5,
+}
+
+QUARTER_FIELDS = ("total_revenue", "net_income", "eps")
+
+
+def _num(value) -> float:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+    return result
+
+
+def available_date(row: Dict[str, str]) -> Optional[np.datetime64]:
+    """Date an income row became public: filed_date, else end_date + reporting lag."""
+    filed = (row.get("filed_date") or "").strip()
+    if filed and filed != "None":
+        return np.datetime64(filed[:10], "D")
+    end = (row.get("end_date") or "").strip()
+    if not end:
+        return None
+    lag = REPORT_LAG_DAYS["FY"] if row.get("period") in ("FY", "Q4") else REPORT_LAG_DAYS["Q"]
+    return np.datetime64(end[:10], "D") + np.timedelta64(lag, "D")
+
+
+def _derive_sec_q4(rows: List[Dict[str, str]]) -> List[Dict[str, object]]:
+    """Derive standalone Q4 = FY - (Q1 + Q2 + Q3) for SEC rows of the same fiscal year."""
+    sec = [r for r in rows if r.get("source") == "SEC"]
+    by_key = {(r.get("fiscal_year"), r.get("period")): r for r in sec}
+    derived = []
+    for (fy, period), fy_row in by_key.items():
+        if period != "FY":
+            continue
+        quarters = [by_key.get((fy, p)) for p in ("Q1", "Q2", "Q3")]
+        if any(q is None for q in quarters):
+            continue
+        record = {
+            "end_date": fy_row.get("end_date"),
+            "available": available_date(fy_row),
+            "source": "SEC_DERIVED_Q4",
+        }
+        for field in QUARTER_FIELDS:
+            record[field] = _num(fy_row.get(field)) - sum(_num(q.get(field)) for q in quarters)
+        derived.append(record)
+    return derived
+
+
+def build_quarter_table(income_rows: List[Dict[str, str]]) -> Dict[str, np.ndarray]:
+    """
+    Build one merged record per fiscal quarter for a single symbol.
+
+    Args:
+        income_rows: Income CSV rows for one symbol (all sources, all periods)
+
+    Returns:
+        Dict of arrays sorted by end date: end, available (datetime64[D]),
+        total_revenue, net_income, eps (float64, NaN if unknown)
+    """
+    candidates = []
+    for row in income_rows:
+        if row.get("period") not in QUARTER_PERIODS or not row.get("end_date"):
+            continue
+        record = {
+            "end_date": row["end_date"],
+            "available": available_date(row),
+            "source": row.get("source", ""),
+        }
+        for field in QUARTER_FIELDS:
+            record[field] = _num(row.get(field))
+        candidates.append(record)
+    candidates.extend(_derive_sec_q4(income_rows))
+    candidates = [c for c in candidates if c["available"] is not None]
+    candidates.sort(key=lambda c: c["end_date"])
+
+    # Cluster rows whose end dates fall within SAME_QUARTER_DAYS of the cluster's first row.
+    clusters: List[List[Dict[str, object]]] = []
+    for cand in candidates:
+        end = np.datetime64(cand["end_date"][:10], "D")
+        if clusters:
+            first_end = np.datetime64(clusters[-1][0]["end_date"][:10], "D")
+            if (end - first_end).astype(int) <= SAME_QUARTER_DAYS:
+                clusters[-1].append(cand)
+                continue
+        clusters.append([cand])
+
+    ends, avails = [], []
+    values = {field: [] for field in QUARTER_FIELDS}
+    for cluster in clusters:
+        cluster.sort(key=lambda c: SOURCE_PRIORITY.get(c["source"], len(SOURCE_PRIORITY)))
+        used_avail = []
+        for field in QUARTER_FIELDS:
+            value = float("nan")
+            for cand in cluster:
+                if not np.isnan(cand[field]):
+                    value = cand[field]
+                    used_avail.append(cand["available"])
+                    break
+            values[field].append(value)
+        ends.append(np.datetime64(cluster[0]["end_date"][:10], "D"))
+        # A merged quarter is only known once every contributing source had it.
+        avails.append(max(used_avail) if used_avail else cluster[0]["available"])
+
+    table = {
+        "end": np.asarray(ends, dtype="datetime64[D]"),
+        "available": np.asarray(avails, dtype="datetime64[D]"),
+    }
+    for field in QUARTER_FIELDS:
+        table[field] = np.asarray(values[field], dtype=float)
+    return table
+
+
+def build_ttm_table(quarters: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Sum four consecutive quarters into TTM records.
+
+    Args:
+        quarters: Output of build_quarter_table()
+
+    Returns:
+        Dict of arrays (one entry per TTM window): end, available, total_revenue,
+        net_income, eps. Windows with a gap are dropped.
+    """
+    n = len(quarters["end"])
+    if n < 4:
+        empty_dates = np.array([], dtype="datetime64[D]")
+        return {"end": empty_dates, "available": empty_dates, **{f: np.array([]) for f in QUARTER_FIELDS}}
+
+    ends = quarters["end"]
+    span = (ends[3:] - ends[:-3]).astype(int)
+    consecutive = (span >= TTM_SPAN_DAYS[0]) & (span <= TTM_SPAN_DAYS[1])
+
+    windows = np.lib.stride_tricks.sliding_window_view
+    table = {
+        "end": ends[3:][consecutive],
+        # TTM is available once its latest-known quarter is.
+        "available": windows(quarters["available"].astype(np.int64), 4).max(axis=1)[consecutive].astype("datetime64[D]"),
+    }
+    for field in QUARTER_FIELDS:
+        table[field] = windows(quarters[field], 4).sum(axis=1)[consecutive]
+    return table
+
+
+def asof_indices(ttm_available: np.ndarray, ttm_end: np.ndarray, bar_dates: np.ndarray) -> np.ndarray:
+    """
+    For each bar, index of the TTM record with the latest period end among those available on that date.
+
+    Args:
+        ttm_available: datetime64[D] availability per TTM record
+        ttm_end: datetime64[D] period end per TTM record
+        bar_dates: datetime64[D] bar dates
+
+    Returns:
+        int array of indices into the TTM arrays, -1 where nothing was available yet
+    """
+    if len(ttm_available) == 0:
+        return np.full(len(bar_dates), -1, dtype=np.int64)
+    # Rank records by period end; a late amendment of an old period must not
+    # displace a newer period already known.
+    by_end = np.argsort(ttm_end, kind="stable")
+    end_rank = np.empty(len(by_end), dtype=np.int64)
+    end_rank[by_end] = np.arange(len(by_end))
+    order = np.argsort(ttm_available, kind="stable")
+    avail_sorted = ttm_available[order]
+    best_so_far = by_end[np.maximum.accumulate(end_rank[order])]
+    pos = np.searchsorted(avail_sorted, bar_dates, side="right") - 1
+    return np.where(pos >= 0, best_so_far[np.maximum(pos, 0)], -1)
+
+
+def valuation_columns(
+    bar_dates: np.ndarray,
+    closes: np.ndarray,
+    ttm: Dict[str, np.ndarray],
+    price_factor: Optional[np.ndarray] = None,
+    amount_factor: Optional[np.ndarray] = None,
+    eps_factor: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute P/E and P/S for the given bars as column arrays.
+
+    Args:
+        bar_dates: datetime64[D] bar dates
+        closes: Close prices
+        ttm: Output of build_ttm_table()
+        price_factor: Optional per-bar USD per unit of the close's currency
+        amount_factor: Optional per-bar USD per unit of the revenue/net income currency
+        eps_factor: Optional per-bar multiplier bringing EPS to USD per listed
+            share (includes the ADR ratio). NaN leaves P/E and P/S empty.
+
+    The ttm_* output columns stay in reported currency; only the ratios use
+    the factors.
+
+    Returns:
+        Dict keyed by VALUATION_FLOAT_FIELDS (float64, NaN if empty) and
+        VALUATION_DATE_FIELDS (str, "" before any TTM record is available)
+    """
+    idx = asof_indices(ttm["available"], ttm["end"], bar_dates)
+    has = idx >= 0
+    safe = np.maximum(idx, 0)
+
+    if len(ttm["end"]):
+        revenue, net_income, eps = (
+            np.where(has, ttm[field][safe], np.nan) for field in QUARTER_FIELDS
+        )
+    else:
+        revenue = net_income = eps = np.full(len(bar_dates), np.nan)
+    closes = np.asarray(closes, dtype=float)
+    ones = np.ones(len(bar_dates))
+    price_usd = closes * (ones if price_factor is None else price_factor)
+    revenue_usd = revenue * (ones if amount_factor is None else amount_factor)
+    net_income_usd = net_income * (ones if amount_factor is None else amount_factor)
+    eps_usd = eps * (ones if eps_factor is None else eps_factor)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied_shares = np.where(eps_usd != 0, net_income_usd / eps_usd, np.nan)
+        # Negative or zero earnings make P/E meaningless; leave it empty.
+        pe = np.where(eps_usd > 0, price_usd / eps_usd, np.nan)
+        ps = np.where(
+            (revenue_usd > 0) & (implied_shares > 0), price_usd * implied_shares / revenue_usd, np.nan
+        )
+
+    if len(ttm["end"]):
+        end_keys = np.where(has, np.datetime_as_string(ttm["end"][safe], unit="D"), "")
+        avail_keys = np.where(has, np.datetime_as_string(ttm["available"][safe], unit="D"), "")
+    else:
+        end_keys = avail_keys = np.full(len(bar_dates), "")
+
+    return {
+        "收盤_價格_元": closes,
+        "ttm_revenue": revenue,
+        "ttm_net_income": net_income,
+        "ttm_eps": eps,
+        "implied_shares": implied_shares,
+        "pe_ratio": pe,
+        "ps_ratio": ps,
+        "fundamentals_end_date": end_keys,
+        "fundamentals_available_date": avail_keys,
+    }
+
+
+def first_changed_bar(
+    stored: Dict[str, Dict[str, str]],
+    bar_dates: np.ndarray,
+    columns: Dict[str, np.ndarray],
+) -> int:
+    """
+    Index of the first bar whose stored row is missing or differs from the recomputed columns.
+
+    A late filing, an amended quarter or a backfilled FX rate changes the
+    ratios from its own date onward, which may be long before the latest
+    stored bar; so does a revised close. Everything from the first
+    difference is recomputed.
+
+    Args:
+        stored: Stored valuation rows of one ticker keyed by 交易日期
+        bar_dates: datetime64[D] bar dates (ascending)
+        columns: Output of valuation_columns() for those bars
+
+    Returns:
+        Bar index, len(bar_dates) if every bar matches its stored row
+    """
+    date_keys = np.datetime_as_string(bar_dates, unit="D").tolist()
+    rows = [stored.get(key) for key in date_keys]
+    changed = np.array([row is None for row in rows], dtype=bool)
+    rows = [row or {} for row in rows]
+    for field in VALUATION_FLOAT_FIELDS:
+        old = np.array([_num(row.get(field)) for row in rows], dtype=float)
+        changed |= ~np.isclose(old, columns[field], rtol=1e-9, atol=0.0, equal_nan=True)
+    for field in VALUATION_DATE_FIELDS:
+        old = np.array([(row.get(field) or "")[:10] for row in rows], dtype=str)
+        changed |= old != columns[field]
+    hits = np.flatnonzero(changed)
+    return int(hits[0]) if len(hits) else len(date_keys)
+
+
+def compute_valuation(
+    ticker: str,
+    bar_dates: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    start: int = 0,
+) -> List[Dict[str, object]]:
+    """
+    Build valuation rows from valuation_columns() output.
+
+    Args:
+        ticker: Price ticker
+        bar_dates: datetime64[D] bar dates
+        columns: Output of valuation_columns() for those bars
+        start: First bar to emit
+
+    Returns:
+        Valuation rows (VALUATION_FIELDNAMES keys)
+    """
+    date_keys = np.datetime_as_string(bar_dates[start:], unit="D").tolist()
+    process_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+
+    def clean(arr):
+        return np.where(np.isnan(arr), None, arr).tolist()
+
+    values = {field: clean(columns[field][start:]) for field in VALUATION_FLOAT_FIELDS}
+    values.update(
+        (field, [key or None for key in columns[field][start:].tolist()]) for field in VALUATION_DATE_FIELDS
+    )
+    rows = []
+    for i, date_key in enumerate(date_keys):
+        rows.append({
+            "stock_code": ticker,
+            "交易日期": date_key,
+            **{name: col[i] for name, col in values.items()},
+            "process_timestamp": process_ts,
+        })
+    return rows
+
+
+def income_symbol_for(ticker: str) -> str:
+    return PRICE_TO_INCOME_SYMBOL.get(ticker, ticker)
+
+
+def eps_currency_for(symbol: str, reported_currency: str) -> str:
+    return EPS_CURRENCY_OVERRIDES.get(symbol, reported_currency or "USD")
+
+
+def adr_ratio_for(ticker: str) -> float:
+    return float(ADR_SHARES_PER_UNIT.get(ticker, 1))
+
+
+def group_income_rows(income_rows: List[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+    grouped: Dict[str, List[Dict[str, str]]] = {}
+    for row in income_rows:
+        grouped.setdefault(row.get("symbol", ""), []).append(row)
+    return grouped
+
+
+def stored_by_ticker(existing_rows: List[Dict[str, str]]) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Stored valuation rows grouped by ticker and keyed by 交易日期."""
+    stored: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for row in existing_rows:
+        stored.setdefault(row.get("stock_code", ""), {})[row.get("交易日期") or ""] = row
+    return stored
+
@@ -0,0 +1,195 @@
+"""
+Downsampled chart series (Largest-Triangle-Three-Buckets) per ticker and cadence.
+
+Dashboards only need a few thousand points per line; shipping them the full
+CSV is what makes them slow. For every ticker of a price CSV this writes one
+compact JSON per target resolution:
+
+    raw_conceptstock_charts/{cadence}/{ticker}_{points}.json
+    {"ticker": ..., "cadence": ..., "points": 500, "source_rows": 6612,
+     "first": "2000-01-03", "last": "2026-08-21", "t": [...], "c": [...]}
+
+A manifest keeps a digest of each ticker's (date, close) series, so a run
+only rewrites the tickers whose data changed.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.analytics.columns import read_columns, to_float_array
+
+CHARTS_DIR = "raw_conceptstock_charts"
+CHART_MANIFEST = "manifest.json"
+CHART_RESOLUTIONS = (500, 2000)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the points between are split
+    into threshold - 2 equal buckets, and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept.
+
+    Args:
+        x: Increasing float x values
+        y: Float y values (no NaN)
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted int array of kept indices (all indices when len(x) <= threshold)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket b covers [edges[b], edges[b+1]); the final bucket is the last point alone.
+    edges = np.arange(threshold - 1, dtype=np.int64) * (n - 2) // (threshold - 2) + 1
+    edges = np.append(edges, n)
+    # Averages of every bucket up front (cumulative sums), so the loop only picks the point.
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    counts = edges[1:] - edges[:-1]
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    prev = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nx, ny = avg_x[b + 1], avg_y[b + 1]
+        px, py = x[prev], y[prev]
+        area = np.abs((px - nx) * (y[lo:hi] - py) - (px - x[lo:hi]) * (ny - py))
+        prev = lo + int(np.argmax(area))
+        kept[b + 1] = prev
+    return kept
+
+
+def _date_axis(keys: np.ndarray) -> np.ndarray:
+    """Day ordinals for YYYY-MM-DD / YYYY-MM keys; row positions if they do not parse."""
+    try:
+        return np.asarray(keys, dtype="datetime64[D]").astype(np.int64).astype(float)
+    except ValueError:
+        return np.arange(len(keys), dtype=float)
+
+
+def series_digest(keys: np.ndarray, closes: np.ndarray) -> str:
+    h = hashlib.sha1()
+    h.update("\n".join(keys.tolist()).encode("utf-8"))
+    h.update("\n".join(closes.tolist()).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_chart_manifest(charts_dir: str) -> Dict[str, Dict[str, object]]:
+    path = os.path.join(charts_dir, CHART_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as exc:
+        print(f"Warning: Could not read {path} ({exc}); regenerating all charts.")
+        return {}
+
+
+def chart_payload(
+    ticker: str, cadence: str, keys: np.ndarray, closes: np.ndarray, points: int
+) -> Dict[str, object]:
+    keep = lttb_indices(_date_axis(keys), closes, points)
+    return {
+        "ticker": ticker,
+        "cadence": cadence,
+        "points": points,
+        "source_rows": len(keys),
+        "first": str(keys[0]),
+        "last": str(keys[-1]),
+        "t": keys[keep].tolist(),
+        "c": [round(float(v), 6) for v in closes[keep]],
+    }
+
+
+def _write_json(path: str, payload: object) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def update_chart_series(
+    out_dir: str,
+    sources: Dict[str, Tuple[str, str]],
+    resolutions: Sequence[int] = CHART_RESOLUTIONS,
+    only: Optional[List[str]] = None,
+) -> Tuple[int, int]:
+    """
+    Regenerate the downsampled JSON series whose source data changed.
+
+    Args:
+        out_dir: Directory holding the price CSVs (charts go to out_dir/raw_conceptstock_charts)
+        sources: cadence -> (CSV file name, date column)
+        resolutions: Target point counts per series
+        only: Restrict to these tickers (default: every ticker in each CSV)
+
+    Returns:
+        (series rewritten, series unchanged)
+    """
+    charts_dir = os.path.join(out_dir, CHARTS_DIR)
+    manifest = load_chart_manifest(charts_dir)
+    resolution_tag = ",".join(str(p) for p in resolutions)
+    written = unchanged = 0
+
+    for cadence, (file_name, date_col) in sources.items():
+        cols = read_columns(os.path.join(out_dir, file_name), ["stock_code", date_col, "收盤_價格_元"])
+        if not cols or not len(cols["stock_code"]):
+            continue
+        codes, keys, raw_closes = cols["stock_code"], cols[date_col], cols["收盤_價格_元"]
+        order = np.lexsort((keys, codes))
+        codes, keys, raw_closes = codes[order], keys[order], raw_closes[order]
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+        ends = np.append(starts[1:], len(codes))
+
+        cadence_dir = os.path.join(charts_dir, cadence)
+        cadence_manifest = manifest.setdefault(cadence, {})
+        for lo, hi in zip(starts.tolist(), ends.tolist()):
+            ticker = str(codes[lo])
+            if only and ticker not in only:
+                continue
+            digest = f"{series_digest(keys[lo:hi], raw_closes[lo:hi])}:{resolution_tag}"
+            entry = cadence_manifest.get(ticker) or {}
+            if entry.get("digest") == digest:
+                unchanged += 1
+                continue
+
+            closes = to_float_array(raw_closes[lo:hi])
+            valid = ~np.isnan(closes)
+            if not valid.any():
+                continue
+            os.makedirs(cadence_dir, exist_ok=True)
+            t_keys, t_closes = keys[lo:hi][valid], closes[valid]
+            for points in resolutions:
+                payload = chart_payload(ticker, cadence, t_keys, t_closes, points)
+                _write_json(os.path.join(cadence_dir, f"{ticker}_{points}.json"), payload)
+            cadence_manifest[ticker] = {
+                "digest": digest,
+                "rows": int(valid.sum()),
+                "last": str(t_keys[-1]),
+                "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S CST"),
+            }
+            written += 1
+
+    if written:
+        os.makedirs(charts_dir, exist_ok=True)
+        manifest_path = os.path.join(charts_dir, CHART_MANIFEST)
+        tmp = f"{manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, manifest_path)
+    return written, unchanged
@@ -2,3 +2,4 @@
 # - SEC EDGAR: Free, official US SEC filings
 # - Alpha Vantage: Income statements (cross-check)
 # - FMP: Segment revenue (cross-check)
+# - Yahoo chart: Price history via the chart JSON endpoint (no pandas)
@@ -154,7 +154,8 @@ class AlphaVantageClient:
 
         Returns:
             List of quarterly earnings records with keys:
-              fiscal_date_ending, period, non_gaap_eps, eps_estimate, eps_surprise_pct
+              fiscal_date_ending, period, non_gaap_eps, eps_estimate, eps_surprise_pct,
+              reported_date (announcement date)
         """
         url = f"{self.BASE_URL}?function=EARNINGS&symbol={symbol}&apikey={self.api_key}"
         data = self._fetch_json(url)
@@ -187,6 +188,7 @@ class AlphaVantageClient:
                 "non_gaap_eps": reported,
                 "eps_estimate": estimated,
                 "eps_surprise_pct": surprise,
+                "reported_date": report.get("reportedDate") or None,
                 "source_url": mask_api_key(url),
             })
         return results
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Streaming extraction of selected concepts from an SEC companyfacts document.
+
+A large filer's companyfacts JSON is 50-100 MB and becomes several hundred MB
+of Python objects under json.loads, while the income statement only reads a
+few dozen us-gaap concepts. extract_companyfacts() scans the document in
+chunks and decodes only the wanted concept objects, keeping only the wanted
+unit types and forms; everything else is skipped as text.
+
+Every concept in companyfacts is written as
+
+    "ConceptName":{"label":...,"description":...,"units":{...}}
+
+and '":{"label"' cannot occur inside a JSON string (its quotes would be
+escaped), so each occurrence marks exactly one concept key. The first concept
+of a taxonomy is preceded by '"taxonomy":{', which is how the scanner knows
+whether it is inside us-gaap.
+
+The result has the same shape as the full document restricted to the subset:
+    {"cik": ..., "entityName": ..., "facts": {"us-gaap": {concept: {"label", "units"}}}}
+"""
+
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import BinaryIO, Dict, Iterable, Optional
+
+FACT_FORMS = ("10-K", "10-K/A", "10-Q", "10-Q/A")
+FACT_UNITS = ("USD", "USD/shares", "pure")
+CHUNK_SIZE = 1 << 20
+
+_CONCEPT_MARK = '":{"label"'
+# Text kept from the end of a chunk so a concept key split across chunks is still seen.
+_OVERLAP = 4096
+_HEADER_CIK = re.compile(r'"cik"\s*:\s*(\d+)')
+_HEADER_NAME = re.compile(r'"entityName"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def subset_signature(concepts: Iterable[str], units=FACT_UNITS, forms=FACT_FORMS) -> str:
+    """Digest of the extraction settings (a cached subset is only valid for the same ones)."""
+    spec = "|".join([",".join(sorted(set(concepts))), ",".join(units), ",".join(forms)])
+    return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:16]
+
+
+def extract_companyfacts(
+    stream: BinaryIO,
+    concepts: Iterable[str],
+    units=FACT_UNITS,
+    forms=FACT_FORMS,
+    taxonomy: str = "us-gaap",
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict:
+    """
+    Extract the wanted concepts from a companyfacts JSON byte stream.
+
+    Args:
+        stream: Readable binary stream of the (decompressed) document
+        concepts: Concept names to keep
+        units: Unit types to keep within each concept
+        forms: Forms to keep within each unit
+        taxonomy: Taxonomy the concepts belong to
+        chunk_size: Bytes read per step
+
+    Returns:
+        Companyfacts-shaped dict holding only the selected facts ({} for an empty document)
+
+    Raises:
+        ValueError: The document is truncated or malformed inside a wanted concept
+    """
+    wanted = set(concepts)
+    unit_set, form_set = set(units), set(forms)
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    decoder = json.JSONDecoder()
+
+    selected: Dict[str, Dict] = {}
+    header: Dict[str, object] = {}
+    buf, pos, eof = "", 0, False
+    current = None
+
+    def read_chunk(size: int = chunk_size) -> str:
+        nonlocal eof
+        data = stream.read(size)
+        if not data:
+            eof = True
+            return utf8.decode(b"", final=True)
+        return utf8.decode(data)
+
+    buf = read_chunk()
+    if not buf.strip():
+        return {}
+    match = _HEADER_CIK.search(buf, 0, _OVERLAP)
+    if match:
+        header["cik"] = int(match.group(1))
+    match = _HEADER_NAME.search(buf, 0, _OVERLAP)
+    if match:
+        header["entityName"] = json.loads(match.group(1))
+
+    while True:
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+        mark = buf.find(_CONCEPT_MARK, pos)
+        if mark < 0:
+            if eof:
+                break
+            keep = max(pos, len(buf) - _OVERLAP)
+            buf, pos = buf[keep:] + read_chunk(), 0
+            continue
+
+        quote = buf.rfind('"', 0, mark)
+        name = buf[quote + 1:mark]
+        if buf[quote - 3:quote] == '":{':
+            current = buf[buf.rfind('"', 0, quote - 3) + 1:quote - 3]
+
+        if current != taxonomy or name not in wanted:
+            pos = mark + len(_CONCEPT_MARK)
+            continue
+
+        start = mark + 2
+        while True:
+            try:
+                concept, end = decoder.raw_decode(buf, start)
+                break
+            except ValueError:
+                if eof:
+                    raise ValueError(f"companyfacts document ends inside concept {name}")
+                # Grow geometrically so a large concept is decoded a few times, not once per chunk.
+                buf += read_chunk(max(chunk_size, len(buf) - start))
+        selected[name] = {
+            "label": concept.get("label"),
+            "units": {
+                unit: [item for item in items if item.get("form") in form_set]
+                for unit, items in (concept.get("units") or {}).items()
+                if unit in unit_set
+            },
+        }
+        pos = end
+
+    return dict(header, facts={taxonomy: selected})
+
+
+def load_subset(path: str, source: str, signature: str) -> Optional[Dict]:
+    """Cached subset if it was extracted from the same source body with the same settings."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    if cached.get("source") != source or cached.get("signature") != signature:
+        return None
+    return cached.get("companyfacts")
+
+
+def save_subset(path: str, source: str, signature: str, companyfacts: Dict) -> None:
+    """Write an extracted subset next to the full body (gzip JSON, atomic)."""
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(
+            {"source": source, "signature": signature, "companyfacts": companyfacts},
+            f,
+            separators=(",", ":"),
+        )
+    os.replace(tmp, path)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Permanent local store for SEC archive documents.
+
+Everything under /Archives/edgar/data/{cik}/{accession}/ is immutable once
+published, so a document fetched once never has to be fetched again. Blobs
+are content-addressed (objects/{sha[:2]}/{sha}.zst|.gz, zstd when the
+`zstandard` package is installed, gzip otherwise) and index.json maps
+"{cik}/{accession}/{filename}" to a blob plus its last access time. When the
+store grows past its size limit, the least recently used entries are evicted.
+
+Puts only mark the index dirty; eviction and the index.json rewrite happen
+together in save(), which runs every SAVE_EVERY puts and at exit.
+"""
+
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is used instead
+    zstandard = None
+
+DEFAULT_STORE_DIR = os.path.join(".cache", "sec_filings")
+DEFAULT_MAX_MB = 512
+INDEX_FILE = "index.json"
+
+# Puts between evict-and-save passes; the rest are flushed by save() at exit.
+SAVE_EVERY = 100
+
+_ARCHIVE_PATH = re.compile(r"/Archives/edgar/data/(\d+)/(\d{18})/([^/?#]+)$")
+
+
+def archive_key(url: str) -> Optional[str]:
+    """'{cik}/{accession}/{filename}' for an immutable archive URL, else None."""
+    match = _ARCHIVE_PATH.search(url)
+    if not match:
+        return None
+    cik, accession, filename = match.groups()
+    return f"{int(cik)}/{accession}/{filename}"
+
+
+def _compress(data: bytes) -> Tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=6), ".gz"
+
+
+def _decompress(blob: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed; cannot read .zst blobs")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+class FilingStore:
+    """Content-addressed, size-bounded store of SEC archive documents."""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+        # Scanner threads share one store; index reads/writes and saves are serialized.
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[str, object]] = self._load_index()
+        self._dirty = False
+        self._unsaved_puts = 0
+        atexit.register(self.save)
+
+    def _load_index(self) -> Dict[str, Dict[str, object]]:
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as exc:
+            print(f"  Warning: Could not read {path} ({exc}); starting an empty filing store.")
+            return {}
+
+    def _blob_path(self, sha: str, suffix: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}{suffix}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored document bytes, or None (missing or unreadable blob)."""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+        try:
+            with open(self._blob_path(entry["sha256"], entry["suffix"]), "rb") as f:
+                data = _decompress(f.read(), entry["suffix"])
+        except (OSError, EOFError, RuntimeError):
+            with self._lock:
+                self._index.pop(key, None)
+                self._dirty = True
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            entry["accessed"] = time.time()
+            self._dirty = True
+            self.stats["hits"] += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store a document (blobs with identical content are shared)."""
+        sha = hashlib.sha256(data).hexdigest()
+        # Blobs are immutable and content-addressed, so they are written outside
+        # the lock; only the index update is serialized.
+        suffix, stored = self._write_blob(sha, data)
+        with self._lock:
+            self._index[key] = {
+                "sha256": sha,
+                "suffix": suffix,
+                "size": len(data),
+                "stored": stored,
+                "accessed": time.time(),
+            }
+            self._dirty = True
+            self._unsaved_puts += 1
+            if self._unsaved_puts >= SAVE_EVERY:
+                self.save()
+
+    def _write_blob(self, sha: str, data: bytes) -> Tuple[str, int]:
+        suffix = next((sfx for sfx in (".zst", ".gz") if os.path.exists(self._blob_path(sha, sfx))), None)
+        if suffix is not None:
+            return suffix, os.path.getsize(self._blob_path(sha, suffix))
+        blob, suffix = _compress(data)
+        path = self._blob_path(sha, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        return suffix, len(blob)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            blobs = {(e["sha256"], e["suffix"]): e["stored"] for e in self._index.values()}
+        return sum(blobs.values())
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Drop least recently used entries until the blobs fit in max_bytes."""
+        with self._lock:
+            return self._evict(self.max_bytes if max_bytes is None else max_bytes)
+
+    def _evict(self, limit: int) -> int:
+        total = self.total_bytes()
+        if total <= limit:
+            return 0
+        refs: Dict[str, int] = {}
+        for entry in self._index.values():
+            refs[entry["sha256"]] = refs.get(entry["sha256"], 0) + 1
+        removed = 0
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["accessed"]):
+            if total <= limit:
+                break
+            del self._index[key]
+            removed += 1
+            refs[entry["sha256"]] -= 1
+            if refs[entry["sha256"]] == 0:
+                total -= entry["stored"]
+                try:
+                    os.remove(self._blob_path(entry["sha256"], entry["suffix"]))
+                except OSError:
+                    pass
+        self.stats["evicted"] += removed
+        self._dirty = True
+        return removed
+
+    def save(self) -> None:
+        """Evict down to the size limit and write index.json if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._evict(self.max_bytes)
+            self._unsaved_puts = 0
+            os.makedirs(self.root, exist_ok=True)
+            path = os.path.join(self.root, INDEX_FILE)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, separators=(",", ":"))
+            os.replace(tmp, path)
+            self._dirty = False
+
+    def pack(self, archive_path: str) -> int:
+        """Write the index and every blob to one uncompressed tar (blobs are already compressed)."""
+        self.save()
+        count = 0
+        with tarfile.open(archive_path, "w") as tar:
+            index_path = os.path.join(self.root, INDEX_FILE)
+            if os.path.exists(index_path):
+                tar.add(index_path, arcname=INDEX_FILE)
+            for sha, suffix in sorted({(e["sha256"], e["suffix"]) for e in self._index.values()}):
+                path = self._blob_path(sha, suffix)
+                if os.path.exists(path):
+                    tar.add(path, arcname=os.path.relpath(path, self.root))
+                    count += 1
+        return count
+
+    def unpack(self, archive_path: str) -> int:
+        """Merge a packed store into this one; existing entries win, newer access times are kept."""
+        added = 0
+        with tarfile.open(archive_path, "r") as tar:
+            packed_index: Dict[str, Dict[str, object]] = {}
+            for member in tar.getmembers():
+                if not member.isfile():
+                    continue
+                name = os.path.normpath(member.name)
+                if name.startswith("..") or os.path.isabs(name):
+                    continue
+                data = tar.extractfile(member).read()
+                if name == INDEX_FILE:
+                    packed_index = json.load(io.BytesIO(data))
+                    continue
+                target = os.path.join(self.root, name)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as f:
+                        f.write(data)
+            for key, entry in packed_index.items():
+                if not os.path.exists(self._blob_path(entry["sha256"], entry["suffix"])):
+                    continue
+                current = self._index.get(key)
+                if current is None:
+                    self._index[key] = entry
+                    added += 1
+                elif entry.get("accessed", 0) > current.get("accessed", 0):
+                    current["accessed"] = entry["accessed"]
+        self._dirty = True
+        self.save()
+        return added
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return sorted(self._index)
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['hits']} hit(s), {self.stats['misses']} miss(es), "
+            f"{len(self._index)} document(s), {self.total_bytes() / 1e6:.1f} MB stored"
+        )
@@ -231,7 +231,8 @@ class FMPClient:
 
         Returns:
             List of earnings records with keys:
-              fiscal_date_ending, period, non_gaap_eps, eps_estimate, eps_surprise_pct
+              fiscal_date_ending, period, non_gaap_eps, eps_estimate, eps_surprise_pct,
+              reported_date (announcement date)
         """
         url = (
             f"{self.BASE_URL}/stable/earnings"
@@ -255,6 +256,8 @@ class FMPClient:
                 "non_gaap_eps": self._safe_float(item.get("actual")),
                 "eps_estimate": self._safe_float(item.get("estimated")),
                 "eps_surprise_pct": self._safe_float(item.get("surprisePercentage")),
+                # "date" is the announcement date when fiscalDateEnding is given.
+                "reported_date": item.get("date") if item.get("fiscalDateEnding") else None,
                 "source_url": mask_api_key(url),
             })
         return results
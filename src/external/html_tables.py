@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Table extraction for SEC filing HTML.
+
+A 10-K/10-Q primary document holds hundreds of <table> blocks, and the
+segment parser only reads the ones that mention revenue. extract_tables() splits the document into <table>...</table> blocks with one
+regex pass, runs a cheap text screen on each raw block, and tokenizes only the
+blocks that pass.
+
+Backends:
+    "html.parser" - TableParser (stdlib HTMLParser), always available
+    "lxml"        - lxml.html (C), used by "auto" when installed
+
+segment_sections() narrows a document further, to windows following the
+"Segment Information" / "Disaggregation of Revenue" headings, for callers
+that can fall back to the full document when it finds nothing.
+
+Both backends return tables as lists of rows of stripped cell strings. They agree on
+well-formed markup (every XBRL-era filing); on pre-XBRL HTML with unclosed
+<td>/<tr> tags, lxml keeps the implied cells where TableParser drops them.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # optional: the stdlib parser is used instead
+    lxml_html = None
+
+Table = List[List[str]]
+
+_TABLE_TAG = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+# Both passes of parse_segment_tables() need "revenue" somewhere in the table
+# text, in any case: the vertical pass in a header ("Total revenues"), the
+# horizontal (segments-as-columns) pass in a row ("REVENUE", with amounts that
+# may be under 1,000). Neither needs anything else from the raw block, so
+# that is all the screen checks.
+_REVENUE_WORD = "revenue"
+
+# Heading words may be split by markup or non-breaking spaces
+# ("Segment&#160;<b>Information</b>").
+_GAP = r"(?:\s|&#160;|&#xa0;|&nbsp;|<[^>]*>)+"
+_SEGMENT_HEADING = re.compile(
+    rf"segment{_GAP}information|disaggregation{_GAP}of{_GAP}revenue", re.IGNORECASE
+)
+# A case-insensitive regex scan of a multi-MB document is slow; these literals
+# (both cases of the heading's first word, less its first letter) are found
+# with str.find and only their hits are checked against the regex.
+_HEADING_ANCHORS = ("egment", "EGMENT", "isaggregation", "ISAGGREGATION")
+SECTION_LEAD = 2_000
+SECTION_WINDOW = 250_000
+
+
+class TableParser(HTMLParser):
+    """HTML parser to extract tables from SEC filings."""
+
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        self.current_table = []
+        self.current_row = []
+        self.current_cell = []
+        self.in_table = False
+        self.in_row = False
+        self.in_cell = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.in_table = True
+            self.current_table = []
+        elif tag == "tr" and self.in_table:
+            self.in_row = True
+            self.current_row = []
+        elif tag in ("td", "th") and self.in_row:
+            self.in_cell = True
+            self.current_cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self.in_table:
+            self.in_table = False
+            if self.current_table:
+                self.tables.append(self.current_table)
+            self.current_table = []
+        elif tag == "tr" and self.in_row:
+            self.in_row = False
+            if self.current_row:
+                self.current_table.append(self.current_row)
+            self.current_row = []
+        elif tag in ("td", "th") and self.in_cell:
+            self.in_cell = False
+            self.current_row.append("".join(self.current_cell).strip())
+            self.current_cell = []
+
+    def handle_data(self, data):
+        if self.in_cell:
+            # Chunks are joined once at </td>; += on a str is quadratic for big cells.
+            self.current_cell.append(data)
+
+
+def iter_table_blocks(html: str) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) offsets of each <table>...</table> block.
+
+    Like TableParser, a <table> opened before the previous one closed
+    restarts the block, so nested tables yield the innermost one.
+    """
+    start = None
+    for match in _TABLE_TAG.finditer(html):
+        if not match.group(1):
+            start = match.start()
+        elif start is not None:
+            yield start, match.end()
+            start = None
+
+
+def segment_sections(html: str, lead: int = SECTION_LEAD, window: int = SECTION_WINDOW) -> str:
+    """
+    Text of the windows around the segment note headings ("" if none match).
+
+    Each window runs from `lead` characters before a heading to `window`
+    characters after it, extended to the end of a table it would cut.
+    Overlapping windows are merged and the windows are joined in document
+    order, so tables keep their relative order.
+    """
+    hits = []
+    for anchor in _HEADING_ANCHORS:
+        pos = html.find(anchor)
+        while pos >= 0:
+            if pos and _SEGMENT_HEADING.match(html, pos - 1):
+                hits.append(pos - 1)
+            pos = html.find(anchor, pos + 1)
+    if not hits:
+        return ""
+
+    spans: List[List[int]] = []
+    for hit in sorted(hits):
+        start, end = max(0, hit - lead), hit + window
+        tag = _TABLE_TAG.search(html, end)
+        if tag and tag.group(1):
+            end = tag.end()
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    return "".join(html[start:end] for start, end in spans)
+
+
+def revenue_table_candidate(block: str) -> bool:
+    """
+    Cheap screen on a raw <table> block for the segment revenue parser.
+
+    Case-insensitive. A word split by markup inside a cell ("Rev<b>enue</b>")
+    is missed; no filing seen so far does that.
+    """
+    return _REVENUE_WORD in block.lower()
+
+
+def _tables_lxml(block: str) -> Table:
+    root = lxml_html.fragment_fromstring(block, create_parent="div")
+    rows = []
+    for table in root.iter("table"):
+        for tr in table.iter("tr"):
+            cells = [
+                (cell.text_content() or "").strip()
+                for cell in tr
+                if isinstance(cell.tag, str) and cell.tag in ("td", "th")
+            ]
+            if cells:
+                rows.append(cells)
+        break
+    return rows
+
+
+def _tables_stdlib(block: str) -> Table:
+    parser = TableParser()
+    parser.feed(block)
+    parser.close()
+    return parser.tables[0] if parser.tables else []
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    if backend == "auto":
+        return "lxml" if lxml_html is not None else "html.parser"
+    if backend == "lxml" and lxml_html is None:
+        raise RuntimeError("lxml is not installed; use backend='html.parser'")
+    if backend not in ("lxml", "html.parser"):
+        raise ValueError(f"Unknown table backend: {backend}")
+    return backend
+
+
+def extract_tables(
+    html: str,
+    screen: Optional[Callable[[str], bool]] = revenue_table_candidate,
+    backend: str = "auto",
+) -> List[Table]:
+    """
+    Tables of an HTML document, tokenizing only the blocks that pass screen.
+
+    Args:
+        html: Document text
+        screen: Predicate on the raw block text; None keeps every table
+        backend: "auto", "lxml" or "html.parser"
+
+    Returns:
+        Tables in document order (non-empty rows, stripped cell text)
+    """
+    tokenize = _tables_lxml if resolve_backend(backend) == "lxml" else _tables_stdlib
+    tables = []
+    for start, end in iter_table_blocks(html):
+        block = html[start:end]
+        if screen is not None and not screen(block):
+            continue
+        table = tokenize(block)
+        if table:
+            tables.append(table)
+    return tables
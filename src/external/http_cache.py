@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+On-disk conditional-GET cache for large, rarely changing JSON responses.
+
+Each entry is two files under the cache directory:
+    {key}.json.gz   - the response body, gzip-compressed
+    {key}.meta.json - url, ETag, Last-Modified, sizes and timestamps
+
+Callers send the stored validators (If-None-Match / If-Modified-Since) and
+read the local body back when the server answers 304 Not Modified, so an
+unchanged document costs one small round trip instead of a full download.
+Bodies are copied to disk in chunks and can be read back as a stream, so a
+document never has to be held in memory whole.
+"""
+
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import BinaryIO, Dict, Optional
+
+# Default location of the SEC companyfacts cache (override with SEC_CACHE_DIR).
+DEFAULT_CACHE_DIR = os.path.join(".cache", "sec_edgar")
+STREAM_CHUNK = 1 << 20
+
+
+class ConditionalCache:
+    """Compressed response bodies plus their HTTP validators."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = {
+            "revalidated": 0,
+            "downloaded": 0,
+            "stale": 0,
+            "bytes_downloaded": 0,
+            "bytes_served": 0,
+        }
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json.gz", f"{base}.meta.json"
+
+    def meta(self, key: str) -> Dict[str, object]:
+        body_path, meta_path = self._paths(key)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return {}
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional request headers for a cached entry (empty if none)."""
+        meta = self.meta(key)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = str(meta["etag"])
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = str(meta["last_modified"])
+        return headers
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Decompressed cached body, or None if missing or unreadable."""
+        body_path, _ = self._paths(key)
+        try:
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, EOFError):
+            return None
+        self.stats["bytes_served"] += len(body)
+        return body
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Readable stream of the decompressed cached body, or None if missing."""
+        body_path, _ = self._paths(key)
+        if not os.path.exists(body_path):
+            return None
+        self.stats["bytes_served"] += int(self.meta(key).get("size") or 0)
+        return gzip.open(body_path, "rb")
+
+    def store(self, key: str, url: str, stream: BinaryIO, headers, encoded: bool = False) -> None:
+        """
+        Save a 200 response, copying the body to disk in chunks.
+
+        Args:
+            key: Cache key (file stem)
+            url: Request URL (informational)
+            stream: Response body stream
+            headers: Response headers (anything with .get())
+            encoded: The body is already gzip-encoded by the server and is stored as-is
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_path, _ = self._paths(key)
+        tmp = f"{body_path}.tmp"
+        size = wire_bytes = 0
+        with open(tmp, "wb") as out:
+            if encoded:
+                # Decompress alongside only to measure (and validate) the body.
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                for chunk in iter(lambda: stream.read(STREAM_CHUNK), b""):
+                    out.write(chunk)
+                    wire_bytes += len(chunk)
+                    while chunk:
+                        size += len(inflate.decompress(chunk, STREAM_CHUNK))
+                        chunk = inflate.unconsumed_tail
+                size += len(inflate.flush())
+            else:
+                with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+                    for chunk in iter(lambda: stream.read(STREAM_CHUNK), b""):
+                        gz.write(chunk)
+                        wire_bytes += len(chunk)
+                        size += len(chunk)
+        os.replace(tmp, body_path)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+        self._write_meta(
+            key,
+            {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "size": size,
+                "stored_size": os.path.getsize(body_path),
+                "fetched_at": now,
+                "validated_at": now,
+            },
+        )
+        self.stats["downloaded"] += 1
+        self.stats["bytes_downloaded"] += wire_bytes
+
+    def mark_validated(self, key: str, headers) -> None:
+        """Record a 304: refresh the timestamp and any validators the server re-sent."""
+        meta = self.meta(key)
+        if not meta:
+            return
+        meta["validated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+        if headers.get("ETag"):
+            meta["etag"] = headers.get("ETag")
+        if headers.get("Last-Modified"):
+            meta["last_modified"] = headers.get("Last-Modified")
+        self._write_meta(key, meta)
+        self.stats["revalidated"] += 1
+
+    def _write_meta(self, key: str, meta: Dict[str, object]) -> None:
+        _, meta_path = self._paths(key)
+        tmp = f"{meta_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, meta_path)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"{s['downloaded']} downloaded ({s['bytes_downloaded'] / 1e6:.1f} MB), "
+            f"{s['revalidated']} not modified, {s['stale']} served stale "
+            f"({s['bytes_served'] / 1e6:.1f} MB from cache)"
+        )
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Thread-safe token bucket shared by every client of one host.
+
+acquire() reserves the next token under a lock and sleeps outside it, so
+concurrent workers are spaced evenly at the configured rate instead of each
+keeping its own last-request time.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket of `capacity` tokens refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Sustained requests per second
+            capacity: Burst size. 1 spaces requests exactly 1/rate apart, so no
+                one-second window ever holds more than `rate` requests.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, waiting if necessary. Returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a future token; later callers queue behind it.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Read SEC EDGAR nightly bulk archives without unpacking them.
+
+SEC publishes every company's XBRL facts and submissions history as two zips:
+    companyfacts.zip - CIK##########.json, same documents as /api/xbrl/companyfacts/
+    submissions.zip  - CIK##########.json, same documents as /submissions/,
+                       plus CIK##########-submissions-NNN.json pages holding
+                       filings older than the "recent" block
+
+Only the zip's central directory is read up front. Members are decompressed
+as streams when asked for, and only for the CIKs that were requested, so a
+multi-GB archive costs a few MB of memory and no disk space.
+"""
+
+import json
+import re
+import zipfile
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+BULK_FACTS_URL = "https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip"
+BULK_SUBMISSIONS_URL = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+
+_MEMBER = re.compile(r"(?:^|/)CIK(\d{10})(?:-submissions-(\d{3}))?\.json$")
+
+
+class BulkArchive:
+    """Per-CIK access to a companyfacts.zip or submissions.zip."""
+
+    def __init__(self, path: str, ciks: Optional[Iterable[str]] = None):
+        """
+        Args:
+            path: Local bulk zip
+            ciks: Only index these CIKs (any zero padding); default every member
+        """
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        wanted = {str(c).zfill(10) for c in ciks} if ciks is not None else None
+        # cik -> main document, cik -> overflow pages in page order
+        self._main: Dict[str, str] = {}
+        self._pages: Dict[str, List[str]] = {}
+        for name in self._zip.namelist():
+            match = _MEMBER.search(name)
+            if not match or (wanted is not None and match.group(1) not in wanted):
+                continue
+            cik, page = match.groups()
+            if page is None:
+                self._main[cik] = name
+            else:
+                self._pages.setdefault(cik, []).append(name)
+        for pages in self._pages.values():
+            pages.sort()
+
+    def __contains__(self, cik: str) -> bool:
+        return str(cik).zfill(10) in self._main
+
+    def ciks(self) -> List[str]:
+        return sorted(self._main)
+
+    def open(self, cik: str) -> Optional[BinaryIO]:
+        """Decompressing stream of the CIK's document, or None if it is not in the archive."""
+        name = self._main.get(str(cik).zfill(10))
+        if name is None:
+            print(f"  Warning: CIK{str(cik).zfill(10)} is not in {self.path}")
+            return None
+        return self._zip.open(name)
+
+    def load(self, cik: str) -> Dict:
+        """Parsed document for the CIK ({} if absent)."""
+        stream = self.open(cik)
+        if stream is None:
+            return {}
+        with stream:
+            return json.load(stream)
+
+    def load_submissions(self, cik: str) -> Dict:
+        """
+        Submissions document with the overflow pages appended to filings.recent.
+
+        The API's "recent" block stops at 1,000 filings; the pages hold the
+        older ones in the same column layout (newest first), so appending them
+        keeps the whole history in one newest-first table.
+        """
+        data = self.load(cik)
+        if not data:
+            return {}
+        recent = data.setdefault("filings", {}).setdefault("recent", {})
+        for name in self._pages.get(str(cik).zfill(10), []):
+            with self._zip.open(name) as f:
+                page = json.load(f)
+            length = len(recent.get("accessionNumber", []))
+            for column, values in page.items():
+                if isinstance(values, list):
+                    recent.setdefault(column, [None] * length).extend(values)
+            # Keep every column aligned when a page lacks one.
+            total = length + len(page.get("accessionNumber", []))
+            for values in recent.values():
+                values.extend([None] * (total - len(values)))
+        return data
+
+    def close(self) -> None:
+        self._zip.close()
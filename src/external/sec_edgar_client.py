@@ -6,21 +6,43 @@ Fetches financial data from SEC EDGAR (free, official US SEC filings).
 Supports both XBRL API and 10-K filing parsing for segment data.
 No API key required, but User-Agent header is mandatory.
 
-Rate limit: 10 requests/second
+Rate limit: 10 requests/second, enforced by one token bucket shared by every
+client and thread (SEC_RATE_LIMITER). Filing scanners fetch documents on a
+thread pool so throughput approaches the limit instead of request latency.
 """
 
+import gzip
 import json
+import multiprocessing
+import os
 import re
 import ssl
-import time
 import urllib.request
-from html.parser import HTMLParser
-from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
+
+from src.external.companyfacts_stream import (
+    extract_companyfacts,
+    load_subset,
+    save_subset,
+    subset_signature,
+)
+from src.external.filing_store import DEFAULT_MAX_MB, DEFAULT_STORE_DIR, FilingStore, archive_key
+from src.external.html_tables import extract_tables, revenue_table_candidate, segment_sections
+from src.external.http_cache import DEFAULT_CACHE_DIR, ConditionalCache
+from src.external.pattern_scan import PatternScanner, Rule
+from src.external.rate_limit import TokenBucket
+from src.external.sec_bulk import BulkArchive
 
 # Global unverified SSL context for macOS certificate issues
 ssl_context = ssl._create_unverified_context()
 
+# SEC fair-access limit (10 requests/second per client host), shared by all instances and threads.
+SEC_RATE_LIMITER = TokenBucket(rate=10)
+DEFAULT_FETCH_WORKERS = 8
+
 
 # Concept stock companies with their CIK numbers
 COMPANY_CIK = {
@@ -83,6 +105,16 @@ FISCAL_YEAR_END_MONTH = {
 # Platform segment % data is NOT available via text parsing (embedded as chart images)
 FOREIGN_FILERS_6K = {"TSM", "ASML", "ARM", "SIMO"}
 
+# 6-K pre-screen on submissions metadata (see classify_6k). TSMC files ~10
+# 6-Ks a quarter; most are monthly revenue reports and board notices, small
+# filings whose index page would only be fetched to be skipped.
+SIX_K_EARNINGS_WORDS = ("earnings", "presentation", "guidance", "quarterly results", "conference")
+SIX_K_STATEMENTS_WORDS = ("consolidat", "financial statement", "financial report")
+SIX_K_OTHER_WORDS = ("monthly", "board", "dividend", "shareholders meeting", "notice")
+SIX_K_MIN_SIZE = 200_000  # bytes, whole filing
+# Filing months get_6k_financial_statements() maps to a period
+SIX_K_STATEMENTS_MONTHS = {1, 2, 3, 4, 5, 7, 8, 10, 11}
+
 # XBRL concepts for income statement metrics (US GAAP / XBRL filers only)
 INCOME_CONCEPTS = {
     "total_revenue": [
@@ -146,53 +178,16 @@ INCOME_CONCEPTS = {
     ],
 }
 
-# Default User-Agent (SEC requires identification)
-DEFAULT_USER_AGENT = "ConceptStocks admin@example.com"
+# Concepts materialized by get_income_facts() (the segment concepts are a subset).
+INCOME_FACT_CONCEPTS = sorted({c for concepts in INCOME_CONCEPTS.values() for c in concepts})
+INCOME_FACTS_SIGNATURE = subset_signature(INCOME_FACT_CONCEPTS)
 
+# Form class of each XBRL form read by the period extraction, and the fiscal periods it accepts.
+XBRL_FORM_CLASS = {"10-K": "annual", "10-K/A": "annual", "10-Q": "quarterly", "10-Q/A": "quarterly"}
+XBRL_CLASS_PERIODS = {"annual": {"FY"}, "quarterly": {"Q1", "Q2", "Q3", "Q4"}}
 
-class TableParser(HTMLParser):
-    """HTML parser to extract tables from SEC filings."""
-
-    def __init__(self):
-        super().__init__()
-        self.tables = []
-        self.current_table = []
-        self.current_row = []
-        self.current_cell = ""
-        self.in_table = False
-        self.in_row = False
-        self.in_cell = False
-
-    def handle_starttag(self, tag, attrs):
-        if tag == "table":
-            self.in_table = True
-            self.current_table = []
-        elif tag == "tr" and self.in_table:
-            self.in_row = True
-            self.current_row = []
-        elif tag in ("td", "th") and self.in_row:
-            self.in_cell = True
-            self.current_cell = ""
-
-    def handle_endtag(self, tag):
-        if tag == "table" and self.in_table:
-            self.in_table = False
-            if self.current_table:
-                self.tables.append(self.current_table)
-            self.current_table = []
-        elif tag == "tr" and self.in_row:
-            self.in_row = False
-            if self.current_row:
-                self.current_table.append(self.current_row)
-            self.current_row = []
-        elif tag in ("td", "th") and self.in_cell:
-            self.in_cell = False
-            self.current_row.append(self.current_cell.strip())
-            self.current_cell = ""
-
-    def handle_data(self, data):
-        if self.in_cell:
-            self.current_cell += data
+# Default User-Agent (SEC requires identification)
+DEFAULT_USER_AGENT = "ConceptStocks admin@example.com"
 
 
 def parse_money(text: str) -> Optional[float]:
@@ -216,6 +211,27 @@ def parse_money(text: str) -> Optional[float]:
         return None
 
 
+_ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+@lru_cache(maxsize=8192)
+def _date_ordinal(text: str) -> int:
+    # fromisoformat is much faster and agrees with strptime on strict YYYY-MM-DD.
+    if _ISO_DATE.fullmatch(text):
+        return datetime.fromisoformat(text).toordinal()
+    return datetime.strptime(text, "%Y-%m-%d").toordinal()
+
+
+def _duration_days(start: Optional[str], end: Optional[str]) -> int:
+    """Days from start to end (YYYY-MM-DD prefixes); 999 when unknown, so it sorts last."""
+    if start and end and len(start) >= 10 and len(end) >= 10:
+        try:
+            return _date_ordinal(end[:10]) - _date_ordinal(start[:10])
+        except ValueError:
+            pass
+    return 999
+
+
 def get_fiscal_quarter_from_report_date(report_date: str, symbol: str) -> Tuple[int, str]:
     """
     Calculate fiscal year and quarter from a 10-Q report date.
@@ -271,28 +287,175 @@ def get_fiscal_quarter_from_report_date(report_date: str, symbol: str) -> Tuple[
     return (fiscal_year, quarter)
 
 
+def classify_6k(filing: Dict[str, Any]) -> Set[str]:
+    """
+    Kinds of document a 6-K may hold, judged from submissions metadata only.
+
+    Kinds are "earnings" (release / presentation, read by get_6k_income_statement)
+    and "statements" (consolidated financial statements, read by
+    get_6k_financial_statements). Words in the primary document description or
+    name add a kind. Otherwise-unmatched filings described as monthly reports
+    or notices are ruled out, as are filings under SIX_K_MIN_SIZE; statements
+    also need a filing month that maps to a period. A filing without a size
+    is kept as both, since nothing rules it out.
+
+    Args:
+        filing: Entry from get_filing_list()
+
+    Returns:
+        Subset of {"earnings", "statements"}
+    """
+    text = f"{filing.get('description') or ''} {filing.get('primary_doc') or ''}".lower()
+    kinds = set()
+    if any(word in text for word in SIX_K_EARNINGS_WORDS):
+        kinds.add("earnings")
+    if any(word in text for word in SIX_K_STATEMENTS_WORDS):
+        kinds.add("statements")
+    if not kinds and any(word in text for word in SIX_K_OTHER_WORDS):
+        return kinds
+
+    size = filing.get("size")
+    if size is None:
+        return {"earnings", "statements"}
+    if size < SIX_K_MIN_SIZE:
+        return kinds
+    kinds.add("earnings")
+    try:
+        if int((filing.get("date") or "")[5:7]) in SIX_K_STATEMENTS_MONTHS:
+            kinds.add("statements")
+    except ValueError:
+        kinds.add("statements")
+    return kinds
+
+
 class SECEdgarClient:
     """Client for SEC EDGAR XBRL API."""
 
     BASE_URL = "https://data.sec.gov/api/xbrl"
 
-    def __init__(self, user_agent: str = DEFAULT_USER_AGENT):
+    def __init__(
+        self,
+        user_agent: str = DEFAULT_USER_AGENT,
+        cache_dir: Optional[str] = None,
+        filing_store_dir: Optional[str] = None,
+        bulk_facts: Optional[str] = None,
+        bulk_submissions: Optional[str] = None,
+        fetch_workers: Optional[int] = None,
+        parse_workers: Optional[int] = None,
+    ):
         """
         Initialize SEC EDGAR client.
 
         Args:
             user_agent: Required by SEC. Format: "Company/App contact@email.com"
+            cache_dir: Conditional-GET cache for companyfacts JSON. Defaults to
+                $SEC_CACHE_DIR or .cache/sec_edgar; "" disables the cache.
+            filing_store_dir: Permanent store for /Archives/ documents and index
+                pages. Defaults to $SEC_FILING_STORE_DIR or .cache/sec_filings;
+                "" disables it. $SEC_FILING_STORE_MAX_MB bounds its size.
+            bulk_facts: Local companyfacts.zip; company facts are read from it
+                instead of the API (only COMPANY_CIK members are indexed).
+            bulk_submissions: Local submissions.zip; filing lists are read from
+                it instead of the API, including filings older than "recent".
+            fetch_workers: Threads used by the filing scanners to fetch index
+                pages and documents. Defaults to $SEC_FETCH_WORKERS or 8; 1 is serial.
+            parse_workers: Processes parsing 10-K/10-Q tables while downloads
+                continue. Defaults to $SEC_PARSE_WORKERS or the core count; 1
+                parses on the calling thread.
         """
         self.user_agent = user_agent
-        self._last_request_time = 0.0
-        self._min_request_interval = 0.1  # 10 requests/second max
+        if fetch_workers is None:
+            fetch_workers = int(os.environ.get("SEC_FETCH_WORKERS") or DEFAULT_FETCH_WORKERS)
+        self.fetch_workers = max(1, fetch_workers)
+        if parse_workers is None:
+            parse_workers = int(os.environ.get("SEC_PARSE_WORKERS") or os.cpu_count() or 1)
+        self.parse_workers = max(1, parse_workers)
+        if cache_dir is None:
+            cache_dir = os.environ.get("SEC_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.cache = ConditionalCache(cache_dir) if cache_dir else None
+        if filing_store_dir is None:
+            filing_store_dir = os.environ.get("SEC_FILING_STORE_DIR", DEFAULT_STORE_DIR)
+        max_mb = float(os.environ.get("SEC_FILING_STORE_MAX_MB") or DEFAULT_MAX_MB)
+        self.filings = FilingStore(filing_store_dir, int(max_mb * 1024 * 1024)) if filing_store_dir else None
+        # COMPANY_CIK includes metadata CIKs once the caller has loaded them.
+        ciks = set(COMPANY_CIK.values())
+        self.bulk_facts = BulkArchive(bulk_facts, ciks) if bulk_facts else None
+        self.bulk_submissions = BulkArchive(bulk_submissions, ciks) if bulk_submissions else None
 
     def _rate_limit(self):
-        """Ensure we don't exceed rate limits."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_request_interval:
-            time.sleep(self._min_request_interval - elapsed)
-        self._last_request_time = time.time()
+        """Ensure we don't exceed rate limits (shared across clients and threads)."""
+        SEC_RATE_LIMITER.acquire()
+
+    def _fetch_concurrently(
+        self, fetch: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Run fetch over items on the fetch pool.
+
+        Requests still pass the shared rate limiter; the pool only overlaps
+        their latency. Results come back in input order so callers keep their
+        first-filing-wins de-duplication.
+
+        Yields:
+            (item, result, error) - error is the exception fetch raised, else None
+        """
+        def call(item):
+            try:
+                return item, fetch(item), None
+            except Exception as e:
+                return item, None, e
+
+        if self.fetch_workers <= 1:
+            yield from map(call, items)
+            return
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as pool:
+            yield from pool.map(call, items)
+
+    def _fetch_and_parse(
+        self, fetch: Callable[[Any], Any], parse: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Fetch items on the fetch pool and parse each document on a process pool.
+
+        A fetch thread hands its document to the parse pool as soon as the
+        download finishes, so CPU-bound parsing overlaps the remaining
+        downloads and uses every core. parse must be picklable (module-level
+        or static). Results come back in input order.
+
+        Yields:
+            (item, parsed, error) - error is the exception fetch or parse raised, else None
+        """
+        items = list(items)
+        if self.parse_workers <= 1 or len(items) <= 1:
+            for item, content, error in self._fetch_concurrently(fetch, items):
+                parsed = None
+                if error is None:
+                    try:
+                        parsed = parse(content)
+                    except Exception as e:
+                        error = e
+                yield item, parsed, error
+            return
+
+        # The pool starts its workers on the first submit, which runs in a
+        # fetch thread. Forking while other threads hold locks can deadlock
+        # the child, so workers come from a forkserver (spawn where missing).
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(
+            max_workers=min(self.parse_workers, len(items)),
+            mp_context=multiprocessing.get_context(method),
+        ) as parse_pool:
+            def fetch_then_submit(item):
+                return parse_pool.submit(parse, fetch(item))
+
+            for item, future, error in self._fetch_concurrently(fetch_then_submit, items):
+                parsed = None
+                if error is None:
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        error = e
+                yield item, parsed, error
 
     def _fetch_json(self, url: str) -> Dict:
         """Fetch JSON from SEC EDGAR API with proper headers."""
@@ -312,6 +475,91 @@ class SECEdgarClient:
         except Exception as e:
             raise RuntimeError(f"Failed to fetch from SEC EDGAR: {e}")
 
+    def _fetch_json_cached(self, url: str, key: str) -> Dict:
+        """
+        Fetch JSON with a conditional GET against the on-disk cache.
+
+        See _refresh_cache(); the body is parsed from the local copy.
+        """
+        if self.cache is None:
+            return self._fetch_json(url)
+        if not self._refresh_cache(url, key):
+            return {}
+        with self.cache.open(key) as f:
+            return json.load(f)
+
+    def _refresh_cache(self, url: str, key: str, conditional: bool = True) -> bool:
+        """
+        Bring the cached body of url up to date.
+
+        Sends the stored ETag/Last-Modified; on a 304 the local gzip copy is
+        kept. Bodies are requested gzip-encoded and streamed to disk as
+        received. If the request fails and a cached copy exists, the copy is
+        kept with a warning.
+
+        Returns:
+            False if the document does not exist (404), else True
+
+        Raises:
+            RuntimeError: The request failed and nothing is cached
+        """
+        self._rate_limit()
+
+        request = urllib.request.Request(url)
+        request.add_header("User-Agent", self.user_agent)
+        request.add_header("Accept", "application/json")
+        request.add_header("Accept-Encoding", "gzip")
+        if conditional:
+            for name, value in self.cache.validators(key).items():
+                request.add_header(name, value)
+
+        try:
+            with urllib.request.urlopen(request, timeout=30, context=ssl_context) as resp:
+                encoded = (resp.headers.get("Content-Encoding") or "").lower() == "gzip"
+                self.cache.store(key, url, resp, resp.headers, encoded=encoded)
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                if self.cache.meta(key):
+                    self.cache.mark_validated(key, e.headers)
+                    return True
+                # Validators without a readable body: fetch unconditionally.
+                return self._refresh_cache(url, key, conditional=False)
+            if e.code == 404:
+                return False
+            self._keep_stale(key, f"SEC EDGAR API error {e.code}: {e.reason}")
+        except Exception as e:
+            self._keep_stale(key, f"Failed to fetch from SEC EDGAR: {e}")
+        return True
+
+    def _keep_stale(self, key: str, error: str) -> None:
+        if not self.cache.meta(key):
+            raise RuntimeError(error)
+        self.cache.stats["stale"] += 1
+        print(f"  Warning: {error}; using cached copy of {key}")
+
+    def _fetch_archive(self, url: str, timeout: int = 30, errors: str = "strict") -> str:
+        """
+        Fetch an /Archives/edgar/data/ page, served from the filing store when present.
+
+        Accession folders never change after publication, so stored documents
+        are used without revalidation; anything else is fetched normally.
+        """
+        key = archive_key(url) if self.filings is not None else None
+        if key:
+            data = self.filings.get(key)
+            if data is not None:
+                return data.decode("utf-8", errors=errors)
+
+        self._rate_limit()
+        request = urllib.request.Request(url, headers={"User-Agent": self.user_agent})
+        with urllib.request.urlopen(request, timeout=timeout, context=ssl_context) as resp:
+            data = resp.read()
+        text = data.decode("utf-8", errors=errors)
+        if key:
+            self.filings.put(key, data)
+        return text
+
     def get_company_facts(self, cik: str) -> Dict:
         """
         Get all XBRL facts for a company.
@@ -324,8 +572,70 @@ class SECEdgarClient:
         """
         # Ensure CIK has proper format (10 digits with leading zeros)
         cik = cik.zfill(10)
+        if self.bulk_facts is not None:
+            return self.bulk_facts.load(cik)
         url = f"{self.BASE_URL}/companyfacts/CIK{cik}.json"
-        return self._fetch_json(url)
+        return self._fetch_json_cached(url, f"companyfacts_CIK{cik}")
+
+    def get_income_facts(self, cik: str) -> Dict:
+        """
+        Get the companyfacts subset read by the income statement and segment methods.
+
+        Only INCOME_FACT_CONCEPTS under us-gaap, the FACT_UNITS unit types and
+        10-K/10-Q (plus /A) items are materialized; the document is scanned as
+        a stream. With the cache enabled, the subset is kept per CIK next to
+        the full body and re-extracted only when the body changes. With a bulk
+        archive, the member is streamed straight out of the zip.
+
+        Args:
+            cik: Company CIK number (with leading zeros)
+
+        Returns:
+            Companyfacts-shaped dict ({} if the company has no facts)
+        """
+        cik = cik.zfill(10)
+        url = f"{self.BASE_URL}/companyfacts/CIK{cik}.json"
+        key = f"companyfacts_CIK{cik}"
+        if self.bulk_facts is not None:
+            stream = self.bulk_facts.open(cik)
+            if stream is None:
+                return {}
+            with stream:
+                return extract_companyfacts(stream, INCOME_FACT_CONCEPTS)
+        if self.cache is None:
+            return self._stream_income_facts(url)
+        if not self._refresh_cache(url, key):
+            return {}
+
+        meta = self.cache.meta(key)
+        source = f"{meta.get('fetched_at')}|{meta.get('stored_size')}"
+        subset_path = os.path.join(self.cache.cache_dir, f"{key}.income.json.gz")
+        facts = load_subset(subset_path, source, INCOME_FACTS_SIGNATURE)
+        if facts is None:
+            with self.cache.open(key) as f:
+                facts = extract_companyfacts(f, INCOME_FACT_CONCEPTS)
+            save_subset(subset_path, source, INCOME_FACTS_SIGNATURE, facts)
+        return facts
+
+    def _stream_income_facts(self, url: str) -> Dict:
+        """Extract the income subset straight from the response (no cache)."""
+        self._rate_limit()
+        request = urllib.request.Request(url)
+        request.add_header("User-Agent", self.user_agent)
+        request.add_header("Accept", "application/json")
+        request.add_header("Accept-Encoding", "gzip")
+        try:
+            with urllib.request.urlopen(request, timeout=30, context=ssl_context) as resp:
+                if (resp.headers.get("Content-Encoding") or "").lower() == "gzip":
+                    with gzip.GzipFile(fileobj=resp) as body:
+                        return extract_companyfacts(body, INCOME_FACT_CONCEPTS)
+                return extract_companyfacts(resp, INCOME_FACT_CONCEPTS)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return {}
+            raise RuntimeError(f"SEC EDGAR API error {e.code}: {e.reason}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch from SEC EDGAR: {e}")
 
     def get_company_concept(self, cik: str, taxonomy: str, concept: str) -> Dict:
         """
@@ -379,81 +689,83 @@ class SECEdgarClient:
         Returns:
             List of data points
         """
-        if quarterly:
-            valid_forms = {"10-Q", "10-Q/A"}
-            valid_fps = {"Q1", "Q2", "Q3", "Q4"}
-        else:
-            valid_forms = {"10-K", "10-K/A"}
-            valid_fps = {"FY"}
+        by_key = self._index_concept(units_data)["quarterly" if quarterly else "annual"]
+        return self._select_period_data(by_key, use_max=use_max, quarterly=quarterly)
 
-        # Collect items by (fiscal_year, period) key
-        by_key = {}
+    def _index_concept(self, units_data: Dict) -> Dict[str, Dict[Tuple, List[Tuple[int, Dict]]]]:
+        """
+        Group one concept's 10-K/10-Q items by form class and (fiscal_year, period).
 
-        for unit_type in ["USD", "USD/shares", "pure"]:
-            if unit_type not in units_data:
-                continue
+        A single pass over the units serves every metric and both period
+        types. Items are kept by reference with their duration in days
+        (quarterly only, computed once); output records are built only for
+        the items _select_period_data() picks.
 
-            for item in units_data[unit_type]:
-                form = item.get("form", "")
-                if form not in valid_forms:
-                    continue
+        Args:
+            units_data: The 'units' section of a concept response
 
-                if "fy" not in item or "fp" not in item:
+        Returns:
+            {"annual": {(fy, "FY"): [(0, item)]}, "quarterly": {(fy, "Qn"): [(days, item)]}}
+        """
+        index = {form_class: {} for form_class in XBRL_CLASS_PERIODS}
+        for unit_type in ["USD", "USD/shares", "pure"]:
+            for item in units_data.get(unit_type, ()):
+                form_class = XBRL_FORM_CLASS.get(item.get("form", ""))
+                if form_class is None or "fy" not in item or "fp" not in item:
                     continue
-
-                fp = item.get("fp")
-                if fp not in valid_fps:
+                fp = item["fp"]
+                if fp not in XBRL_CLASS_PERIODS[form_class]:
                     continue
+                days = _duration_days(item.get("start"), item.get("end")) if form_class == "quarterly" else 0
+                index[form_class].setdefault((item["fy"], fp), []).append((days, item))
+        return index
 
-                fy = item.get("fy")
-                key = (fy, fp)
-                if key not in by_key:
-                    by_key[key] = []
+    def _select_period_data(
+        self, by_key: Dict[Tuple, List[Tuple[int, Dict]]], use_max: bool = False, quarterly: bool = False
+    ) -> List[Dict]:
+        """
+        Pick one item per (fiscal_year, period) from an _index_concept() group.
 
-                by_key[key].append({
-                    "fiscal_year": fy,
-                    "period": fp,
-                    "start_date": item.get("start"),
-                    "end_date": item.get("end"),
-                    "value": item.get("val"),
-                    "form": form,
-                    "filed": item.get("filed"),
-                    "accn": item.get("accn"),
-                })
+        Args:
+            by_key: (fiscal_year, period) -> (duration_days, item) candidates
+            use_max: If True, use maximum value per period (for revenue)
+            quarterly: The group holds 10-Q items
 
-        # Select best item per key
+        Returns:
+            List of data points, latest period first
+        """
         results = []
-        for key, items in by_key.items():
+        for (fy, fp), entries in by_key.items():
             if quarterly:
                 # For quarterly: prefer the shortest-duration item (standalone quarter)
-                # over cumulative (YTD) values. Calculate duration from start/end dates.
-                def _duration_days(it):
-                    s, e = it.get("start_date", ""), it.get("end_date", "")
-                    if s and e and len(s) >= 10 and len(e) >= 10:
-                        try:
-                            from datetime import datetime as _dt
-                            d = (_dt.strptime(e[:10], "%Y-%m-%d") - _dt.strptime(s[:10], "%Y-%m-%d")).days
-                            return d
-                        except Exception:
-                            pass
-                    return 999  # Unknown duration, sort last
-
+                # over cumulative (YTD) values.
                 # 1. Find shortest duration (standalone quarter, ~90 days)
                 # 2. Among those, pick latest end_date (current period, not prior-year comparative)
                 # 10-Q filings include comparative data from prior year with same fy/fp tags
-                min_dur = min(_duration_days(x) for x in items)
-                candidates = [x for x in items if _duration_days(x) == min_dur]
-                best = max(candidates, key=lambda x: x.get("end_date") or "")
-                best = dict(best, duration_days=min_dur)
+                min_dur = min(days for days, _ in entries)
+                candidates = [item for days, item in entries if days == min_dur]
+                best = max(candidates, key=lambda x: x.get("end") or "")
             elif use_max:
-                best = max(items, key=lambda x: x.get("value") or 0)
+                best = max((item for _, item in entries), key=lambda x: x.get("val") or 0)
             else:
                 # For annual non-max: pick item with latest end_date.
                 # 10-K filings include comparative data (prior 2-3 years) all tagged with the
                 # same fy/fp as the current filing. Using filed date (same for all items in one
                 # 10-K) leads to non-deterministic selection. Use end_date to pick current year.
-                best = max(items, key=lambda x: x.get("end_date") or "")
-            results.append(best)
+                best = max((item for _, item in entries), key=lambda x: x.get("end") or "")
+            record = {
+                "fiscal_year": fy,
+                "period": fp,
+                "start_date": best.get("start"),
+                "end_date": best.get("end"),
+                "value": best.get("val"),
+                "form": best.get("form", ""),
+                "filed": best.get("filed"),
+                "accn": best.get("accn"),
+            }
+            if quarterly:
+                record["duration_days"] = min_dur
+            results.append(record)
 
         # Sort by fiscal year + period descending
         period_order = {"FY": 5, "Q4": 4, "Q3": 3, "Q2": 2, "Q1": 1}
@@ -482,7 +794,7 @@ class SECEdgarClient:
             raise ValueError(f"Unknown symbol: {symbol}. Add CIK to COMPANY_CIK.")
 
         cik = COMPANY_CIK[symbol]
-        company_facts = self.get_company_facts(cik)
+        company_facts = self.get_income_facts(cik)
 
         if not company_facts:
             return []
@@ -495,6 +807,13 @@ class SECEdgarClient:
         if include_quarterly:
             periods_to_fetch.append("quarterly")
 
+        # One pass per concept; every metric and both period types read from it.
+        fact_index = {
+            concept: self._index_concept(us_gaap[concept].get("units", {}))
+            for concept in INCOME_FACT_CONCEPTS
+            if concept in us_gaap
+        }
+
         all_results = []
 
         for period_type in periods_to_fetch:
@@ -502,17 +821,15 @@ class SECEdgarClient:
 
             for metric_name, concept_list in INCOME_CONCEPTS.items():
                 for concept in concept_list:
-                    if concept not in us_gaap:
+                    if concept not in fact_index:
                         continue
 
-                    concept_data = us_gaap[concept]
-                    units = concept_data.get("units", {})
                     use_max = metric_name in ("total_revenue", "capex")
-
-                    if period_type == "quarterly":
-                        period_data = self._extract_quarterly_data(units, use_max=use_max)
-                    else:
-                        period_data = self._extract_annual_data(units, use_max=use_max)
+                    period_data = self._select_period_data(
+                        fact_index[concept][period_type],
+                        use_max=use_max,
+                        quarterly=period_type == "quarterly",
+                    )
 
                     for item in period_data:
                         fy = item.get("fiscal_year")
@@ -632,7 +949,7 @@ class SECEdgarClient:
             raise ValueError(f"Unknown symbol: {symbol}. Add CIK to COMPANY_CIK.")
 
         cik = COMPANY_CIK[symbol]
-        company_facts = self.get_company_facts(cik)
+        company_facts = self.get_income_facts(cik)
 
         if not company_facts:
             return []
@@ -716,7 +1033,9 @@ class SECEdgarClient:
 
         return unique_results[:years * 10]  # Approximate limit
 
-    def get_filing_list(self, cik: str, form_type: str = "10-K", count: int = 10) -> List[Dict]:
+    def get_filing_list(
+        self, cik: str, form_type: str = "10-K", count: int = 10, item: Optional[str] = None
+    ) -> List[Dict]:
         """
         Get list of filings for a company.
 
@@ -724,14 +1043,20 @@ class SECEdgarClient:
             cik: Company CIK number
             form_type: Type of filing (e.g., "10-K", "10-Q")
             count: Number of filings to retrieve
+            item: Only 8-Ks reporting this item (e.g. "2.02"). Filings without
+                items metadata are kept, since they cannot be ruled out.
 
         Returns:
-            List of filing metadata
+            List of filing metadata ("items" lists the 8-K item codes, [] for other forms;
+            "description" and "size" are the primary document description and filing bytes)
         """
         cik = cik.zfill(10)
-        # Use SEC's submissions API
-        url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-        data = self._fetch_json(url)
+        if self.bulk_submissions is not None:
+            data = self.bulk_submissions.load_submissions(cik)
+        else:
+            # Use SEC's submissions API
+            url = f"https://data.sec.gov/submissions/CIK{cik}.json"
+            data = self._fetch_json(url)
 
         if not data:
             return []
@@ -744,17 +1069,27 @@ class SECEdgarClient:
         dates = recent.get("filingDate", [])
         primary_docs = recent.get("primaryDocument", [])
         report_dates = recent.get("reportDate", [])  # Period end date
+        items_list = recent.get("items", [])  # 8-K item codes, e.g. "2.02,9.01"
+        descriptions = recent.get("primaryDocDescription", [])
+        sizes = recent.get("size", [])  # whole filing, bytes
 
         for i, form in enumerate(forms):
             if form == form_type or form == f"{form_type}/A":
                 if len(filings) >= count:
                     break
+                raw_items = (items_list[i] if i < len(items_list) else None) or ""
+                items = [code.strip() for code in raw_items.split(",") if code.strip()]
+                if item is not None and items and item not in items:
+                    continue
                 filings.append({
                     "form": form,
                     "accession": accessions[i] if i < len(accessions) else None,
                     "date": dates[i] if i < len(dates) else None,
                     "primary_doc": primary_docs[i] if i < len(primary_docs) else None,
                     "report_date": report_dates[i] if i < len(report_dates) else None,
+                    "items": items,
+                    "description": descriptions[i] if i < len(descriptions) else None,
+                    "size": sizes[i] if i < len(sizes) else None,
                     "cik": cik,
                 })
 
@@ -776,37 +1111,64 @@ class SECEdgarClient:
         accession_clean = accession.replace("-", "")
         url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_clean}/{document}"
 
-        self._rate_limit()
-
-        request = urllib.request.Request(url)
-        request.add_header("User-Agent", self.user_agent)
-
         try:
-            with urllib.request.urlopen(request, timeout=60, context=ssl_context) as resp:
-                return resp.read().decode("utf-8")
+            return self._fetch_archive(url, timeout=60)
         except Exception as e:
             raise RuntimeError(f"Failed to fetch filing document: {e}")
 
-    def parse_segment_tables(self, html_content: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def parse_segment_sections(html_content: str) -> List[Dict[str, Any]]:
+        """
+        Parse segment revenue tables from the segment notes of a 10-K/10-Q.
+
+        Only the windows after "Segment Information" / "Disaggregation of
+        Revenue" headings are parsed (see segment_sections). The whole document
+        is parsed when no heading matches or the windows yield no segments,
+        e.g. when the only hits are table-of-contents entries.
+
+        Args:
+            html_content: HTML content of the filing
+
+        Returns:
+            List of segment revenue records
+        """
+        sections = segment_sections(html_content)
+        if sections:
+            results = SECEdgarClient.parse_segment_tables(sections)
+            if results:
+                return results
+        return SECEdgarClient.parse_segment_tables(html_content)
+
+    @staticmethod
+    def parse_segment_tables(
+        html_content: str,
+        screen: Optional[Callable[[str], bool]] = revenue_table_candidate,
+        backend: str = "auto",
+    ) -> List[Dict[str, Any]]:
         """
         Parse segment revenue tables from 10-K HTML content.
 
+        A static method so parse worker processes can run it (see _fetch_and_parse).
+        Only <table> blocks that mention revenue (any case) are tokenized
+        (src/external/html_tables.py); the rest cannot produce segments.
+
         Args:
             html_content: HTML content of the filing
+            screen: Raw <table> block pre-screen (None tokenizes every table)
+            backend: Table tokenizer: "auto" (lxml when installed), "lxml" or "html.parser"
 
         Returns:
             List of segment revenue records
         """
-        parser = TableParser()
         try:
-            parser.feed(html_content)
+            tables = extract_tables(html_content, screen=screen, backend=backend)
         except Exception:
             return []
 
         results = []
         table_counter = 0
 
-        for table in parser.tables:
+        for table in tables:
             if len(table) < 4:
                 continue
 
@@ -972,7 +1334,7 @@ class SECEdgarClient:
 
         # Also parse horizontal format tables (segments as columns)
         # Pattern: "For the year ended YYYY" with segment columns
-        for table in parser.tables:
+        for table in tables:
             if len(table) < 4:
                 continue
 
@@ -1066,7 +1428,7 @@ class SECEdgarClient:
         return list(best_results.values())
 
     def get_6k_income_statement(
-        self, symbol: str, quarters: int = 12
+        self, symbol: str, quarters: int = 12, prefilter: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Get income statement data for foreign private issuers (e.g., TSM) from 6-K filings.
@@ -1085,6 +1447,7 @@ class SECEdgarClient:
         Args:
             symbol: Stock ticker (must be in FOREIGN_FILERS_6K)
             quarters: Max number of quarterly filings to scan
+            prefilter: Only fetch 6-Ks classify_6k() marks as "earnings"
 
         Returns:
             List of income statement records with keys:
@@ -1105,58 +1468,63 @@ class SECEdgarClient:
         results = []
         seen_quarters = set()
 
-        for filing in filings:
-            accession = filing.get("accession")
+        def fetch_6k_record(filing: Dict) -> Optional[Dict[str, Any]]:
+            accession = filing["accession"]
             filing_date = filing.get("date", "")
-            if not accession:
-                continue
+            # Find the earnings presentation (Exhibit 99.2) in the 6-K index
+            cik_clean = cik.lstrip("0")
+            acc_clean = accession.replace("-", "")
+            index_url = (
+                f"https://www.sec.gov/Archives/edgar/data/{cik_clean}/"
+                f"{acc_clean}/{accession}-index.htm"
+            )
+            index_html = self._fetch_archive(index_url, errors="replace")
+
+            # Look for the earnings presentation file (e.g., a4q25presentatione.htm)
+            # and the Exhibit 99.1 press release as fallback (e.g., *withguidancexfinal.htm).
+            # Some quarters (Q2 FY2025) have an image-only presentation — fall back to 99.1.
+            pres_pattern = re.compile(
+                r'href="(/Archives/[^"]*(?:presentation[^"]*|presentatione[^"]*)\.htm)"',
+                re.IGNORECASE,
+            )
+            ex991_pattern = re.compile(
+                r'href="(/Archives/[^"]*withguidance[^"]*\.htm)"',
+                re.IGNORECASE,
+            )
+            pres_match = pres_pattern.search(index_html)
+            ex991_match = ex991_pattern.search(index_html)
+            if not pres_match and not ex991_match:
+                return None
 
-            try:
-                # Find the earnings presentation (Exhibit 99.2) in the 6-K index
-                cik_clean = cik.lstrip("0")
-                acc_clean = accession.replace("-", "")
-                index_url = (
-                    f"https://www.sec.gov/Archives/edgar/data/{cik_clean}/"
-                    f"{acc_clean}/{accession}-index.htm"
-                )
-                req = urllib.request.Request(index_url, headers={"User-Agent": self.user_agent})
-                with urllib.request.urlopen(req, timeout=30, context=ssl_context) as resp:
-                    index_html = resp.read().decode("utf-8", errors="replace")
-
-                # Look for the earnings presentation file (e.g., a4q25presentatione.htm)
-                # and the Exhibit 99.1 press release as fallback (e.g., *withguidancexfinal.htm).
-                # Some quarters (Q2 FY2025) have an image-only presentation — fall back to 99.1.
-                pres_pattern = re.compile(
-                    r'href="(/Archives/[^"]*(?:presentation[^"]*|presentatione[^"]*)\.htm)"',
-                    re.IGNORECASE,
-                )
-                ex991_pattern = re.compile(
-                    r'href="(/Archives/[^"]*withguidance[^"]*\.htm)"',
-                    re.IGNORECASE,
-                )
-                pres_match = pres_pattern.search(index_html)
-                ex991_match = ex991_pattern.search(index_html)
-                if not pres_match and not ex991_match:
-                    continue
+            # Try presentation first; fall back to press release if parsing fails.
+            candidates = []
+            if pres_match:
+                candidates.append(pres_match.group(1))
+            if ex991_match and ex991_match.group(1) not in candidates:
+                candidates.append(ex991_match.group(1))
+
+            for candidate_path in candidates:
+                cand_url = "https://www.sec.gov" + candidate_path
+                pres_html = self._fetch_archive(cand_url, errors="replace")
+                record = self._parse_6k_presentation(pres_html, symbol, filing_date)
+                if record:
+                    return record
+            return None
 
-                # Try presentation first; fall back to press release if parsing fails.
-                candidates = []
-                if pres_match:
-                    candidates.append(pres_match.group(1))
-                if ex991_match and ex991_match.group(1) not in candidates:
-                    candidates.append(ex991_match.group(1))
-
-                record = None
-                for candidate_path in candidates:
-                    cand_url = "https://www.sec.gov" + candidate_path
-                    req2 = urllib.request.Request(cand_url, headers={"User-Agent": self.user_agent})
-                    with urllib.request.urlopen(req2, timeout=30, context=ssl_context) as resp2:
-                        pres_html = resp2.read().decode("utf-8", errors="replace")
-                    record = self._parse_6k_presentation(pres_html, symbol, filing_date)
-                    if record:
-                        break
+        filings = [f for f in filings if f.get("accession")]
+        scanned = len(filings)
+        if prefilter:
+            filings = [f for f in filings if "earnings" in classify_6k(f)]
+            print(f"    Pre-screened 6-Ks: fetching {len(filings)} of {scanned} (earnings)")
+        for filing, record, error in self._fetch_concurrently(fetch_6k_record, filings):
+            accession = filing.get("accession")
+            filing_date = filing.get("date", "")
 
+            try:
+                if error is not None:
+                    raise error
                 if record:
+                    record["filed"] = filing_date
                     key = (record["fiscal_year"], record["period"])
                     if key not in seen_quarters:
                         seen_quarters.add(key)
@@ -1174,7 +1542,9 @@ class SECEdgarClient:
         # Merge R&D/G&A from quarterly consolidated financial statements.
         # Use at least 120 to cover ~2 years of TSMC's frequent 6-K filings.
         try:
-            fs_data = self.get_6k_financial_statements(symbol, scan_count=max(len(filings) * 2, 120))
+            fs_data = self.get_6k_financial_statements(
+                symbol, scan_count=max(scanned * 2, 120), prefilter=prefilter
+            )
             for rec in results:
                 key = (rec["fiscal_year"], rec["period"])
                 fs_rec = fs_data.get(key)
@@ -1200,7 +1570,7 @@ class SECEdgarClient:
         return sorted(results, key=lambda r: (r["fiscal_year"], r["period"]), reverse=True)
 
     def get_6k_financial_statements(
-        self, symbol: str, scan_count: int = 120
+        self, symbol: str, scan_count: int = 120, prefilter: bool = True
     ) -> Dict[tuple, Dict[str, Any]]:
         """
         Parse TSM quarterly consolidated financial statements from 6-K filings.
@@ -1219,6 +1589,11 @@ class SECEdgarClient:
 
         Q4 records are derived as: FY_annual - 9M_cumulative.
 
+        Args:
+            symbol: Stock ticker
+            scan_count: Number of 6-K filings to look back through
+            prefilter: Only fetch 6-Ks classify_6k() marks as "statements"
+
         Returns:
             Dict keyed by (fiscal_year, period) where period ∈ {Q1,Q2,Q3,Q4,FY}.
             Each value is a dict with NT$K amounts and a 'platform' sub-dict.
@@ -1233,43 +1608,44 @@ class SECEdgarClient:
         quarterly_recs: Dict[tuple, Dict] = {}
         annual_recs: Dict[int, Dict] = {}
 
-        for filing in filings:
-            accession = filing.get("accession")
+        def fetch_statements(filing: Dict) -> Optional[str]:
+            accession = filing["accession"]
+            acc_clean = accession.replace("-", "")
+            # Fetch the filing index to find the financial statements document
+            index_url = (
+                f"https://www.sec.gov/Archives/edgar/data/{cik_clean}/"
+                f"{acc_clean}/{accession}-index.htm"
+            )
+            index_html = self._fetch_archive(index_url, errors="replace")
+
+            # Look for consolidated financial statements document.
+            # TSMC filenames vary: "consolidated", "consolidatd" (Q1 FY2025 typo),
+            # "consolidatedfina", "consolidatedreport" — match on "consolidat" prefix.
+            fs_match = re.search(
+                r'href="(/Archives/[^"]*consolidat[^"]*\.htm)"',
+                index_html,
+                re.IGNORECASE,
+            )
+            if not fs_match:
+                return None
+
+            fs_url = "https://www.sec.gov" + fs_match.group(1)
+            return self._fetch_archive(fs_url, timeout=60, errors="replace")
+
+        filings = [f for f in filings if f.get("accession")]
+        if prefilter:
+            scanned = len(filings)
+            filings = [f for f in filings if "statements" in classify_6k(f)]
+            print(f"    Pre-screened 6-Ks: fetching {len(filings)} of {scanned} (financial statements)")
+        for filing, fs_html, error in self._fetch_concurrently(fetch_statements, filings):
             filing_date = filing.get("date", "")
-            if not accession:
-                continue
 
-            acc_clean = accession.replace("-", "")
             try:
-                # Fetch the filing index to find the financial statements document
-                index_url = (
-                    f"https://www.sec.gov/Archives/edgar/data/{cik_clean}/"
-                    f"{acc_clean}/{accession}-index.htm"
-                )
-                req = urllib.request.Request(
-                    index_url, headers={"User-Agent": self.user_agent}
-                )
-                with urllib.request.urlopen(req, timeout=30, context=ssl_context) as resp:
-                    index_html = resp.read().decode("utf-8", errors="replace")
-
-                # Look for consolidated financial statements document.
-                # TSMC filenames vary: "consolidated", "consolidatd" (Q1 FY2025 typo),
-                # "consolidatedfina", "consolidatedreport" — match on "consolidat" prefix.
-                fs_match = re.search(
-                    r'href="(/Archives/[^"]*consolidat[^"]*\.htm)"',
-                    index_html,
-                    re.IGNORECASE,
-                )
-                if not fs_match:
+                if error is not None:
+                    raise error
+                if fs_html is None:
                     continue
 
-                fs_url = "https://www.sec.gov" + fs_match.group(1)
-                req2 = urllib.request.Request(
-                    fs_url, headers={"User-Agent": self.user_agent}
-                )
-                with urllib.request.urlopen(req2, timeout=60, context=ssl_context) as resp2:
-                    fs_html = resp2.read().decode("utf-8", errors="replace")
-
                 text = self._strip_html(fs_html)
                 # Normalize non-breaking spaces (\xa0) introduced by html.unescape
                 # for &nbsp;, and re-normalize whitespace.
@@ -1489,6 +1865,28 @@ class SECEdgarClient:
 
         return quarterly_recs
 
+    def _fallback_twd_rate(self, filing_date: str) -> float:
+        """
+        Average NTD/USD over the quarter reported by a 6-K, from the local FX cache.
+
+        Used when the presentation omits its exchange-rate row. The reported
+        quarter is the last calendar quarter ending before the filing date.
+        Falls back to 31.0 when the cache has no coverage.
+        """
+        try:
+            from src.fx_rates import FXTable
+
+            fd = datetime.strptime(filing_date[:10], "%Y-%m-%d").date()
+            quarter_start_month = ((fd.month - 1) // 3) * 3 + 1
+            q_end = datetime(fd.year, quarter_start_month, 1).date() - timedelta(days=1)
+            q_start = datetime(q_end.year, q_end.month - 2, 1).date()
+            rate = FXTable.load().average_rate("TWD", q_start, q_end)
+            if rate:
+                return round(rate, 2)
+        except Exception:
+            pass
+        return 31.0
+
     def _parse_6k_presentation(
         self, html: str, symbol: str, filing_date: str
     ) -> Optional[Dict[str, Any]]:
@@ -1538,7 +1936,7 @@ class SECEdgarClient:
         # ── Exchange rate (NTD per USD) ───────────────────────────────────────
         # e.g. "Average Exchange Rate--USD/NTD 31.01 30.6 29.91 32.30"
         fx_m = re.search(r"Average Exchange Rate[^\d]+([\d]+\.[\d]+)", text)
-        fx_rate = float(fx_m.group(1)) if fx_m else 31.0  # fallback
+        fx_rate = float(fx_m.group(1)) if fx_m else self._fallback_twd_rate(filing_date)
 
         # ── Margins (%) ──────────────────────────────────────────────────────
         def _pct(pattern: str) -> Optional[float]:
@@ -1670,19 +2068,21 @@ class SECEdgarClient:
             return []
 
         results = []
+        filings = [f for f in filings if f.get("accession") and f.get("primary_doc")]
+        parsed = self._fetch_and_parse(
+            lambda f: self.get_filing_document(cik, f["accession"], f["primary_doc"]),
+            SECEdgarClient.parse_segment_sections,
+            filings,
+        )
 
-        for filing in filings:
+        for filing, segments, error in parsed:
             accession = filing.get("accession")
-            primary_doc = filing.get("primary_doc")
             filing_date = filing.get("date")
 
-            if not accession or not primary_doc:
-                continue
-
             try:
                 print(f"    Parsing 10-K filed {filing_date}...")
-                content = self.get_filing_document(cik, accession, primary_doc)
-                segments = self.parse_segment_tables(content)
+                if error is not None:
+                    raise error
 
                 geo_keywords = [
                     "america", "europe", "asia", "china", "japan",
@@ -1740,19 +2140,21 @@ class SECEdgarClient:
             return []
 
         results = []
+        filings = [f for f in filings if f.get("accession") and f.get("primary_doc")]
+        parsed = self._fetch_and_parse(
+            lambda f: self.get_filing_document(cik, f["accession"], f["primary_doc"]),
+            SECEdgarClient.parse_segment_sections,
+            filings,
+        )
 
-        for filing in filings:
+        for filing, segments, error in parsed:
             accession = filing.get("accession")
-            primary_doc = filing.get("primary_doc")
             filing_date = filing.get("date")
 
-            if not accession or not primary_doc:
-                continue
-
             try:
                 print(f"    Parsing 10-Q filed {filing_date}...")
-                content = self.get_filing_document(cik, accession, primary_doc)
-                segments = self.parse_segment_tables(content)
+                if error is not None:
+                    raise error
 
                 # IMPORTANT: 10-Q tables contain BOTH current year AND prior year
                 # comparative data. We only want the CURRENT year (max fiscal_year).
@@ -1824,36 +2226,46 @@ class SECEdgarClient:
 
         cik = COMPANY_CIK[symbol]
 
-        # Get recent 8-K filings.
-        # Some companies (e.g. GOOGL) file many non-earnings 8-Ks (material
-        # events, acquisitions, proxy notices) that consume the fetch budget
-        # before reaching older earnings releases.  Use a higher multiplier so
-        # that 'quarters' actual earnings press-releases are reliably found.
-        # GOOGL: ~4 earnings 8-Ks/yr + ~15 other 8-Ks/yr → need ~5× multiplier.
-        HIGH_NONEEARNINGS_8K_SYMBOLS = {"GOOGL", "AMZN", "META"}
-        fetch_multiplier = 5 if symbol in HIGH_NONEEARNINGS_8K_SYMBOLS else 2
-        filings = self.get_filing_list(cik, "8-K", count=quarters * fetch_multiplier)
+        # Get recent earnings 8-Ks. Earnings releases are furnished under
+        # Item 2.02 (Results of Operations), so the submissions "items" column
+        # skips every other 8-K without fetching its index page. The extra 4
+        # cover amendments and quarters with a second 2.02 filing.
+        filings = self.get_filing_list(cik, "8-K", count=quarters + 4, item="2.02")
+        if filings and not any(f["items"] for f in filings):
+            # No items metadata, so nothing was filtered.
+            # Some companies (e.g. GOOGL) file many non-earnings 8-Ks (material
+            # events, acquisitions, proxy notices) that consume the fetch budget
+            # before reaching older earnings releases.  Use a higher multiplier so
+            # that 'quarters' actual earnings press-releases are reliably found.
+            # GOOGL: ~4 earnings 8-Ks/yr + ~15 other 8-Ks/yr → need ~5× multiplier.
+            HIGH_NONEEARNINGS_8K_SYMBOLS = {"GOOGL", "AMZN", "META"}
+            fetch_multiplier = 5 if symbol in HIGH_NONEEARNINGS_8K_SYMBOLS else 2
+            filings = self.get_filing_list(cik, "8-K", count=quarters * fetch_multiplier)
 
         if not filings:
             return []
 
         results = []
 
-        for filing in filings:
+        def fetch_press_release(filing: Dict) -> Optional[str]:
+            # Find press release exhibit (usually 99.1)
+            pr_doc = self._find_press_release(cik, filing["accession"], symbol)
+            if not pr_doc:
+                return None
+            return self.get_filing_document(cik, filing["accession"], pr_doc)
+
+        filings = [f for f in filings if f.get("accession")]
+        for filing, content, error in self._fetch_concurrently(fetch_press_release, filings):
             accession = filing.get("accession")
             filing_date = filing.get("date")
 
-            if not accession:
-                continue
-
             try:
-                # Find press release exhibit (usually 99.1)
-                pr_doc = self._find_press_release(cik, accession, symbol)
-                if not pr_doc:
+                if error is not None:
+                    raise error
+                if content is None:
                     continue
 
                 print(f"    Parsing 8-K press release filed {filing_date}...")
-                content = self.get_filing_document(cik, accession, pr_doc)
 
                 # Parse segments from press release
                 segments = self._parse_8k_segments(content, symbol)
@@ -1904,9 +2316,7 @@ class SECEdgarClient:
             acc_clean = accession.replace("-", "")
             index_url = f"https://www.sec.gov/Archives/edgar/data/{cik_clean}/{acc_clean}/{accession}-index.htm"
 
-            req = urllib.request.Request(index_url, headers={"User-Agent": self.user_agent})
-            with urllib.request.urlopen(req, timeout=30, context=ssl_context) as resp:
-                content = resp.read().decode("utf-8")
+            content = self._fetch_archive(index_url)
 
             # Find links to potential press release files
             # Links can be full paths like /Archives/edgar/data/.../file.htm
@@ -1981,6 +2391,29 @@ class SECEdgarClient:
         else:
             return []
 
+    # Pattern variations:
+    # FY2025+: "Data Center revenue of $41.1 billion" or "Gaming revenue was $4.3 billion"
+    # FY2026 Q1: "Gaming revenue was a record $3.8 billion" (optional qualifier words)
+    # FY2024:  "Gaming — Third-quarter revenue was $2.86 billion"
+    _NVDA_8K = PatternScanner("NVDA", [
+        Rule(seg_name, re.escape(seg_name) + template, re.IGNORECASE)
+        for seg_name in (
+            "Data Center",
+            "Gaming",
+            "Gaming and AI PC",
+            "Professional Visualization",
+            "Automotive",
+            "Automotive and Robotics",
+            "OEM and Other",
+        )
+        for template in (
+            # Direct: "Gaming revenue of/was [optional: a record] $X billion"
+            r'\s+revenue\s+(?:of|was)(?:\s+\w+){0,3}\s+\$\s*([\d,]+(?:\.\d+)?)\s*(billion|million)',
+            # With quarter prefix: "Gaming — Third-quarter revenue was $X billion"
+            r'[^.]*?(?:quarter|Q\d)\s+revenue\s+(?:of|was)(?:\s+\w+){0,3}\s+\$\s*([\d,]+(?:\.\d+)?)\s*(billion|million)',
+        )
+    ])
+
     def _parse_nvda_8k(self, content: str) -> List[Dict[str, Any]]:
         """
         Parse NVIDIA 8-K press release for segment revenue.
@@ -2003,56 +2436,37 @@ class SECEdgarClient:
         quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
         fiscal_year = int(fy_match.group(2))
 
-        # NVDA segment names to look for
-        nvda_segments = [
-            "Data Center",
-            "Gaming",
-            "Gaming and AI PC",
-            "Professional Visualization",
-            "Automotive",
-            "Automotive and Robotics",
-            "OEM and Other",
-        ]
-
-        # Pattern variations:
-        # FY2025+: "Data Center revenue of $41.1 billion" or "Gaming revenue was $4.3 billion"
-        # FY2026 Q1: "Gaming revenue was a record $3.8 billion" (optional qualifier words)
-        # FY2024:  "Gaming — Third-quarter revenue was $2.86 billion"
-        for seg_name in nvda_segments:
-            seg_pattern = re.escape(seg_name)
-            # Try multiple patterns
-            patterns = [
-                # Direct: "Gaming revenue of/was [optional: a record] $X billion"
-                seg_pattern + r'\s+revenue\s+(?:of|was)(?:\s+\w+){0,3}\s+\$\s*([\d,]+(?:\.\d+)?)\s*(billion|million)',
-                # With quarter prefix: "Gaming — Third-quarter revenue was $X billion"
-                seg_pattern + r'[^.]*?(?:quarter|Q\d)\s+revenue\s+(?:of|was)(?:\s+\w+){0,3}\s+\$\s*([\d,]+(?:\.\d+)?)\s*(billion|million)',
-            ]
+        for seg_name, match in self._NVDA_8K.search(content).items():
+            amount = float(match.group(1).replace(",", ""))
+            unit = match.group(2).lower()
 
-            match = None
-            for p in patterns:
-                match = re.search(p, content, re.IGNORECASE)
-                if match:
-                    break
-
-            if match:
-                amount = float(match.group(1).replace(",", ""))
-                unit = match.group(2).lower()
-
-                if unit == "billion":
-                    revenue = amount * 1_000_000_000
-                else:
-                    revenue = amount * 1_000_000
+            if unit == "billion":
+                revenue = amount * 1_000_000_000
+            else:
+                revenue = amount * 1_000_000
 
-                results.append({
-                    "segment_name": seg_name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": seg_name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Google segments - actual format from press releases:
+    # "Google Services revenues increased 14% to $95.9 billion"
+    # "Google Cloud revenues increased 34% to $15.2 billion"
+    # "Google Cloud saw ... revenues increased 48% to $17.7 billion"
+    # Note: Be careful not to match across sentences - use [^.]* instead of .*
+    _GOOGL_8K = PatternScanner("GOOGL", [
+        Rule("Google Services", r'Google\s+Services\s+revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        # Google Cloud - two formats: direct "revenues increased" or with descriptive text
+        Rule("Google Cloud", r'Google\s+Cloud\s+revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("Google Cloud", r'Google\s+Cloud\s+(?:saw|had|achieved|reported|posted)[^.]*?revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+    ])
+
     def _parse_googl_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Google/Alphabet 8-K press release for segment revenue.
 
@@ -2084,37 +2498,27 @@ class SECEdgarClient:
             quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
             fiscal_year = int(fy_match.group(2))
 
-        # Google segments - actual format from press releases:
-        # "Google Services revenues increased 14% to $95.9 billion"
-        # "Google Cloud revenues increased 34% to $15.2 billion"
-        # "Google Cloud saw ... revenues increased 48% to $17.7 billion"
-        # Note: Be careful not to match across sentences - use [^.]* instead of .*
-        segment_patterns = [
-            (r'Google\s+Services\s+revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', "Google Services"),
-            # Google Cloud - two formats: direct "revenues increased" or with descriptive text
-            (r'Google\s+Cloud\s+revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', "Google Cloud"),
-            (r'Google\s+Cloud\s+(?:saw|had|achieved|reported|posted)[^.]*?revenues\s+(?:increased|decreased|grew)[^.]*?to\s+\$([\d.]+)\s*billion', "Google Cloud"),
-        ]
+        for name, match in self._GOOGL_8K.search(content).items():
+            revenue = float(match.group(1)) * 1_000_000_000
 
-        seen_segments = set()
-        for pattern, name in segment_patterns:
-            if name in seen_segments:
-                continue
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1)) * 1_000_000_000
-                seen_segments.add(name)
-
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Microsoft segments - HTML is stripped, so patterns are simple
+    # Format: "Revenue in Productivity and Business Processes was $34.1 billion"
+    _MSFT_8K = PatternScanner("MSFT", [
+        Rule("Productivity and Business Processes", r'Revenue\s+in\s+Productivity\s+and\s+Business\s+Processes\s+was\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("Intelligent Cloud", r'Revenue\s+in\s+Intelligent\s+Cloud\s+was\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("More Personal Computing", r'Revenue\s+in\s+More\s+Personal\s+Computing\s+was\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+    ])
+
     def _parse_msft_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Microsoft 8-K press release for segment revenue.
 
@@ -2156,29 +2560,28 @@ class SECEdgarClient:
             else:
                 return []
 
-        # Microsoft segments - HTML is now stripped, so patterns are simpler
-        # Format: "Revenue in Productivity and Business Processes was $34.1 billion"
-        segment_patterns = [
-            (r'Revenue\s+in\s+Productivity\s+and\s+Business\s+Processes\s+was\s+\$([\d.]+)\s*billion', "Productivity and Business Processes"),
-            (r'Revenue\s+in\s+Intelligent\s+Cloud\s+was\s+\$([\d.]+)\s*billion', "Intelligent Cloud"),
-            (r'Revenue\s+in\s+More\s+Personal\s+Computing\s+was\s+\$([\d.]+)\s*billion', "More Personal Computing"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1)) * 1_000_000_000
+        for name, match in self._MSFT_8K.search(content).items():
+            revenue = float(match.group(1)) * 1_000_000_000
 
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Amazon segments - actual format:
+    # "North America segment sales increased 10% year-over-year to $127.1 billion"
+    # "AWS segment sales increased 24% year-over-year to $35.6 billion"
+    _AMZN_8K = PatternScanner("AMZN", [
+        Rule("North America", r'North\s+America\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("International", r'International\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("AWS", r'AWS\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+    ])
+
     def _parse_amzn_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Amazon 8-K press release for segment revenue.
 
@@ -2198,30 +2601,26 @@ class SECEdgarClient:
         quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
         fiscal_year = int(fy_match.group(2))
 
-        # Amazon segments - actual format:
-        # "North America segment sales increased 10% year-over-year to $127.1 billion"
-        # "AWS segment sales increased 24% year-over-year to $35.6 billion"
-        segment_patterns = [
-            (r'North\s+America\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', "North America"),
-            (r'International\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', "International"),
-            (r'AWS\s+segment\s+sales\s+(?:increased|decreased).*?to\s+\$([\d.]+)\s*billion', "AWS"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1)) * 1_000_000_000
+        for name, match in self._AMZN_8K.search(content).items():
+            revenue = float(match.group(1)) * 1_000_000_000
 
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Meta segments - table format in millions
+    # Pattern: "Family of Apps 58,938 48,013" (current, prior year)
+    _META_8K = PatternScanner("META", [
+        Rule("Family of Apps", r'Family\s+of\s+Apps\s+([0-9,]+)\s'),
+        Rule("Reality Labs", r'Reality\s+Labs\s+([0-9,]+)\s'),
+    ])
+
     def _parse_meta_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Meta 8-K press release for segment revenue.
 
@@ -2252,29 +2651,33 @@ class SECEdgarClient:
         quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
         fiscal_year = int(fy_match.group(2))
 
-        # Meta segments - table format in millions
-        # Pattern: "Family of Apps 58,938 48,013" (current, prior year)
-        segment_patterns = [
-            (r'Family\s+of\s+Apps\s+([0-9,]+)\s', "Family of Apps"),
-            (r'Reality\s+Labs\s+([0-9,]+)\s', "Reality Labs"),
-        ]
+        for name, match in self._META_8K.search(content).items():
+            # Values are in millions
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
 
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content)
-            if match:
-                # Values are in millions
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
-
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Apple 8-K table format - values in MILLIONS
+    # Pattern: "iPhone 46,222 50,231" (current quarter, prior year)
+    # Or: "Services 30,013 26,340"
+    # iPhone row starts with "$" (first item in table section): "iPhone $ 85,269  $ 69,138"
+    # Mac, iPad, Wearables rows do NOT have "$" (subsequent rows): "Mac 8,386  8,987"
+    _AAPL_8K = PatternScanner("AAPL", [
+        Rule("iPhone", r'iPhone\s+\$\s*([\d,]+)'),
+        Rule("Mac", r'\bMac\s+([\d,]+)\s'),
+        Rule("iPad", r'iPad\s+([\d,]+)\s'),
+        Rule("Wearables, Home and Accessories", r'Wearables,?\s*Home\s+and\s+Accessories\s+([\d,]+)\s'),
+        Rule("Services", r'Services\s+([\d,]+)\s'),
+    ])
+
     def _parse_aapl_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Apple 8-K press release for segment revenue.
 
@@ -2312,37 +2715,34 @@ class SECEdgarClient:
             quarter = quarter_map.get(fy_match.group(5).lower(), "Q?")
             fiscal_year = int(fy_match.group(6))
 
-        # Apple 8-K table format - values in MILLIONS
-        # Pattern: "iPhone 46,222 50,231" (current quarter, prior year)
-        # Or: "Services 30,013 26,340"
-        segment_patterns = [
-            # iPhone row starts with "$" (first item in table section): "iPhone $ 85,269  $ 69,138"
-            # Mac, iPad, Wearables rows do NOT have "$" (subsequent rows): "Mac 8,386  8,987"
-            (r'iPhone\s+\$\s*([\d,]+)', "iPhone"),
-            (r'\bMac\s+([\d,]+)\s', "Mac"),
-            (r'iPad\s+([\d,]+)\s', "iPad"),
-            (r'Wearables,?\s*Home\s+and\s+Accessories\s+([\d,]+)\s', "Wearables, Home and Accessories"),
-            (r'Services\s+([\d,]+)\s', "Services"),
-        ]
+        for name, match in self._AAPL_8K.search(content).items():
+            # Values are in millions
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
 
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content)
-            if match:
-                # Values are in millions
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
-
-                # Sanity check: Apple segments should be at least $1B
-                if revenue >= 1_000_000_000:
-                    results.append({
-                        "segment_name": name,
-                        "fiscal_year": fiscal_year,
-                        "period": quarter,
-                        "revenue": revenue,
-                        "segment_type": "product",
-                    })
+            # Sanity check: Apple segments should be at least $1B
+            if revenue >= 1_000_000_000:
+                results.append({
+                    "segment_name": name,
+                    "fiscal_year": fiscal_year,
+                    "period": quarter,
+                    "revenue": revenue,
+                    "segment_type": "product",
+                })
 
         return results
 
+    # Micron Business Units - current segment names (as of FY2026)
+    # Format: "Cloud Memory Business Unit Revenue $ 5,284"
+    _MU_8K = PatternScanner("MU", [
+        Rule("Cloud Memory", r'Cloud\s+Memory\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+        Rule("Core Data Center", r'Core\s+Data\s+Center\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+        Rule("Mobile and Client", r'Mobile\s+and\s+Client\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+        Rule("Automotive and Embedded", r'Automotive\s+and\s+Embedded\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+        # Legacy segment names (pre-FY2025),
+        Rule("Compute and Networking", r'Compute\s+and\s+Networking\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+        Rule("Storage", r'Storage\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', re.IGNORECASE),
+    ])
+
     def _parse_mu_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Micron 8-K press release for segment revenue.
 
@@ -2365,34 +2765,29 @@ class SECEdgarClient:
         quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
         fiscal_year = int(fy_match.group(2))
 
-        # Micron Business Units - current segment names (as of FY2026)
-        # Format: "Cloud Memory Business Unit Revenue $ 5,284"
-        segment_patterns = [
-            (r'Cloud\s+Memory\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Cloud Memory"),
-            (r'Core\s+Data\s+Center\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Core Data Center"),
-            (r'Mobile\s+and\s+Client\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Mobile and Client"),
-            (r'Automotive\s+and\s+Embedded\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Automotive and Embedded"),
-            # Legacy segment names (pre-FY2025)
-            (r'Compute\s+and\s+Networking\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Compute and Networking"),
-            (r'Storage\s+Business\s+Unit\s+Revenue[^0-9]{0,10}([0-9,]+)', "Storage"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                # Values are in millions
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
+        for name, match in self._MU_8K.search(content).items():
+            # Values are in millions
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
 
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Segment section headers: "Infrastructure Solutions Group (ISG)"
+    _DELL_8K = PatternScanner("DELL", [
+        Rule(seg_name, rf'{seg_name}\s*\({seg_abbr}\)', re.IGNORECASE)
+        for seg_name, seg_abbr in (
+            ("Infrastructure Solutions Group", "ISG"),
+            ("Client Solutions Group", "CSG"),
+        )
+    ])
+
     def _parse_dell_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Dell 8-K press release for segment revenue.
 
@@ -2441,18 +2836,7 @@ class SECEdgarClient:
         # Pattern 1: "Fourth-quarter revenue: $11.4 billion" (Q4 reports)
         # Pattern 2: "Record third-quarter revenue: $14.1 billion" (Q1-Q3 reports)
         # Pattern 3: "Revenue: $12.5 billion" (fallback for simpler format)
-        segment_configs = [
-            ("Infrastructure Solutions Group", "ISG"),
-            ("Client Solutions Group", "CSG"),
-        ]
-
-        for seg_name, seg_abbr in segment_configs:
-            # Find the segment section
-            seg_pattern = rf'{seg_name}\s*\({seg_abbr}\)'
-            seg_match = re.search(seg_pattern, content, re.IGNORECASE)
-            if not seg_match:
-                continue
-
+        for seg_name, seg_match in self._DELL_8K.search(content).items():
             # Get the section after the segment header (up to next segment or 500 chars)
             section_start = seg_match.end()
             section = content[section_start:section_start + 800]
@@ -2495,6 +2879,14 @@ class SECEdgarClient:
 
         return results
 
+    # QCT Revenue Streams - values in millions
+    # Pattern: "Handsets $7,824" or "Handsets 7,824"
+    _QCOM_8K = PatternScanner("QCOM", [
+        Rule("QCT Handsets", r'Handsets\s*\$?\s*([\d,]+)\s', re.IGNORECASE),
+        Rule("QCT Automotive", r'Automotive\s+([\d,]+)\s', re.IGNORECASE),
+        Rule("QCT IoT", r'IoT\s*\(?internet\s+of\s+things\)?\s+([\d,]+)\s', re.IGNORECASE),
+    ])
+
     def _parse_qcom_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Qualcomm 8-K press release for segment revenue.
 
@@ -2522,35 +2914,32 @@ class SECEdgarClient:
         quarter = quarter_map.get(fy_match.group(1).lower(), "Q?")
         fiscal_year = int(fy_match.group(2))
 
-        # QCT Revenue Streams - values in millions
-        # Pattern: "Handsets $7,824" or "Handsets 7,824"
-        segment_patterns = [
-            (r'Handsets\s*\$?\s*([\d,]+)\s', "QCT Handsets"),
-            (r'Automotive\s+([\d,]+)\s', "QCT Automotive"),
-            (r'IoT\s*\(?internet\s+of\s+things\)?\s+([\d,]+)\s', "QCT IoT"),
-        ]
+        for name, match in self._QCOM_8K.search(content).items():
+            # Values are in millions
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
 
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                # Values are in millions
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
-
-                # Sanity check: QCOM segments should be at least $500M
-                if revenue >= 500_000_000:
-                    results.append({
-                        "segment_name": name,
-                        "fiscal_year": fiscal_year,
-                        "period": quarter,
-                        "revenue": revenue,
-                        "segment_type": "product",
-                    })
+            # Sanity check: QCOM segments should be at least $500M
+            if revenue >= 500_000_000:
+                results.append({
+                    "segment_name": name,
+                    "fiscal_year": fiscal_year,
+                    "period": quarter,
+                    "revenue": revenue,
+                    "segment_type": "product",
+                })
 
         # Note: QTL (licensing) revenue is not included as it's not a product segment
         # and the table format makes it hard to extract correctly
 
         return results
 
+    # HPQ segment patterns
+    # Format: "Personal Systems net revenue was $10.4 billion"
+    _HPQ_8K = PatternScanner("HPQ", [
+        Rule("Personal Systems", r'Personal\s+Systems\s+net\s+revenue\s+was\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+        Rule("Printing", r'Printing\s+net\s+revenue\s+was\s+\$([\d.]+)\s*billion', re.IGNORECASE),
+    ])
+
     def _parse_hpq_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse HP Inc. 8-K press release for segment revenue.
 
@@ -2588,28 +2977,27 @@ class SECEdgarClient:
             else:
                 return []
 
-        # HPQ segment patterns
-        # Format: "Personal Systems net revenue was $10.4 billion"
-        segment_patterns = [
-            (r'Personal\s+Systems\s+net\s+revenue\s+was\s+\$([\d.]+)\s*billion', "Personal Systems"),
-            (r'Printing\s+net\s+revenue\s+was\s+\$([\d.]+)\s*billion', "Printing"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1)) * 1_000_000_000
+        for name, match in self._HPQ_8K.search(content).items():
+            revenue = float(match.group(1)) * 1_000_000_000
 
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Segment rows (values in millions)
+    # "Semiconductor solutions $ 11,072 61 %" → first dollar-preceded number
+    # "Infrastructure software   6,943  39"   → first plain number (no $)
+    _AVGO_8K = PatternScanner("AVGO", [
+        Rule("Semiconductor solutions", r'Semiconductor\s+solutions\s+\$\s*([\d,]+)', re.IGNORECASE),
+        Rule("Infrastructure software", r'Infrastructure\s+software\s+\$?\s*([\d,]+)', re.IGNORECASE),
+    ])
+
     def _parse_avgo_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Broadcom (AVGO) 8-K press release for segment revenue.
 
@@ -2645,28 +3033,34 @@ class SECEdgarClient:
             quarter = f"Q{table_match.group(1)}"
             fiscal_year = 2000 + int(table_match.group(2))
 
-        # Parse segment rows (values in millions)
-        # "Semiconductor solutions $ 11,072 61 %" → first dollar-preceded number
-        # "Infrastructure software   6,943  39"   → first plain number (no $)
-        segment_patterns = [
-            (r'Semiconductor\s+solutions\s+\$\s*([\d,]+)', "Semiconductor solutions"),
-            (r'Infrastructure\s+software\s+\$?\s*([\d,]+)', "Infrastructure software"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+        for name, match in self._AVGO_8K.search(content).items():
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Segment patterns: narrative "Name revenue was $X billion/million"
+    # "Networking" was called "Intelligent Edge" before Q3 FY2025 — normalize to "Networking"
+    # Allow optional footnote markers like "(4)" between segment name and "revenue"
+    _HPE_FOOTNOTE = r'(?:\s*\(\d+\))?'
+    _HPE_8K = PatternScanner("HPE", [
+        Rule("Server", r'Server' + _HPE_FOOTNOTE + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', re.IGNORECASE),
+        Rule(
+            "Networking",
+            r'(?:Networking|Intelligent\s+Edge)' + _HPE_FOOTNOTE + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)',
+            re.IGNORECASE,
+            anchors=("Networking", "Intelligent"),
+        ),
+        Rule("Hybrid Cloud", r'Hybrid\s+Cloud' + _HPE_FOOTNOTE + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', re.IGNORECASE),
+        Rule("Financial Services", r'Financial\s+Services' + _HPE_FOOTNOTE + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', re.IGNORECASE),
+    ])
+
     def _parse_hpe_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Hewlett Packard Enterprise (HPE) 8-K press release for segment revenue.
 
@@ -2702,33 +3096,42 @@ class SECEdgarClient:
         quarter_map = {"first": "Q1", "second": "Q2", "third": "Q3", "fourth": "Q4"}
         quarter = quarter_map.get(quarter_word.lower(), "Q?")
 
-        # Segment patterns: narrative "Name revenue was $X billion/million"
-        # "Networking" was called "Intelligent Edge" before Q3 FY2025 — normalize to "Networking"
-        # Allow optional footnote markers like "(4)" between segment name and "revenue"
-        fn = r'(?:\s*\(\d+\))?'  # optional footnote marker
-        segment_patterns = [
-            (r'Server' + fn + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', "Server"),
-            (r'(?:Networking|Intelligent\s+Edge)' + fn + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', "Networking"),
-            (r'Hybrid\s+Cloud' + fn + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', "Hybrid Cloud"),
-            (r'Financial\s+Services' + fn + r'\s+revenue\s+was\s+\$([\d.]+)\s*(billion|million)', "Financial Services"),
-        ]
-
-        for pattern, name in segment_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                amount = float(match.group(1))
-                unit = match.group(2).lower()
-                revenue = amount * 1_000_000_000 if unit == "billion" else amount * 1_000_000
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+        for name, match in self._HPE_8K.search(content).items():
+            amount = float(match.group(1))
+            unit = match.group(2).lower()
+            revenue = amount * 1_000_000_000 if unit == "billion" else amount * 1_000_000
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
+    # Text patterns for Cloud segments (in billions or millions)
+    # IMPORTANT: Match full segment name first to avoid matching shorter variants
+    _ORCL_8K_TEXT = PatternScanner("ORCL text", [
+        # Sub-segment bullet points - present in ALL ORCL 8-Ks (FY2025+)
+        # Format: "Q2 Cloud Infrastructure (IaaS) Revenue $4.1 billion, up 68%"
+        Rule("Oracle Cloud Infrastructure", r'Q\d+\s+Cloud\s+Infrastructure\s+\(IaaS\)\s+Revenue\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE, anchors=("Cloud",), lead=8),
+        Rule("Cloud Applications", r'Q\d+\s+Cloud\s+Application\s+\(SaaS\)\s+Revenue\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE, anchors=("Cloud",), lead=8),
+        # Full name patterns - must match complete segment name
+        Rule("Cloud services and license support", r'Cloud\s+services\s+and\s+license\s+support\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE),
+        Rule("Cloud license and on-premise license", r'Cloud\s+license\s+and\s+on-premise\s+license\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE),
+        # FY2026+ new segment names - be specific to avoid matching substrings
+        Rule("Cloud", r'(?<!\w)Cloud\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE),
+        Rule("Software", r'(?<!\w)Software\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', re.IGNORECASE),
+    ])
+    # Table format for Hardware and Services (in millions)
+    # Look for table rows like "Hardware   850   5%   842   6%"
+    # The first number after segment name is current quarter
+    _ORCL_8K_TABLE = PatternScanner("ORCL table", [
+        Rule("Hardware", r'(?<!\w)Hardware\s+\$?\s*([\d,]+)\s+\d+%', re.IGNORECASE),
+        Rule("Services", r'(?<!\w)Services\s+\$?\s*([\d,]+)\s+\d+%', re.IGNORECASE),
+    ])
+
     def _parse_orcl_8k(self, content: str) -> List[Dict[str, Any]]:
         """Parse Oracle 8-K press release for segment revenue.
 
@@ -2776,66 +3179,31 @@ class SECEdgarClient:
         # "Cloud license and on-premise license revenues were up 7% to $870 million"
         # Hardware and Services are in table format with percentages
 
-        seen_segments = set()
-
-        # Text patterns for Cloud segments (in billions or millions)
-        # IMPORTANT: Match full segment name first to avoid matching shorter variants
-        text_patterns = [
-            # Sub-segment bullet points - present in ALL ORCL 8-Ks (FY2025+)
-            # Format: "Q2 Cloud Infrastructure (IaaS) Revenue $4.1 billion, up 68%"
-            (r'Q\d+\s+Cloud\s+Infrastructure\s+\(IaaS\)\s+Revenue\s+\$\s*([\d.]+)\s*(billion|million)', "Oracle Cloud Infrastructure"),
-            (r'Q\d+\s+Cloud\s+Application\s+\(SaaS\)\s+Revenue\s+\$\s*([\d.]+)\s*(billion|million)', "Cloud Applications"),
-            # Full name patterns - must match complete segment name
-            (r'Cloud\s+services\s+and\s+license\s+support\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', "Cloud services and license support"),
-            (r'Cloud\s+license\s+and\s+on-premise\s+license\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', "Cloud license and on-premise license"),
-            # FY2026+ new segment names - be specific to avoid matching substrings
-            (r'(?<!\w)Cloud\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', "Cloud"),
-            (r'(?<!\w)Software\s+revenues?\s+(?:were?\s+)?(?:up|down)?[^.]*?to\s+\$\s*([\d.]+)\s*(billion|million)', "Software"),
-        ]
-
-        for pattern, name in text_patterns:
-            if name in seen_segments:
-                continue
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                value = float(match.group(1))
-                unit = match.group(2).lower()
-                if unit == "billion":
-                    revenue = value * 1_000_000_000
-                else:  # million
-                    revenue = value * 1_000_000
-                seen_segments.add(name)
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
-
-        # Table format for Hardware and Services (in millions)
-        # Look for table rows like "Hardware   850   5%   842   6%"
-        # The first number after segment name is current quarter
-        simple_table_patterns = [
-            (r'(?<!\w)Hardware\s+\$?\s*([\d,]+)\s+\d+%', "Hardware"),
-            (r'(?<!\w)Services\s+\$?\s*([\d,]+)\s+\d+%', "Services"),
-        ]
+        for name, match in self._ORCL_8K_TEXT.search(content).items():
+            value = float(match.group(1))
+            unit = match.group(2).lower()
+            if unit == "billion":
+                revenue = value * 1_000_000_000
+            else:  # million
+                revenue = value * 1_000_000
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
-        for pattern, name in simple_table_patterns:
-            if name in seen_segments:
-                continue
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                # Values are in millions in the table
-                revenue = float(match.group(1).replace(",", "")) * 1_000_000
-                seen_segments.add(name)
-                results.append({
-                    "segment_name": name,
-                    "fiscal_year": fiscal_year,
-                    "period": quarter,
-                    "revenue": revenue,
-                    "segment_type": "product",
-                })
+        for name, match in self._ORCL_8K_TABLE.search(content).items():
+            # Values are in millions in the table
+            revenue = float(match.group(1).replace(",", "")) * 1_000_000
+            results.append({
+                "segment_name": name,
+                "fiscal_year": fiscal_year,
+                "period": quarter,
+                "revenue": revenue,
+                "segment_type": "product",
+            })
 
         return results
 
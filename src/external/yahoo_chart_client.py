@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Yahoo Finance Chart API Client
+
+Reads the v8 chart JSON endpoint straight into numpy arrays, without
+importing yfinance/pandas. Used by update_conceptstocks.py when
+--yahoo-client chart is selected.
+
+The base URL is configurable so the client can be pointed at a local
+stand-in server serving recorded chart responses.
+"""
+
+import json
+import time
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+
+class YahooChartClient:
+    """Client for the Yahoo Finance v8 chart endpoint."""
+
+    BASE_URL = "https://query2.finance.yahoo.com/v8/finance/chart"
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 30.0):
+        """
+        Initialize Yahoo chart client.
+
+        Args:
+            base_url: Override for the chart endpoint (e.g. http://127.0.0.1:8000/chart)
+            timeout: Socket timeout in seconds
+        """
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (ConceptStocks Research)",
+            "Accept": "application/json",
+        }
+        self._last_request_time = 0.0
+        self._min_request_interval = 0.2
+
+    def _rate_limit(self):
+        """Ensure we don't hammer the endpoint."""
+        elapsed = time.time() - self._last_request_time
+        if elapsed < self._min_request_interval:
+            time.sleep(self._min_request_interval - elapsed)
+        self._last_request_time = time.time()
+
+    def _fetch_json(self, url: str) -> Dict:
+        """Fetch JSON from the chart endpoint."""
+        self._rate_limit()
+        req = urllib.request.Request(url, headers=self.headers)
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def build_url(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> str:
+        """
+        Build the chart request URL.
+
+        Args:
+            symbol: Yahoo ticker symbol
+            interval: Bar interval (15m, 60m, 1d, 1wk, 1mo)
+            start: First date to include (inclusive)
+            end: Last date to include (exclusive, matching yfinance)
+
+        Returns:
+            Request URL
+        """
+        params = {
+            "interval": interval,
+            "includePrePost": "false",
+            "events": "",
+        }
+        if start or end:
+            start_dt = datetime.combine(start or date(1970, 1, 2), datetime.min.time(), timezone.utc)
+            end_dt = datetime.combine(
+                end or (date.today() + timedelta(days=1)), datetime.min.time(), timezone.utc
+            )
+            params["period1"] = str(int(start_dt.timestamp()))
+            params["period2"] = str(int(end_dt.timestamp()))
+        else:
+            params["range"] = "max"
+        return f"{self.base_url}/{urllib.parse.quote(symbol)}?{urllib.parse.urlencode(params)}"
+
+    @staticmethod
+    def _utc_offsets(meta: Dict, timestamps: np.ndarray) -> np.ndarray:
+        """
+        UTC offset in seconds of each bar in the exchange timezone.
+
+        meta["gmtoffset"] is the offset at request time only, so a range
+        crossing a DST change would put bars on the other side an hour off
+        (and 60m bars or late closes on the wrong date). Each timestamp is
+        converted with the exchange's IANA zone instead; gmtoffset is the
+        fallback when the zone is missing or unknown.
+        """
+        name = meta.get("exchangeTimezoneName")
+        try:
+            tz = ZoneInfo(name) if name else None
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = None
+        if tz is None or not len(timestamps):
+            return np.full(len(timestamps), int(meta.get("gmtoffset") or 0), dtype=np.int64)
+        return np.fromiter(
+            (int(datetime.fromtimestamp(ts, tz).utcoffset().total_seconds()) for ts in timestamps.tolist()),
+            dtype=np.int64,
+            count=len(timestamps),
+        )
+
+    def get_history(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get OHLC history as column arrays.
+
+        Args:
+            symbol: Yahoo ticker symbol
+            interval: Bar interval (15m, 60m, 1d, 1wk, 1mo)
+            start: First date to include (inclusive)
+            end: Last date to include (exclusive)
+
+        Returns:
+            Dict with 'date' (datetime64[D]) and 'datetime' (datetime64[s]), both
+            exchange-local, plus 'open', 'high', 'low', 'close' and 'volume'
+            (float64, NaN for missing values). Empty arrays if no bars.
+        """
+        data = self._fetch_json(self.build_url(symbol, interval, start, end))
+
+        chart = data.get("chart") or {}
+        if chart.get("error"):
+            error = chart["error"]
+            raise RuntimeError(
+                f"Yahoo chart error for {symbol}: {error.get('code')} {error.get('description')}"
+            )
+        results = chart.get("result") or []
+        if not results:
+            return {
+                "date": np.array([], dtype="datetime64[D]"),
+                "datetime": np.array([], dtype="datetime64[s]"),
+                **{k: np.array([], dtype=float) for k in ("open", "high", "low", "close", "volume")},
+            }
+
+        result = results[0]
+        timestamps = np.asarray(result.get("timestamp") or [], dtype=np.int64)
+        quote = ((result.get("indicators") or {}).get("quote") or [{}])[0]
+        # JSON nulls become NaN when cast to float64
+        columns = {
+            k: np.asarray(quote.get(k) or [None] * len(timestamps), dtype=float)
+            for k in ("open", "high", "low", "close", "volume")
+        }
+
+        # Shift UTC epoch seconds to exchange-local dates (same as yfinance index.date)
+        local = (timestamps + self._utc_offsets(result.get("meta") or {}, timestamps)).astype(
+            "datetime64[s]"
+        )
+
+        return {
+            "date": local.astype("datetime64[D]"),
+            "datetime": local,
+            **columns,
+        }
@@ -0,0 +1,250 @@
+"""
+Cached daily FX rates and vectorized currency normalization.
+
+Rates are stored as units of currency per 1 USD (Yahoo `TWD=X` convention) in
+raw_conceptstock_fx_daily.csv. The cache is extended incrementally from the
+latest stored date per currency, so normal runs fetch a handful of bars.
+
+FXTable answers as-of lookups (latest rate on or before a date) and period
+averages for whole arrays at once via np.searchsorted, so callers never look
+rates up row by row.
+"""
+
+import csv
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+FX_CACHE_FILE = "raw_conceptstock_fx_daily.csv"
+DEFAULT_FX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), FX_CACHE_FILE
+)
+
+FX_FIELDNAMES = [
+    "currency",
+    "date",
+    "rate_per_usd",
+    "source_file",
+    "download_timestamp",
+]
+
+# Listing suffix -> trading currency. Bare US tickers trade in USD.
+TICKER_SUFFIX_CURRENCY = {
+    ".HK": "HKD",
+    ".TW": "TWD",
+    ".TWO": "TWD",
+    ".KS": "KRW",
+    ".T": "JPY",
+    ".AS": "EUR",
+}
+
+# First date requested when a currency has no cached history yet.
+FX_HISTORY_START = date(2010, 1, 1)
+
+
+def currency_for_ticker(ticker: str) -> str:
+    """Return the trading currency implied by a ticker's exchange suffix."""
+    for suffix, currency in TICKER_SUFFIX_CURRENCY.items():
+        if ticker.upper().endswith(suffix):
+            return currency
+    return "USD"
+
+
+def yahoo_fx_symbol(currency: str) -> str:
+    return f"{currency}=X"
+
+
+class FXTable:
+    """Sorted per-currency daily rate arrays with vectorized lookups."""
+
+    def __init__(self, series: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        """
+        Args:
+            series: currency -> (datetime64[D] dates sorted ascending, rate_per_usd floats)
+        """
+        self.series = series
+        # Day-weighted cumulative sums for O(1) period averages.
+        self._cumsum: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_FX_PATH) -> "FXTable":
+        """Load the FX cache CSV (empty table if missing)."""
+        by_currency: Dict[str, List[Tuple[str, float]]] = {}
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        rate = float(row["rate_per_usd"])
+                    except (TypeError, ValueError):
+                        continue
+                    if rate > 0:
+                        by_currency.setdefault(row["currency"], []).append((row["date"], rate))
+        series = {}
+        for currency, items in by_currency.items():
+            items.sort()
+            series[currency] = (
+                np.asarray([d for d, _ in items], dtype="datetime64[D]"),
+                np.asarray([r for _, r in items], dtype=float),
+            )
+        return cls(series)
+
+    def currencies(self) -> List[str]:
+        return sorted(self.series)
+
+    def rate_per_usd(self, currency: str, dates: np.ndarray) -> np.ndarray:
+        """
+        As-of rate (units of currency per USD) for each date.
+
+        Args:
+            currency: ISO currency code
+            dates: datetime64[D] array
+
+        Returns:
+            float array; 1.0 for USD, NaN before the first cached rate or for unknown currencies
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if currency in ("USD", "", None):
+            return np.ones(dates.shape)
+        if currency not in self.series:
+            return np.full(dates.shape, np.nan)
+        rate_dates, rates = self.series[currency]
+        pos = np.searchsorted(rate_dates, dates, side="right") - 1
+        out = rates[np.maximum(pos, 0)]
+        return np.where((pos >= 0) & ~np.isnat(dates), out, np.nan)
+
+    def usd_per_unit(self, currencies: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        """
+        Per-row USD value of one unit of the row's currency.
+
+        Args:
+            currencies: str array of ISO codes (one per row)
+            dates: datetime64[D] array (one per row)
+
+        Returns:
+            float array (NaN where no rate is known)
+        """
+        currencies = np.asarray(currencies, dtype=str)
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        out = np.full(currencies.shape, np.nan)
+        for currency in np.unique(currencies):
+            mask = currencies == currency
+            out[mask] = 1.0 / self.rate_per_usd(str(currency), dates[mask])
+        return out
+
+    def average_rate_per_usd(self, currency: str, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Calendar-day average of the as-of rate over [start, end] for each pair.
+
+        Suited to flow items (revenue, income) reported over a period.
+
+        Args:
+            currency: ISO currency code
+            starts: datetime64[D] array
+            ends: datetime64[D] array
+
+        Returns:
+            float array (NaN where the period starts before the cached history)
+        """
+        starts = np.asarray(starts, dtype="datetime64[D]")
+        ends = np.asarray(ends, dtype="datetime64[D]")
+        if currency in ("USD", "", None):
+            return np.ones(starts.shape)
+        if currency not in self.series:
+            return np.full(starts.shape, np.nan)
+        rate_dates, rates = self.series[currency]
+        if currency not in self._cumsum:
+            # Expand to a calendar-day grid (forward-filled) and accumulate.
+            first = rate_dates[0]
+            days = np.arange(first, rate_dates[-1] + np.timedelta64(1, "D"), dtype="datetime64[D]")
+            daily = rates[np.searchsorted(rate_dates, days, side="right") - 1]
+            self._cumsum[currency] = np.concatenate([[0.0], np.cumsum(daily)])
+        cumsum = self._cumsum[currency]
+        first = rate_dates[0]
+        last_idx = len(cumsum) - 2
+        s = (starts - first).astype(np.int64)
+        e = np.minimum((ends - first).astype(np.int64), last_idx)
+        valid = (s >= 0) & (e >= s) & ~np.isnat(starts) & ~np.isnat(ends)
+        s_safe = np.where(valid, s, 0)
+        e_safe = np.where(valid, e, 0)
+        avg = (cumsum[e_safe + 1] - cumsum[s_safe]) / (e_safe - s_safe + 1)
+        return np.where(valid, avg, np.nan)
+
+    def average_rate(self, currency: str, start: date, end: date) -> Optional[float]:
+        """Scalar convenience wrapper around average_rate_per_usd()."""
+        value = self.average_rate_per_usd(
+            currency, np.array([start], dtype="datetime64[D]"), np.array([end], dtype="datetime64[D]")
+        )[0]
+        return None if np.isnan(value) else float(value)
+
+
+def update_fx_cache(
+    currencies: Iterable[str],
+    path: str = DEFAULT_FX_PATH,
+    chart_base_url: str = None,
+) -> int:
+    """
+    Extend the FX cache for the given currencies from their latest stored date.
+
+    The latest stored day is refetched (it may have been captured intraday).
+
+    Args:
+        currencies: ISO codes to keep cached (USD is ignored)
+        path: Cache CSV path
+        chart_base_url: Optional chart endpoint override (see YahooChartClient)
+
+    Returns:
+        Number of new or updated rows
+    """
+    from src.external.yahoo_chart_client import YahooChartClient
+
+    rows: Dict[Tuple[str, str], Dict[str, object]] = {}
+    if os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows[(row["currency"], row["date"])] = row
+
+    latest: Dict[str, str] = {}
+    for currency, date_key in rows:
+        if date_key > latest.get(currency, ""):
+            latest[currency] = date_key
+
+    client = YahooChartClient(base_url=chart_base_url)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+    changed = 0
+    for currency in sorted(set(currencies) - {"USD", ""}):
+        start = (
+            datetime.strptime(latest[currency], "%Y-%m-%d").date()
+            if currency in latest
+            else FX_HISTORY_START
+        )
+        symbol = yahoo_fx_symbol(currency)
+        try:
+            history = client.get_history(symbol, "1d", start=start, end=date.today() + timedelta(days=1))
+        except Exception as exc:
+            # Keep the cached series; one failed pair should not block the others.
+            print(f"Warning: FX {currency} fetch failed: {exc}")
+            continue
+        date_keys = np.datetime_as_string(history["date"], unit="D").tolist()
+        source_file = f"yahoo-chart:{symbol}?interval=1d&start={start.isoformat()}"
+        for date_key, rate in zip(date_keys, history["close"].tolist()):
+            if rate != rate or rate <= 0:  # NaN or bad print
+                continue
+            rows[(currency, date_key)] = {
+                "currency": currency,
+                "date": date_key,
+                "rate_per_usd": rate,
+                "source_file": source_file,
+                "download_timestamp": timestamp,
+            }
+            changed += 1
+        print(f"FX {currency}: {len(date_keys)} bar(s) from {start.isoformat()}")
+
+    ordered = sorted(rows.values(), key=lambda r: (r["currency"], r["date"]))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FX_FIELDNAMES)
+        writer.writeheader()
+        for row in ordered:
+            writer.writerow({k: row.get(k) for k in FX_FIELDNAMES})
+    return changed
@@ -0,0 +1,218 @@
+"""
+Hedged provider requests with learned per-host latency.
+
+A stalled Yahoo request used to block the serial ticker loop in
+update_conceptstocks.py for tens of seconds. HedgedFetcher runs the primary
+request in a daemon thread; if it has not answered within that host's learned
+p95 latency, the secondary provider is fired as well (while the hedge budget
+lasts) and whichever succeeds first is used. A primary that fails outright
+also falls over to the secondary. If nothing has answered by the overall
+deadline the fetch raises TimeoutError and the stalled threads are abandoned.
+
+Latency histograms per host are persisted as JSON between runs. Failed
+requests count at the time they took to fail and abandoned ones at the time
+waited for them, so a host that stalls or errors slowly raises its p95
+instead of leaving only its fast successes in the histogram.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+LATENCY_STATE_FILE = "raw_conceptstock_provider_latency.json"
+
+# Geometric bucket upper bounds in seconds: 0.05s * sqrt(2)^i, ~0.05s .. ~145s.
+BUCKET_BOUNDS = [round(0.05 * 2 ** (i / 2), 4) for i in range(24)]
+
+# Samples needed before the learned p95 is trusted, and the hedge delay used until then.
+MIN_SAMPLES = 20
+DEFAULT_HEDGE_DELAY = 8.0
+
+# Learned hedge delay is clamped to this range (seconds).
+MIN_HEDGE_DELAY = 1.0
+MAX_HEDGE_DELAY = 60.0
+
+# Overall wait (seconds) for primary and secondary together before giving up.
+FETCH_DEADLINE = 180.0
+
+# Counts are halved once a histogram holds this many samples, so old runs fade out.
+DECAY_AT = 500
+
+
+class LatencyStore:
+    """Thread-safe per-host latency histograms persisted as JSON."""
+
+    def __init__(self, path: str):
+        """
+        Load histograms from disk.
+
+        Args:
+            path: JSON file holding {host: [bucket counts]}
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.counts: Dict[str, List[float]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for host, counts in (data.get("hosts") or {}).items():
+                # Ignore histograms recorded with a different bucket layout.
+                if data.get("bounds") == BUCKET_BOUNDS and len(counts) == len(BUCKET_BOUNDS):
+                    self.counts[host] = [float(c) for c in counts]
+
+    def record(self, host: str, seconds: float) -> None:
+        """Add one latency sample for a host."""
+        idx = len(BUCKET_BOUNDS) - 1
+        for i, bound in enumerate(BUCKET_BOUNDS):
+            if seconds <= bound:
+                idx = i
+                break
+        with self._lock:
+            counts = self.counts.setdefault(host, [0.0] * len(BUCKET_BOUNDS))
+            counts[idx] += 1
+            if sum(counts) >= DECAY_AT:
+                self.counts[host] = [c / 2 for c in counts]
+
+    def quantile(self, host: str, q: float = 0.95) -> Optional[float]:
+        """
+        Return the bucket upper bound at quantile q, or None with too few samples.
+
+        Args:
+            host: Provider host key
+            q: Quantile in (0, 1]
+        """
+        with self._lock:
+            counts = list(self.counts.get(host) or [])
+        total = sum(counts)
+        if total < MIN_SAMPLES:
+            return None
+        running = 0.0
+        for bound, count in zip(BUCKET_BOUNDS, counts):
+            running += count
+            if running >= q * total:
+                return bound
+        return BUCKET_BOUNDS[-1]
+
+    def save(self) -> None:
+        """Write histograms atomically."""
+        with self._lock:
+            data = {"bounds": BUCKET_BOUNDS, "hosts": {h: c for h, c in sorted(self.counts.items())}}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+
+class HedgedFetcher:
+    """Run a primary request and hedge to a secondary after the primary's p95."""
+
+    def __init__(self, store: LatencyStore, budget: int, deadline: float = FETCH_DEADLINE):
+        """
+        Args:
+            store: Latency histograms used to pick the hedge delay
+            budget: Maximum number of secondary requests for this run
+            deadline: Seconds to wait for any answer before raising TimeoutError
+        """
+        self.store = store
+        self.budget = budget
+        self.deadline = deadline
+        self.hedges = 0
+        self.secondary_wins = 0
+
+    def hedge_delay(self, host: str) -> float:
+        learned = self.store.quantile(host, 0.95)
+        if learned is None:
+            return DEFAULT_HEDGE_DELAY
+        return min(max(learned, MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+    def _start(
+        self, host: str, fn: Callable[[], object], results: queue.Queue, abandoned: threading.Event
+    ) -> float:
+        """Run fn in a daemon thread; return its start time (time.monotonic())."""
+        start = time.monotonic()
+
+        def run():
+            try:
+                value, ok = fn(), True
+            except Exception as exc:  # reported to the caller through the queue
+                value, ok = exc, False
+            # Once the fetch timed out, the wait was already recorded for this host.
+            if not abandoned.is_set():
+                self.store.record(host, time.monotonic() - start)
+            results.put((host, ok, value))
+
+        threading.Thread(target=run, name=f"fetch-{host}", daemon=True).start()
+        return start
+
+    def fetch(
+        self,
+        primary: Callable[[], object],
+        primary_host: str,
+        secondary: Optional[Callable[[], object]] = None,
+        secondary_host: str = "",
+        label: str = "",
+    ) -> object:
+        """
+        Return the first successful result of primary/secondary.
+
+        Args:
+            primary: Zero-argument callable for the primary provider
+            primary_host: Histogram key for the primary provider
+            secondary: Zero-argument callable for the fallback provider (optional)
+            secondary_host: Histogram key for the fallback provider
+            label: Prefix for log lines (e.g. ticker)
+
+        Returns:
+            Result of whichever callable succeeded first
+
+        Raises:
+            The first exception seen if every launched request failed
+            TimeoutError: No request answered within the deadline
+        """
+        give_up = time.monotonic() + self.deadline
+        results: queue.Queue = queue.Queue()
+        abandoned = threading.Event()
+        started = {primary_host: self._start(primary_host, primary, results, abandoned)}
+        errors: List[Exception] = []
+
+        delay = self.hedge_delay(primary_host)
+        try:
+            host, ok, value = results.get(timeout=min(delay, self.deadline))
+            del started[host]
+            if ok:
+                return value
+            errors.append(value)
+            reason = f"{primary_host} failed ({value})"
+        except queue.Empty:
+            reason = f"{primary_host} slower than p95 {delay:.1f}s"
+
+        if secondary is not None and self.budget > 0:
+            self.budget -= 1
+            self.hedges += 1
+            print(f"{label}: {reason}; hedging to {secondary_host}.")
+            started[secondary_host] = self._start(secondary_host, secondary, results, abandoned)
+
+        while started:
+            remaining = give_up - time.monotonic()
+            try:
+                host, ok, value = results.get(timeout=max(remaining, 0.0))
+            except queue.Empty:
+                # Censored samples: each stalled host took at least this long.
+                abandoned.set()
+                now = time.monotonic()
+                for host, start in started.items():
+                    self.store.record(host, now - start)
+                raise TimeoutError(
+                    f"{label}: no provider answered within {self.deadline:.0f}s"
+                ) from (errors[0] if errors else None)
+            del started[host]
+            if ok:
+                if host != primary_host:
+                    self.secondary_wins += 1
+                return value
+            errors.append(value)
+        raise errors[0]
@@ -0,0 +1,397 @@
+"""
+Streaming anomaly guard for incoming price rows.
+
+Sits between fetch_rows_*() and merge_and_recalc() in update_conceptstocks.py.
+Each new bar is scored against per-ticker rolling statistics (EWMA mean and
+variance of log returns, last accepted close) at O(1) cost per bar. Suspicious
+bars are held back from the merge and written to a quarantine side file so
+they never reach the synced CSVs.
+
+State is a small JSON file keyed by cadence and ticker. When a ticker has no
+state yet it is bootstrapped once from the stored closes. A ticker whose new
+bars keep landing at the same flagged level (a real split, or a genuine jump
+on a quiet stock) is re-anchored on that level after REANCHOR_BARS bars and
+the whole flagged run is released into the merge, so one move cannot
+quarantine it for good or leave a gap; reset() drops a ticker's state outright.
+
+Rows may carry high/low/volume. A zero-volume bar whose close moved is
+flagged (a price without trades); an unchanged zero-volume bar is the usual
+no-trade placeholder of an illiquid member and passes.
+"""
+
+import csv
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GUARD_STATE_FILE = "raw_conceptstock_guard_state.json"
+
+# EWMA span (in bars) for return mean/variance, and how many returns must be
+# seen before the z-score rule is applied.
+EWMA_SPAN = 30
+WARMUP_BARS = 20
+
+# A bar is flagged when its log-return z-score exceeds Z_THRESHOLD, or when
+# close/prev_close moves by more than MAX_GAP_RATIO in either direction
+# (catches 10x unit/split errors even before warm-up).
+Z_THRESHOLD = 8.0
+MAX_GAP_RATIO = 3.0
+
+# Consecutive flagged bars, each closer to the first flagged close than to the
+# last accepted close, after which the guard accepts the new level.
+REANCHOR_BARS = 3
+
+# Row fields kept for the bars of a pending flagged run.
+ROW_FIELDS = ("date_key", "open", "close", "high", "low", "volume")
+
+# Floor for the EWMA variance so a flat warm-up does not make every move "infinite".
+MIN_VARIANCE = 1e-8
+
+QUARANTINE_FIELDNAMES = [
+    "stock_code",
+    "date_key",
+    "open",
+    "close",
+    "prev_close",
+    "log_return",
+    "zscore",
+    "reasons",
+    "source_file",
+    "detected_timestamp",
+]
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(result):
+        return None
+    return result
+
+
+def _hlv(row: Dict[str, object]) -> Optional[List[float]]:
+    """[high, low, volume] when the row carries all three, else None."""
+    values = [_to_float(row.get(name)) for name in ("high", "low", "volume")]
+    if any(v is None for v in values):
+        return None
+    return values
+
+
+class PriceGuard:
+    """Per-cadence streaming validator for price rows."""
+
+    def __init__(
+        self,
+        state_path: str,
+        z_threshold: float = Z_THRESHOLD,
+        max_gap_ratio: float = MAX_GAP_RATIO,
+    ):
+        """
+        Initialize guard and load persisted state.
+
+        Args:
+            state_path: JSON file holding {state_key: {ticker: stats}}
+            z_threshold: Log-return z-score above which a bar is quarantined
+            max_gap_ratio: close/prev_close ratio (or its inverse) above which a bar is quarantined
+        """
+        self.state_path = state_path
+        self.z_threshold = z_threshold
+        self.max_gap_ratio = max_gap_ratio
+        self.alpha = 2.0 / (EWMA_SPAN + 1)
+        self.state: Dict[str, Dict[str, Dict[str, object]]] = {}
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        self._pending: Dict[Tuple[str, str], Dict[str, object]] = {}
+        # (state_key, ticker, date_key) of every re-anchor, and of every bar it
+        # released from quarantine, since construction.
+        self.reanchored: List[Tuple[str, str, str]] = []
+        self.released: List[Tuple[str, str, str]] = []
+
+    def save(self) -> None:
+        """Write state atomically."""
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, self.state_path)
+
+    def has_state(self, state_key: str, ticker: str) -> bool:
+        return ticker in self.state.get(state_key, {})
+
+    def _new_stats(self) -> Dict[str, object]:
+        return {
+            "last_key": None,
+            "last_close": None,
+            "last_open": None,
+            "last_hlv": None,
+            "mean": 0.0,
+            "var": 0.0,
+            "n": 0,
+            # Rows of the current run of flagged bars, oldest first.
+            "flag_rows": [],
+        }
+
+    def reset(self, state_key: Optional[str] = None, ticker: Optional[str] = None) -> int:
+        """
+        Drop stored stats so the next run re-bootstraps from the stored closes.
+
+        Args:
+            state_key: Cadence key to clear (default: every cadence)
+            ticker: Ticker to clear (default: every ticker)
+
+        Returns:
+            Number of (state_key, ticker) entries removed
+        """
+        removed = 0
+        for key in list(self.state):
+            if state_key is not None and key != state_key:
+                continue
+            tickers = self.state[key]
+            for name in list(tickers):
+                if ticker is None or name == ticker:
+                    del tickers[name]
+                    removed += 1
+        return removed
+
+    def _advance(
+        self,
+        stats: Dict[str, object],
+        key: str,
+        open_p: Optional[float],
+        close_p: float,
+        hlv: Optional[List[float]] = None,
+    ) -> None:
+        """Fold one accepted bar into the EWMA statistics."""
+        prev_close = stats["last_close"]
+        if prev_close:
+            r = math.log(close_p / prev_close)
+            if stats["n"] == 0:
+                stats["mean"] = r
+                stats["var"] = 0.0
+            else:
+                delta = r - stats["mean"]
+                stats["mean"] += self.alpha * delta
+                stats["var"] = (1 - self.alpha) * (stats["var"] + self.alpha * delta * delta)
+            stats["n"] += 1
+        stats["last_key"] = key
+        stats["last_close"] = close_p
+        stats["last_open"] = open_p
+        stats["last_hlv"] = hlv
+        stats["flag_rows"] = []
+
+    def _reanchor(self, stats: Dict[str, object], run: List[Dict[str, object]]) -> None:
+        """Restart the statistics at a flagged level that has persisted, folding in the run."""
+        stats.update(self._new_stats())
+        for row in run:
+            self._advance(stats, row["date_key"], _to_float(row.get("open")), _to_float(row["close"]), _hlv(row))
+
+    def bootstrap(self, state_key: str, ticker: str, bars: Iterable[Tuple[str, object, object]]) -> None:
+        """
+        Build state for a ticker from stored (date_key, open, close) bars.
+
+        Args:
+            state_key: Cadence key (e.g. "daily", "intraday_60m")
+            ticker: Stock ticker
+            bars: Stored bars in any order
+        """
+        stats = self._new_stats()
+        for key, open_v, close_v in sorted(bars, key=lambda x: x[0]):
+            close_p = _to_float(close_v)
+            if close_p is None or close_p <= 0:
+                continue
+            self._advance(stats, key, _to_float(open_v), close_p)
+        self.state.setdefault(state_key, {})[ticker] = stats
+
+    def screen(
+        self,
+        state_key: str,
+        ticker: str,
+        rows: List[Dict[str, object]],
+    ) -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
+        """
+        Split fetched rows into accepted and quarantined rows.
+
+        Bars at or before the last accepted key are refetched overlap: they are
+        only checked for non-positive prices and, for the last key itself,
+        refresh the reference close. Newer bars are scored and, when accepted,
+        advance the statistics. A run of REANCHOR_BARS flagged bars at a common
+        new level re-anchors the statistics there and the whole run is
+        accepted: rows refetched in this batch, else the copies kept in the
+        state. The released keys are listed in `self.released` so their
+        quarantine records can be dropped. The updated stats are staged until
+        commit().
+
+        Args:
+            state_key: Cadence key (e.g. "daily", "intraday_60m")
+            ticker: Stock ticker
+            rows: Rows with date_key/open/close, sorted by date_key
+
+        Returns:
+            (accepted_rows, quarantine_records)
+        """
+        stats = self._new_stats()
+        stats.update(self.state.get(state_key, {}).get(ticker) or {})
+        accepted: List[Dict[str, object]] = []
+        flagged: List[Dict[str, object]] = []
+        seen_keys = set()
+        batch: Dict[str, Dict[str, object]] = {}
+
+        for row in rows:
+            key = row["date_key"]
+            open_p = _to_float(row.get("open"))
+            close_p = _to_float(row.get("close"))
+            reasons = []
+            log_return = None
+            zscore = None
+            prev_close = stats["last_close"]
+            hlv = _hlv(row)
+
+            if key in seen_keys:
+                reasons.append("duplicate_key")
+            else:
+                batch[key] = row
+            seen_keys.add(key)
+            if close_p is None:
+                reasons.append("missing_close")
+            elif close_p <= 0:
+                reasons.append("nonpositive_close")
+            if open_p is not None and open_p <= 0:
+                reasons.append("nonpositive_open")
+
+            is_new = stats["last_key"] is None or key > stats["last_key"]
+            if is_new and not reasons and prev_close:
+                log_return = math.log(close_p / prev_close)
+                if abs(log_return) > math.log(self.max_gap_ratio):
+                    reasons.append("gap")
+                if stats["n"] >= WARMUP_BARS:
+                    std = math.sqrt(max(stats["var"], MIN_VARIANCE))
+                    zscore = (log_return - stats["mean"]) / std
+                    if abs(zscore) > self.z_threshold:
+                        reasons.append("zscore")
+                # Yahoo occasionally repeats the previous bar under the next date.
+                # Unchanged open/close alone is a normal quiet day for illiquid
+                # members, so the whole bar (high/low/volume too) must repeat.
+                if (
+                    hlv is not None
+                    and hlv == stats["last_hlv"]
+                    and open_p == stats["last_open"]
+                    and close_p == prev_close
+                ):
+                    reasons.append("duplicate_bar")
+                volume = _to_float(row.get("volume"))
+                if volume == 0 and close_p != prev_close:
+                    reasons.append("zero_volume")
+
+            if reasons and is_new and log_return is not None and self._persists(stats, row, close_p):
+                run = [batch.get(r["date_key"], r) for r in stats["flag_rows"]]
+                released = {r["date_key"] for r in run}
+                self._reanchor(stats, run)
+                self.reanchored.append((state_key, ticker, key))
+                self.released.extend((state_key, ticker, k) for k in sorted(released))
+                flagged = [record for record in flagged if record["date_key"] not in released]
+                accepted.extend(run)
+                accepted.sort(key=lambda r: r["date_key"])
+                continue
+
+            if reasons:
+                flagged.append(
+                    {
+                        "stock_code": ticker,
+                        "date_key": key,
+                        "open": row.get("open"),
+                        "close": row.get("close"),
+                        "prev_close": prev_close,
+                        "log_return": log_return,
+                        "zscore": zscore,
+                        "reasons": ";".join(reasons),
+                    }
+                )
+                continue
+
+            accepted.append(row)
+            if is_new:
+                self._advance(stats, key, open_p, close_p, hlv)
+            elif key == stats["last_key"]:
+                stats["last_close"] = close_p
+                stats["last_open"] = open_p
+                stats["last_hlv"] = hlv
+
+        self._pending[(state_key, ticker)] = stats
+        return accepted, flagged
+
+    def _persists(self, stats: Dict[str, object], row: Dict[str, object], close_p: float) -> bool:
+        """
+        Count a flagged new bar towards re-anchoring; True once the run is long enough.
+
+        The run continues while each flagged close sits nearer the first flagged
+        close than the last accepted one. A key already in the run (the same bar
+        refetched on a later run) does not extend it.
+        """
+        run = stats["flag_rows"]
+        key = row["date_key"]
+        if run and key <= run[-1]["date_key"]:
+            return False
+        kept = {name: row.get(name) for name in ROW_FIELDS if name in row}
+        flag_close = _to_float(run[0]["close"]) if run else None
+        if flag_close and abs(math.log(close_p / flag_close)) < abs(math.log(close_p / stats["last_close"])):
+            run.append(kept)
+        else:
+            stats["flag_rows"] = [kept]
+        return len(stats["flag_rows"]) >= REANCHOR_BARS
+
+    def commit(self, state_key: str, ticker: str) -> None:
+        """Apply staged stats once the accepted rows have been written."""
+        stats = self._pending.pop((state_key, ticker), None)
+        if stats is not None:
+            self.state.setdefault(state_key, {})[ticker] = stats
+
+
+def append_quarantine(
+    path: str,
+    records: List[Dict[str, object]],
+    source_file: str,
+    released: Iterable[Tuple[str, str]] = (),
+) -> None:
+    """
+    Add quarantined rows to a side CSV, once per (stock_code, date_key).
+
+    A bar quarantined again on a rerun keeps its first record. Bars released
+    by a re-anchor are removed, which rewrites the file.
+
+    Args:
+        path: Quarantine CSV path
+        records: Records returned by PriceGuard.screen()
+        source_file: Provider request the rows came from
+        released: (stock_code, date_key) pairs accepted after all
+    """
+    released = set(released)
+    stored: List[Dict[str, str]] = []
+    if os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            stored = list(csv.DictReader(f))
+    keys = {(row.get("stock_code"), row.get("date_key")) for row in stored}
+    fresh = [r for r in records if (r["stock_code"], r["date_key"]) not in keys]
+    kept = [row for row in stored if (row.get("stock_code"), row.get("date_key")) not in released]
+    if not fresh and len(kept) == len(stored):
+        return
+
+    detected_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S CST")
+    rewrite = len(kept) != len(stored)
+    write_header = rewrite or not os.path.exists(path)
+    with open(path, "w" if rewrite else "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=QUARANTINE_FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+        if rewrite:
+            for row in kept:
+                writer.writerow({k: row.get(k) for k in QUARANTINE_FIELDNAMES})
+        for record in fresh:
+            out = dict(record)
+            out["source_file"] = source_file
+            out["detected_timestamp"] = detected_ts
+            writer.writerow({k: out.get(k) for k in QUARANTINE_FIELDNAMES})
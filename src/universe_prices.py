@@ -0,0 +1,436 @@
+"""
+Daily prices for the full Taiwan concept-stock universe in raw_companyinfo.csv.
+
+The anchor pipeline in update_conceptstocks.py fetches ~20 tickers one by one
+and rewrites the daily CSV after each. That does not scale to the ~140 Taiwan
+members (or 10x that), so this mode:
+
+- maps 代號 + 市場別 to Yahoo symbols (上市 -> .TW, 上櫃 -> .TWO),
+- plans incremental windows from each symbol's latest stored date and groups
+  symbols sharing a window into batches (one yfinance.download per batch),
+- runs requests with bounded concurrency (yfinance threads inside a batch, or a
+  worker pool over chart requests),
+- merges all fetched bars with the stored rows in one vectorized pass (dedupe,
+  sort, change recompute) and writes them once, as one CSV per calendar year
+  under raw_conceptstock_tw_daily/. Only partitions whose content changed are
+  rewritten, so a daily run touches the current year's file and not the
+  whole history.
+"""
+
+import csv
+import glob
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+UNIVERSE_OUTPUT_DIR = "raw_conceptstock_tw_daily"
+# Single-file layout used before the yearly partitions; migrated on the next write.
+LEGACY_UNIVERSE_FILE = "raw_conceptstock_tw_daily.csv"
+COMPANYINFO_FILE = "raw_companyinfo.csv"
+
+# 市場別 -> Yahoo suffix. 興櫃 (emerging board) quotes are not served reliably and are skipped.
+MARKET_SUFFIX = {
+    "上市": ".TW",
+    "上市臺灣創新板": ".TW",
+    "上櫃": ".TWO",
+}
+
+# First date requested for symbols with no stored bars (matches the anchor daily history).
+UNIVERSE_HISTORY_START = date(2024, 1, 1)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_WORKERS = 4
+
+DATE_COL = "交易日期"
+
+# Bars fetched for one symbol: (datetime64[D] dates, opens, closes, highs, lows, volumes).
+Bars = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def load_companyinfo_universe(path: str) -> Dict[str, str]:
+    """
+    Map raw_companyinfo.csv rows to Yahoo symbols.
+
+    Args:
+        path: raw_companyinfo.csv path
+
+    Returns:
+        Dict of Yahoo symbol (e.g. "2330.TW") -> company name; empty if the file is missing
+    """
+    if not os.path.exists(path):
+        return {}
+    universe: Dict[str, str] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            code = (row.get("代號") or "").strip()
+            suffix = MARKET_SUFFIX.get((row.get("市場別") or "").strip())
+            if not code or not suffix:
+                continue
+            universe[f"{code}{suffix}"] = (row.get("名稱") or "").strip() or code
+    return universe
+
+
+def load_concept_flags(path: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Read the concept flags of raw_companyinfo.csv.
+
+    Returns:
+        (Yahoo symbol per row, "" for unmapped markets; {concept column: "0"/"1" str array})
+    """
+    if not os.path.exists(path):
+        return np.array([], dtype=str), {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    symbols = []
+    for row in rows:
+        code = (row.get("代號") or "").strip()
+        suffix = MARKET_SUFFIX.get((row.get("市場別") or "").strip())
+        symbols.append(f"{code}{suffix}" if code and suffix else "")
+    concepts = [c for c in (rows[0].keys() if rows else []) if c.endswith("概念")]
+    flags = {c: np.asarray([(row.get(c) or "").strip() for row in rows], dtype=str) for c in concepts}
+    return np.asarray(symbols, dtype=str), flags
+
+
+def plan_batches(
+    symbols: Iterable[str],
+    last_dates: Dict[str, str],
+    batch_size: int,
+    start_date: Optional[date] = None,
+) -> List[Tuple[date, List[str]]]:
+    """
+    Group symbols by request start date and split each group into batches.
+
+    Each symbol restarts from its latest stored date (that bar is refetched,
+    it may have been captured intraday); unknown symbols start at
+    UNIVERSE_HISTORY_START. An explicit start_date overrides both.
+
+    Returns:
+        [(start, [symbols])], oldest start first
+    """
+    by_start: Dict[date, List[str]] = {}
+    for symbol in sorted(symbols):
+        if start_date:
+            start = start_date
+        elif symbol in last_dates:
+            start = datetime.strptime(last_dates[symbol], "%Y-%m-%d").date()
+        else:
+            start = UNIVERSE_HISTORY_START
+        by_start.setdefault(start, []).append(symbol)
+    batches = []
+    for start in sorted(by_start):
+        group = by_start[start]
+        for i in range(0, len(group), batch_size):
+            batches.append((start, group[i:i + batch_size]))
+    return batches
+
+
+def fetch_batch_yfinance(symbols: List[str], start: date, end: date, workers: int) -> Dict[str, Bars]:
+    """
+    One yfinance.download call for a batch of symbols sharing a window.
+
+    yfinance keeps per-call state in module globals, so batches are not run
+    in parallel; `workers` bounds its internal download threads instead.
+    """
+    import yfinance as yf
+
+    frame = yf.download(
+        tickers=symbols,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=False,
+        actions=False,
+        threads=max(1, workers),
+        progress=False,
+    )
+    result: Dict[str, Bars] = {}
+    if frame is None or frame.empty:
+        return result
+    dates = np.asarray(frame.index.date, dtype="datetime64[D]")
+    multi = getattr(frame.columns, "nlevels", 1) > 1
+    for symbol in symbols:
+        if multi:
+            if symbol not in frame.columns.get_level_values(0):
+                continue
+            sub = frame[symbol]
+        else:
+            sub = frame
+        columns = [sub[col].to_numpy(dtype=float, na_value=np.nan) for col in ("Open", "Close", "High", "Low", "Volume")]
+        # download() aligns every symbol on the union of dates; drop the holes.
+        keep = ~np.isnan(columns[1])
+        if keep.any():
+            result[symbol] = (dates[keep],) + tuple(values[keep] for values in columns)
+    return result
+
+
+def fetch_batch_chart(symbols: List[str], start: date, end: date, base_url: Optional[str] = None) -> Dict[str, Bars]:
+    """Chart-endpoint requests for a batch (one per symbol, sequential within the batch).
+
+    A failing symbol is logged and left out instead of failing the whole batch.
+    """
+    from src.external.yahoo_chart_client import YahooChartClient
+
+    client = YahooChartClient(base_url=base_url)
+    result: Dict[str, Bars] = {}
+    for symbol in symbols:
+        try:
+            history = client.get_history(symbol, "1d", start=start, end=end)
+        except Exception as exc:
+            print(f"{symbol}: chart request failed: {exc}")
+            continue
+        if len(history["date"]):
+            result[symbol] = tuple(history[k] for k in ("date", "open", "close", "high", "low", "volume"))
+    return result
+
+
+def fetch_universe(
+    batches: List[Tuple[date, List[str]]],
+    fetch_batch: Callable[[List[str], date, date], Dict[str, Bars]],
+    end: date,
+    workers: int,
+    on_batch: Optional[Callable[[int, int, List[str], Optional[Exception]], None]] = None,
+) -> Tuple[Dict[str, Bars], Dict[str, str]]:
+    """
+    Run batch fetches on a bounded worker pool.
+
+    Args:
+        batches: Output of plan_batches()
+        fetch_batch: fn(symbols, start, end) -> {symbol: bars}
+        end: Exclusive request end date
+        workers: Maximum concurrent batches
+        on_batch: Optional progress callback (done, total, symbols, error)
+
+    Returns:
+        (bars by symbol, error message by symbol)
+    """
+    bars: Dict[str, Bars] = {}
+    errors: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fetch_batch, symbols, start, end): symbols for start, symbols in batches}
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbols = futures[future]
+            error = None
+            try:
+                fetched = future.result()
+            except Exception as exc:
+                error = exc
+                fetched = {}
+                for symbol in symbols:
+                    errors[symbol] = str(exc)
+            bars.update(fetched)
+            for symbol in symbols:
+                if symbol not in fetched and symbol not in errors:
+                    errors[symbol] = "no data returned"
+            if on_batch:
+                on_batch(done, len(batches), symbols, error)
+    return bars, errors
+
+
+def bars_to_columns(
+    bars: Dict[str, Bars],
+    names: Dict[str, str],
+    source_files: Dict[str, str],
+    file_type: str,
+) -> Dict[str, np.ndarray]:
+    """Flatten fetched bars into daily-CSV string/float columns (one array per column)."""
+    symbols = sorted(bars)
+    lengths = [len(bars[s][0]) for s in symbols]
+    if not symbols or not sum(lengths):
+        return {}
+    now = datetime.now()
+    ts = now.strftime("%Y-%m-%d %H:%M:%S CST")
+    stage1_ts = now.strftime("%Y-%m-%d %H:%M:%S.%f CST")
+    n = sum(lengths)
+    codes = np.repeat(np.asarray(symbols, dtype=object), lengths)
+    return {
+        "stock_code": codes,
+        "company_name": np.repeat(np.asarray([names.get(s, s) for s in symbols], dtype=object), lengths),
+        DATE_COL: np.datetime_as_string(
+            np.concatenate([bars[s][0] for s in symbols]).astype("datetime64[D]"), unit="D"
+        ).astype(object),
+        "開盤_價格_元": np.concatenate([np.asarray(bars[s][1], dtype=float) for s in symbols]),
+        "收盤_價格_元": np.concatenate([np.asarray(bars[s][2], dtype=float) for s in symbols]),
+        "file_type": np.full(n, file_type, dtype=object),
+        "source_file": np.repeat(np.asarray([source_files.get(s, "") for s in symbols], dtype=object), lengths),
+        "download_success": np.full(n, "True", dtype=object),
+        "download_timestamp": np.full(n, ts, dtype=object),
+        "process_timestamp": np.full(n, ts, dtype=object),
+        "stage1_process_timestamp": np.full(n, stage1_ts, dtype=object),
+    }
+
+
+def merge_columns(
+    existing: Dict[str, np.ndarray],
+    fresh: Dict[str, np.ndarray],
+    fieldnames: List[str],
+    keep_symbols: Optional[Iterable[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Merge fetched rows into stored rows in one pass.
+
+    Fresh rows win on (stock_code, date) collisions. The result is sorted by
+    (stock_code, date) and 漲跌 fields are recomputed from the previous close
+    of the same symbol with shifted arrays.
+
+    Args:
+        existing: Stored columns (read_columns output; may be empty)
+        fresh: bars_to_columns output (may be empty)
+        fieldnames: Output column order
+        keep_symbols: If given, stored rows of other symbols are dropped (universe pruning)
+
+    Returns:
+        Merged columns keyed by fieldnames (float arrays for prices/changes)
+    """
+    price_cols = ("開盤_價格_元", "收盤_價格_元")
+    parts = []
+    for source in (fresh, existing):
+        if not source:
+            continue
+        n = len(source["stock_code"])
+        part = {}
+        for col in fieldnames:
+            if col in source:
+                values = source[col]
+            else:
+                values = np.full(n, "", dtype=object)
+            if col in price_cols:
+                part[col] = _as_float(values)
+            else:
+                part[col] = np.asarray(values, dtype=object)
+        parts.append(part)
+    if not parts:
+        return {}
+    merged = {col: np.concatenate([p[col] for p in parts]) for col in fieldnames}
+
+    codes = merged["stock_code"].astype(str)
+    keys = merged[DATE_COL].astype(str)
+    # Fresh rows were concatenated first; a stable sort keeps them ahead of
+    # stored rows with the same (code, date), so dropping repeats keeps fresh.
+    order = np.lexsort((keys, codes))
+    codes, keys = codes[order], keys[order]
+    keep = keys != ""
+    keep[1:] &= (codes[1:] != codes[:-1]) | (keys[1:] != keys[:-1])
+    if keep_symbols is not None:
+        keep &= np.isin(codes, list(keep_symbols))
+    order = order[keep]
+    merged = {col: values[order] for col, values in merged.items()}
+    codes = codes[keep]
+
+    close = merged["收盤_價格_元"]
+    prev_close = np.full(len(close), np.nan)
+    if len(close) > 1:
+        same = codes[1:] == codes[:-1]
+        prev_close[1:] = np.where(same, close[:-1], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = close - prev_close
+        change_pct = np.where(prev_close != 0, change / prev_close, np.nan)
+    merged["漲跌_價格_元"] = change
+    merged["漲跌_pct"] = change_pct
+    return merged
+
+
+def _as_float(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return values
+    from src.analytics.columns import to_float_array
+
+    return to_float_array(values.astype(str))
+
+
+def write_columns_csv(path: str, columns: Dict[str, np.ndarray], fieldnames: List[str]) -> bool:
+    """
+    Write merged columns (NaN -> empty cell) atomically.
+
+    Returns:
+        False if the file already held exactly this content (it is not rewritten)
+    """
+    cells = []
+    for col in fieldnames:
+        values = columns[col]
+        if values.dtype.kind == "f":
+            cells.append(["" if v != v else v for v in values.tolist()])
+        else:
+            cells.append(["" if v is None else v for v in values.tolist()])
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(fieldnames)
+    writer.writerows(zip(*cells))
+    data = buf.getvalue().encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_universe_columns(out_dir: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Read the yearly partitions (plus a not yet migrated single file) as one set of columns."""
+    from src.analytics.columns import read_columns
+
+    parts = [
+        read_columns(os.path.join(out_dir, name), columns)
+        for name in (UNIVERSE_OUTPUT_DIR, LEGACY_UNIVERSE_FILE)
+    ]
+    parts = [p for p in parts if p]
+    if not parts:
+        return {}
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def write_universe_partitions(out_dir: str, columns: Dict[str, np.ndarray], fieldnames: List[str]) -> List[str]:
+    """
+    Write merged universe columns as one CSV per calendar year.
+
+    Partitions whose content is unchanged are left alone, partitions of years
+    with no rows left are removed, and the legacy single file is deleted once
+    its rows live in the partitions.
+
+    Returns:
+        Years whose partition was written or removed
+    """
+    part_dir = os.path.join(out_dir, UNIVERSE_OUTPUT_DIR)
+    os.makedirs(part_dir, exist_ok=True)
+    years = np.asarray(columns[DATE_COL], dtype=str).astype("<U4")
+    changed = []
+    for year in np.unique(years).tolist():
+        mask = years == year
+        path = os.path.join(part_dir, f"{year}.csv")
+        if write_columns_csv(path, {col: columns[col][mask] for col in fieldnames}, fieldnames):
+            changed.append(year)
+    for path in glob.glob(os.path.join(part_dir, "*.csv")):
+        year = os.path.basename(path)[: -len(".csv")]
+        if year not in years:
+            os.remove(path)
+            changed.append(year)
+    legacy_path = os.path.join(out_dir, LEGACY_UNIVERSE_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+    return sorted(changed)
+
+
+def last_dates_by_symbol(existing: Dict[str, np.ndarray]) -> Dict[str, str]:
+    """Latest stored date key per symbol, vectorized over the stored columns."""
+    if not existing or not len(existing.get("stock_code", [])):
+        return {}
+    codes = existing["stock_code"].astype(str)
+    keys = existing[DATE_COL].astype(str)
+    order = np.lexsort((keys, codes))
+    codes, keys = codes[order], keys[order]
+    last = np.ones(len(codes), dtype=bool)
+    last[:-1] = codes[1:] != codes[:-1]
+    return dict(zip(codes[last].tolist(), keys[last].tolist()))
+
+
+def default_request_end(end_date: Optional[date] = None) -> date:
+    """Exclusive request end (tomorrow unless an explicit end date is given)."""
+    return (end_date or date.today()) + timedelta(days=1)